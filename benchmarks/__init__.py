@@ -0,0 +1 @@
+"""Offline performance benchmarks for uoshardware, run as modules."""
@@ -0,0 +1,85 @@
+"""Benchmark NPC frame decoding throughput.
+
+Compares the streaming ``NPCDecoder`` against the per-byte parser previously
+used by ``Serial.read_response``. Run with ``python -m benchmarks.decoder``.
+"""
+from timeit import repeat
+
+from uoshardware.abstractions import NPCPacket
+from uoshardware.decoder import NPCDecoder
+
+# A representative response stream, ACK followed by an 8 channel ADC reading.
+STREAM = (
+    NPCPacket(0, 90, (0,)).packet + NPCPacket(0, 90, tuple(range(16))).packet
+) * 64
+
+
+def legacy_decode_and_capture(
+    byte_index: int, byte_in: bytes, packet: list
+) -> tuple[int, list]:
+    """Per-byte parser as implemented in 0.6 ``Serial.decode_and_capture``."""
+    if byte_index == -1:  # start symbol
+        if byte_in == b">":
+            byte_index += 1
+    if byte_index >= 0:
+        payload_len = packet[3] if len(packet) > 3 else 0
+        if byte_index == 3 + 2 + payload_len:  # End packet symbol
+            if byte_in == b"<":
+                byte_index = -2  # packet complete
+            else:  # Errored data
+                byte_index = -1
+                packet = []
+        packet.append(int.from_bytes(byte_in, byteorder="little"))
+    return byte_index, packet
+
+
+def legacy_decode(stream: bytes) -> int:
+    """Decode a stream a byte at a time then validate checksums separately."""
+    frames = []
+    packet: list = []
+    byte_index = -1
+    for offset in range(len(stream)):
+        byte_index, packet = legacy_decode_and_capture(
+            byte_index, stream[offset : offset + 1], packet
+        )
+        if byte_index == -2:
+            frames.append(packet)
+            packet = []
+        byte_index += 1
+    return sum(
+        NPCPacket.get_npc_checksum(tuple(frame[1:-2])) == frame[-2] for frame in frames
+    )
+
+
+def streaming_decode(stream: bytes, chunk_size: int) -> int:
+    """Decode a stream with the NPCDecoder fed in fixed size chunks."""
+    decoder = NPCDecoder()
+    view = memoryview(stream)
+    for offset in range(0, len(stream), chunk_size):
+        decoder.feed(view[offset : offset + chunk_size])
+    return len(decoder.frames)
+
+
+def bytes_per_second(function, *args) -> float:
+    """Return the best observed decoding throughput for a function."""
+    best_s = min(repeat(lambda: function(*args), number=20, repeat=5)) / 20
+    return len(STREAM) / best_s
+
+
+def main():
+    """Print the decode throughput of each approach."""
+    assert legacy_decode(STREAM) == streaming_decode(STREAM, 1)
+    results = {
+        "legacy per-byte": bytes_per_second(legacy_decode, STREAM),
+        "NPCDecoder 1 byte chunks": bytes_per_second(streaming_decode, STREAM, 1),
+        "NPCDecoder 64 byte chunks": bytes_per_second(streaming_decode, STREAM, 64),
+        "NPCDecoder single chunk": bytes_per_second(
+            streaming_decode, STREAM, len(STREAM)
+        ),
+    }
+    for name, rate in results.items():
+        print(f"{name:<28}{rate / 1e6:8.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
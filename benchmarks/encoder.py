@@ -0,0 +1,74 @@
+"""Benchmark NPC packet encoding of long command sequences.
+
+Compares building a sequence from individual packets, as ``NPCPacket`` did
+in 0.6 with list concatenation, against encoding directly into a single
+buffer. Run with ``python -m benchmarks.encoder``.
+"""
+from timeit import repeat
+
+from uoshardware.abstractions import NPCPacket
+
+# Toggle every pin on a device, a typical pre-generated sequence.
+FRAMES = [(60, 0, (pin, level)) for level in (0, 1) for pin in range(2, 20)] * 32
+
+
+def legacy_compute_packet(
+    to_address: int, from_address: int, payload: tuple[int, ...]
+) -> bytes:
+    """Encode a packet as implemented in 0.6 ``NPCPacket.compute_packet``."""
+    packet_data = tuple([to_address, from_address, len(payload)] + list(payload))
+    lrc = 0
+    for byte in packet_data:
+        lrc = (lrc + byte) & 0xFF
+    lrc = ((lrc ^ 0xFF) + 1) & 0xFF
+    return bytes(
+        [0x3E, packet_data[0], packet_data[1], len(payload)]
+        + list(payload)
+        + [lrc, 0x3C]
+    )
+
+
+def legacy_sequence() -> bytes:
+    """Encode each frame separately then join them for writing."""
+    return b"".join(legacy_compute_packet(*frame) for frame in FRAMES)
+
+
+def packet_sequence() -> bytes:
+    """Encode each frame as an NPCPacket then join them for writing."""
+    return b"".join(NPCPacket(*frame).packet for frame in FRAMES)
+
+
+def buffer_sequence() -> bytearray:
+    """Encode every frame into a single contiguous buffer."""
+    return NPCPacket.encode_sequence(FRAMES)
+
+
+BUFFER = bytearray(len(buffer_sequence()))
+
+
+def buffer_into() -> bytearray:
+    """Encode every frame into a preallocated caller supplied buffer."""
+    NPCPacket.encode_into(BUFFER, 0, FRAMES)
+    return BUFFER
+
+
+def frames_per_second(function) -> float:
+    """Return the best observed encoding rate of a sequence function."""
+    best_s = min(repeat(function, number=20, repeat=5)) / 20
+    return len(FRAMES) / best_s
+
+
+def main():
+    """Print the encoding rate of each approach."""
+    assert legacy_sequence() == packet_sequence() == buffer_sequence() == buffer_into()
+    for name, function in (
+        ("legacy list packets", legacy_sequence),
+        ("NPCPacket objects", packet_sequence),
+        ("encode_sequence buffer", buffer_sequence),
+        ("encode_into buffer", buffer_into),
+    ):
+        print(f"{name:<24}{frames_per_second(function) / 1e3:8.1f} k frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark the per-instruction overhead of UOSFunction lookups.
+
+Compares the precomputed function registry against the ``dir()`` scan and
+linear address search previously used by ``UOSFunctions``. Run with
+``python -m benchmarks.registry``.
+"""
+from timeit import repeat
+
+from uoshardware import Loading, UOSUnsupportedError
+from uoshardware.abstractions import NPCPacket, UOSFunction, UOSFunctions
+from uoshardware.api import UOSDevice
+from uoshardware.devices import Devices
+from uoshardware.interface import Interface
+
+
+def legacy_enumerate_functions() -> list:
+    """Enumerate functions as implemented in 0.6 ``UOSFunctions``."""
+    return [
+        getattr(UOSFunctions, member_name)
+        for member_name in dir(UOSFunctions)
+        if isinstance(getattr(UOSFunctions, member_name), UOSFunction)
+    ]
+
+
+def legacy_get_from_address(address: int) -> UOSFunction | None:
+    """Look up a function as implemented in 0.6 ``UOSFunctions``."""
+    for function in legacy_enumerate_functions():
+        if address in function.address_lut.values():
+            return function
+    return None
+
+
+def legacy_instruction_lookups(packet: NPCPacket):
+    """Lookups made per instruction, checking the function and its response."""
+    function = legacy_get_from_address(packet.to_address)
+    if function is None:
+        raise UOSUnsupportedError(f"No function at address {packet.to_address}.")
+    assert function in legacy_enumerate_functions()
+    return function.ack, legacy_get_from_address(packet.to_address)
+
+
+def instruction_lookups(packet: NPCPacket):
+    """Lookups made per instruction using the registry."""
+    function = UOSFunctions.get_from_address(packet.to_address)
+    if function is None:
+        raise UOSUnsupportedError(f"No function at address {packet.to_address}.")
+    assert UOSFunctions.get_from_name(function.name) == function
+    return packet.expects_ack(), packet.expects_rx_packets()
+
+
+def microseconds(function, *args) -> float:
+    """Return the best observed time of a call in microseconds."""
+    best_s = min(repeat(lambda: function(*args), number=2000, repeat=5)) / 2000
+    return best_s * 1e6
+
+
+def main():
+    """Print the per-instruction overhead before and after the registry."""
+    packet = NPCPacket(90, 0, (14,))
+    device = UOSDevice(
+        Devices.arduino_nano, "bench", Interface.STUB, loading=Loading.EAGER
+    )
+    results = {
+        "legacy lookups": microseconds(legacy_instruction_lookups, packet),
+        "registry lookups": microseconds(instruction_lookups, packet),
+        "stub get_adc_input": microseconds(device.get_adc_input, 14),
+    }
+    device.close()
+    for name, time_us in results.items():
+        print(f"{name:<24}{time_us:8.2f} us/instruction")
+
+
+if __name__ == "__main__":
+    main()
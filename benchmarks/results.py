@@ -0,0 +1,90 @@
+"""Benchmark the memory allocated by executing instructions.
+
+ADC sampling instructions are executed through ``UOSDevice`` on the stub
+interface, so results are built by the interface as they would be from
+hardware. The memory retained by each result is traced while a history of
+results is kept, along with the peak memory allocated while executing each
+instruction. The retained memory is compared against results held as the
+lists of ints used by ``ComResult`` in 0.6. Run with
+``python -m benchmarks.results``.
+"""
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from uoshardware import Loading
+from uoshardware.abstractions import ComResult, NPCPacket
+from uoshardware.api import UOSDevice
+from uoshardware.devices import Devices
+from uoshardware.interface import Interface
+
+HISTORY = 10000  # instructions executed per measurement
+ADC_PINS = [14, 15, 16, 17, 18, 19, 20, 21]
+
+
+@dataclass
+class LegacyComResult:
+    """``ComResult`` as implemented in 0.6, frames held as lists of ints."""
+
+    status: bool
+    exception: str = ""
+    ack_packet: list = field(default_factory=list)
+    rx_packets: list = field(default_factory=list)
+    tx_packet: NPCPacket | None = None
+
+
+def legacy_result(result: ComResult) -> LegacyComResult:
+    """Convert a result to the lists the 0.6 interfaces decoded frames into."""
+    return LegacyComResult(
+        result.status,
+        result.exception,
+        list(result.ack_packet),
+        [list(frame) for frame in result.rx_packets],
+        result.tx_packet,
+    )
+
+
+def retained_bytes(build: Callable[[], ComResult | LegacyComResult]) -> float:
+    """Return the bytes per result still allocated after building a history."""
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    history = [build() for _ in range(HISTORY)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert all(result.status for result in history)
+    return (end - start) / HISTORY
+
+
+def peak_bytes(device: UOSDevice) -> float:
+    """Return the mean peak of the bytes allocated executing an instruction."""
+    total = 0
+    tracemalloc.start()
+    for _ in range(HISTORY):
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        assert device.get_adc_inputs(ADC_PINS).status
+        _, peak = tracemalloc.get_traced_memory()
+        total += peak - start
+    tracemalloc.stop()
+    return total / HISTORY
+
+
+def main():
+    """Print the memory allocated per executed instruction."""
+    with UOSDevice(
+        Devices.arduino_nano, "bench", Interface.STUB, loading=Loading.EAGER
+    ) as device:
+        # Only the instruction's own allocations are traced, not its metrics.
+        device.metrics.enabled = False
+        device.get_adc_inputs(ADC_PINS)  # warm up the per-device caches
+        legacy_bytes = retained_bytes(
+            lambda: legacy_result(device.get_adc_inputs(ADC_PINS))
+        )
+        print(f"{'legacy retained':<24}{legacy_bytes:8.1f} bytes/result")
+        current_bytes = retained_bytes(lambda: device.get_adc_inputs(ADC_PINS))
+        print(f"{'retained':<24}{current_bytes:8.1f} bytes/result")
+        print(f"{'peak':<24}{peak_bytes(device):8.1f} bytes/instruction")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Benchmark suite for the instruction path with stored baselines.
+
+Each case measures a stage of executing instructions, from encoding and
+decoding packets through to full round trips over a simulated serial link.
+Results can be saved as a baseline and later runs compared against it, so
+regressions in latency are visible. Baselines are only comparable on the
+machine that recorded them.
+
+Run with ``python -m benchmarks.suite``, see ``--help`` for options.
+"""
+import argparse
+import copy
+import json
+import platform
+import sys
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from fnmatch import fnmatch
+from pathlib import Path
+from timeit import Timer
+from typing import Any
+
+from uoshardware import Loading, Persistence
+from uoshardware.abstractions import ComResult, NPCPacket, UOSFunctions
+from uoshardware.api import UOSDevice
+from uoshardware.decoder import NPCDecoder
+from uoshardware.devices import Devices
+from uoshardware.interface import Interface
+from uoshardware.simulator import FirmwareSimulator
+
+BASELINE = Path(__file__).with_name("baseline.json")
+CASES: dict[str, Callable[[], AbstractContextManager]] = {}
+ADC_ADDRESS = UOSFunctions.get_adc_input.address_lut[Persistence.NONE]
+GPIO_ADDRESS = UOSFunctions.get_gpio_input.address_lut[Persistence.NONE]
+# A response with 8 ADC readings, typical of the largest routine response.
+ADC_PINS = (14, 15, 16, 17, 18, 19, 20, 21)
+ADC_RESPONSE = (
+    NPCPacket(0, ADC_ADDRESS, (0,)).packet
+    + NPCPacket(0, ADC_ADDRESS, tuple(range(16))).packet
+)
+DEVICE_CALLS = {
+    UOSFunctions.set_gpio_output.name: ("set_gpio_output", (13, 1)),
+    UOSFunctions.get_gpio_input.name: ("get_gpio_input", (13,)),
+    UOSFunctions.get_adc_input.name: ("get_adc_input", (14,)),
+    UOSFunctions.reset_all_io.name: ("reset_all_io", ()),
+    UOSFunctions.hard_reset.name: ("hard_reset", ()),
+    UOSFunctions.get_system_info.name: ("get_system_info", ()),
+}
+
+
+def case(name: str):
+    """Register a benchmark case.
+
+    Cases are context manager factories yielding the operation to time, or
+    None if the case can't run on this system.
+
+    :param name: The unique name of the case.
+    """
+
+    def register(function):
+        CASES[name] = contextmanager(function)
+        return function
+
+    return register
+
+
+@case("encode.npc_packet")
+def encode_packet() -> Iterator[Callable]:
+    """Encode a single instruction packet."""
+    yield lambda: NPCPacket(60, 0, (13, 1))
+
+
+@case("encode.sequence_64")
+def encode_sequence() -> Iterator[Callable]:
+    """Encode a sequence of 64 instructions into one buffer."""
+    frames = [(60, 0, (pin, pin % 2)) for pin in range(2, 18)] * 4
+    yield lambda: NPCPacket.encode_sequence(frames)
+
+
+@case("checksum.adc_response")
+def checksum() -> Iterator[Callable]:
+    """Compute the LRC checksum of an 8 channel ADC response."""
+    data = ADC_RESPONSE[len(ADC_RESPONSE) // 2 + 1 : -2]
+    yield lambda: NPCPacket.get_npc_checksum(data)
+
+
+@case("decode.adc_response")
+def decode() -> Iterator[Callable]:
+    """Decode an ACK and 8 channel ADC response into a result."""
+    decoder = NPCDecoder()
+
+    def operation():
+        decoder.feed(ADC_RESPONSE)
+        return decoder.pop_result(2)
+
+    yield operation
+
+
+@contextmanager
+def stub_device() -> Iterator[UOSDevice]:
+    """Open an eagerly loaded stub device."""
+    device = UOSDevice(
+        Devices.arduino_nano, "benchmark", Interface.STUB, loading=Loading.EAGER
+    )
+    try:
+        yield device
+    finally:
+        device.close()
+
+
+def register_stub_instructions():
+    """Register a stub round trip case for each implemented UOS function."""
+    for function in UOSFunctions.enumerate_functions():
+        if function.name not in DEVICE_CALLS:
+            continue
+        method, args = DEVICE_CALLS[function.name]
+
+        def stub_instruction(method=method, args=args) -> Iterator[Callable]:
+            """Execute an instruction on the stub interface."""
+            with stub_device() as device:
+                yield lambda: getattr(device, method)(*args)
+
+        case(f"stub.{function.name}")(stub_instruction)
+
+
+register_stub_instructions()
+
+
+@case("stub.get_adc_inputs_8")
+def stub_adc_inputs() -> Iterator[Callable]:
+    """Read 8 ADC channels with one instruction on the stub interface."""
+    with stub_device() as device:
+        yield lambda: device.get_adc_inputs(ADC_PINS)
+
+
+@case("samples.update_adc_8")
+def update_adc_samples() -> Iterator[Callable]:
+    """Update 8 pins from an ADC response."""
+    decoder = NPCDecoder()
+    decoder.feed(ADC_RESPONSE)
+    result = decoder.pop_result(2)
+    result.tx_packet = NPCPacket(ADC_ADDRESS, 0, ADC_PINS)
+    device = copy.deepcopy(Devices.arduino_nano)  # leave the shared pins alone
+    yield lambda: device.update_adc_samples(result)
+
+
+@case("samples.update_gpio_8")
+def update_gpio_samples() -> Iterator[Callable]:
+    """Update 8 pins from a GPIO response."""
+    pins = tuple(range(2, 10))
+    result = ComResult(
+        True,
+        rx_packets=[NPCPacket(0, GPIO_ADDRESS, (1,) * len(pins)).packet],
+        tx_packet=NPCPacket(
+            GPIO_ADDRESS, 0, tuple(v for pin in pins for v in (pin, 0))
+        ),
+    )
+    device = copy.deepcopy(Devices.arduino_nano)  # leave the shared pins alone
+    yield lambda: device.update_gpio_samples(result)
+
+
+@case("serial.get_adc_input")
+def serial_round_trip() -> Iterator[Callable | None]:
+    """Execute an instruction over a pty serial link to the firmware simulator."""
+    if platform.system() != "Linux":
+        yield None
+        return
+    with FirmwareSimulator(Devices.arduino_nano, baudrate=0) as simulator:
+        with UOSDevice(
+            Devices.arduino_nano,
+            simulator.address,
+            Interface.SERIAL,
+            loading=Loading.EAGER,
+        ) as device:
+            yield lambda: device.get_adc_input(14)
+
+
+def measure(operation: Callable, min_time_s: float = 0.2, repeat: int = 5) -> float:
+    """Return the best observed time of an operation in seconds.
+
+    :param operation: The operation to time.
+    :param min_time_s: The minimum duration of each timed run.
+    :param repeat: The number of timed runs.
+    """
+    timer = Timer(operation)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time_s / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(pattern: str = "*", min_time_s: float = 0.2) -> dict[str, dict]:
+    """Run the matching benchmark cases.
+
+    :param pattern: Glob selecting the case names to run.
+    :param min_time_s: The minimum duration of each timed run.
+    :return: Dictionary of case name to results.
+    """
+    results = {}
+    for name, factory in CASES.items():
+        if not fnmatch(name, pattern):
+            continue
+        with factory() as operation:
+            if operation is None:
+                continue
+            seconds = measure(operation, min_time_s)
+        results[name] = {"us": seconds * 1e6, "ops_per_s": 1 / seconds}
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Find cases that are slower than the baseline.
+
+    :param results: Results from ``run``.
+    :param baseline: Results saved from a previous run.
+    :param threshold: The fractional slowdown allowed, 0.25 is 25% slower.
+    :return: The names of cases that regressed.
+    """
+    return [
+        name
+        for name, result in results.items()
+        if name in baseline["cases"]
+        and result["us"] > baseline["cases"][name]["us"] * (1 + threshold)
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the suite, printing results against the baseline.
+
+    :param argv: Command line arguments.
+    :return: Exit code, 1 if any case regressed.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--filter", default="*", help="glob of cases to run")
+    parser.add_argument(
+        "--save", action="store_true", help="save the results to the baseline"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    results = run(args.filter, args.min_time)
+    # Saved baselines also record the python version and platform.
+    baseline: dict[str, Any] = {"cases": {}}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline, args.threshold)
+    for name, result in results.items():
+        change = ""
+        if name in baseline["cases"]:
+            ratio = result["us"] / baseline["cases"][name]["us"] - 1
+            change = f"{ratio:+8.1%}{' REGRESSED' if name in regressions else ''}"
+        print(
+            f"{name:<32}{result['us']:10.2f} us{result['ops_per_s']:12.0f} ops/s"
+            f"  {change}"
+        )
+    if args.save:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    # Cases that weren't run keep their saved results.
+                    "cases": baseline["cases"] | results,
+                },
+                indent=2,
+                sort_keys=True,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,3 +11,28 @@ class Packet:
     payload: list
     checksum: int
     binary: bytes
+
+
+TEST_PACKETS = [
+    Packet(
+        address_to=0,
+        address_from=1,
+        payload=[1],
+        checksum=253,
+        binary=b">\x00\x01\x01\x01\xfd<",
+    ),
+    Packet(
+        address_to=64,
+        address_from=0,
+        payload=[13, 0, 1, 12, 1, 0],
+        checksum=159,
+        binary=b">\x40\x00\x06\x0d\x00\x01\x0c\x01\x00\x9f<",
+    ),
+    Packet(  # Bad packet
+        address_to=256,
+        address_from=256,
+        payload=[],
+        checksum=0,
+        binary=b"",
+    ),
+]
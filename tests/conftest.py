@@ -19,6 +19,12 @@ DEVICES = {
         "interface": Interface.STUB,
         "loading": Loading.EAGER,
     },
+    "Arduino Nano 3 KEEP_ALIVE": {
+        "identity": Devices.arduino_nano,
+        "address": "/dev/ttyUSB0",
+        "interface": Interface.STUB,
+        "loading": Loading.KEEP_ALIVE,
+    },
 }
 
 
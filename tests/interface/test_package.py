@@ -1,11 +1,28 @@
 """Module for testing the interface package."""
-from time import sleep
+import asyncio
+import io
+import os
+import platform
+import threading
+from time import monotonic_ns, sleep
 
 import pytest
+import serial
+from serial.tools.list_ports_common import ListPortInfo
 
 from uoshardware import UOSCommunicationError
 from uoshardware.abstractions import NPCPacket
-from uoshardware.interface.serial import Serial
+from uoshardware.decoder import NPCDecoder
+from uoshardware.devices import Devices
+from uoshardware.firmware import ACK_ERROR
+from uoshardware.interface import serial as serial_interface
+from uoshardware.interface.serial import (
+    PORT_INVENTORY,
+    AsyncSerial,
+    PortInventory,
+    Serial,
+)
+from uoshardware.interface.stub import Stub, StubSimulation
 
 # Allow access to protected members in test module.
 # Intended as protected only for safety in client code.
@@ -59,3 +76,297 @@ class TestSerialPort:
             invalid_serial_port.execute_instruction(NPCPacket(64, 0, (13, 0, 1)))
         with pytest.raises(UOSCommunicationError):
             invalid_serial_port.read_response(expect_packets=1, timeout_s=1)
+
+
+class BufferedDevice:
+    """Minimal stand-in for a pyserial device with a pre-loaded rx buffer."""
+
+    def __init__(self, rx_data: bytes, chunk_size: int | None = None):
+        """Load the bytes that will be returned from reads.
+
+        :param rx_data: The bytes received.
+        :param chunk_size: Limits the bytes available to each read.
+        """
+        self.rx_data = rx_data
+        self.chunk_size = chunk_size
+        self.timeout = None
+        self.reads = 0
+
+    @property
+    def in_waiting(self) -> int:
+        """Bytes available for reading without blocking."""
+        return len(self.rx_data)
+
+    def read(self, size: int) -> bytes:
+        """Return up to size bytes, an empty read simulates the timeout."""
+        self.reads += 1
+        if self.chunk_size is not None:
+            size = min(size, self.chunk_size)
+        data, self.rx_data = self.rx_data[:size], self.rx_data[size:]
+        return data
+
+    def reset_input_buffer(self):
+        """Discard the unread bytes."""
+        self.rx_data = b""
+
+    def fileno(self) -> int:
+        """Raise like a port without a file descriptor."""
+        raise io.UnsupportedOperation("fileno")
+
+
+def test_read_response_returns_on_completion():
+    """Checks read response returns as soon as the expected packets arrive."""
+    serial_port = Serial("not_a_valid_connection")
+    response = NPCPacket(0, 61, (0,)).packet + NPCPacket(0, 61, (1,)).packet
+    serial_port._device = BufferedDevice(response)
+    start_ns = monotonic_ns()
+    result = serial_port.read_response(expect_packets=2, timeout_s=2)
+    assert monotonic_ns() - start_ns < 50000000  # well under the old 50ms floor
+    assert result.status
+    assert result.ack_packet == NPCPacket(0, 61, (0,)).packet
+    assert result.get_rx_payload(0) == [1]
+    assert serial_port._device.reads == 1  # whole response taken in one read
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="Requires a pty")
+def test_read_response_waits_on_port(monkeypatch):
+    """Checks the port timeout is set once while waiting for each frame."""
+    controller, peripheral = os.openpty()
+    serial_port = Serial("not_a_valid_connection")
+    serial_port._device = serial.Serial(os.ttyname(peripheral))
+    reconfigurations = []
+    reconfigure = serial_port._device._reconfigure_port
+    monkeypatch.setattr(
+        serial_port._device,
+        "_reconfigure_port",
+        lambda *args: reconfigurations.append(args) or reconfigure(*args),
+    )
+    frames = [NPCPacket(0, 90, (0,)).packet, NPCPacket(0, 90, (1, 2)).packet]
+
+    def respond_later():
+        for frame in frames:
+            sleep(0.01)  # the read waits for each frame separately
+            os.write(controller, frame)
+
+    responder = threading.Thread(target=respond_later)
+    try:
+        responder.start()
+        result = serial_port.read_response(expect_packets=2, timeout_s=2)
+        assert result.status
+        assert result.get_rx_payload(0) == [1, 2]
+        assert len(reconfigurations) == 1
+        start_ns = monotonic_ns()
+        assert not serial_port.read_response(expect_packets=1, timeout_s=0.05).status
+        assert 50_000_000 <= monotonic_ns() - start_ns < 1_000_000_000
+    finally:
+        responder.join()
+        serial_port._device.close()
+        os.close(controller)
+        os.close(peripheral)
+
+
+def test_read_response_timeout():
+    """Checks partial responses time out with a failed result."""
+    serial_port = Serial("not_a_valid_connection")
+    serial_port._device = BufferedDevice(NPCPacket(0, 61, (0,)).packet)
+    result = serial_port.read_response(expect_packets=2, timeout_s=0.01)
+    assert not result.status
+    assert result.exception
+
+
+def test_read_response_checksum():
+    """Checks a response with a bad checksum is read in full before failing."""
+    serial_port = Serial("not_a_valid_connection")
+    corrupt_ack = bytearray(NPCPacket(0, 61, (0,)).packet)
+    corrupt_ack[-2] ^= 0xFF
+    response = bytes(corrupt_ack) + NPCPacket(0, 61, (1,)).packet
+    serial_port._device = BufferedDevice(response, chunk_size=len(corrupt_ack))
+    result = serial_port.read_response(expect_packets=2, timeout_s=2)
+    assert not result.status
+    assert result.exception == NPCDecoder.CHECKSUM_ERROR
+    assert serial_port._device.rx_data == b""  # the data frame wasn't left behind
+    assert not serial_port._decoder.frames
+
+
+def test_reset_input():
+    """Checks unread data is discarded from the port and the decoder."""
+    serial_port = Serial("not_a_valid_connection")
+    serial_port.reset_input()  # safe while closed
+    serial_port._device = BufferedDevice(NPCPacket(0, 61, (1,)).packet)
+    serial_port._decoder.feed(NPCPacket(0, 90, (0,)).packet)
+    serial_port.reset_input()
+    assert not serial_port._decoder.frames
+    assert serial_port._device.rx_data == b""
+    assert not serial_port.read_response(expect_packets=1, timeout_s=0).status
+    stub = Stub("STUB", simulation=StubSimulation(latency_s=0.01))
+    stub.open()
+    stub.execute_instruction(NPCPacket(61, 0, (13, 0)))
+    stub.reset_input()
+    assert not stub.read_response(2, 0.05).status
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="Requires a pty")
+def test_async_read_response():
+    """Checks the asyncio serial interface is woken by the event loop."""
+    controller, peripheral = os.openpty()
+    async_serial = AsyncSerial("not_a_valid_connection")
+    async_serial._serial._device = serial.Serial(os.ttyname(peripheral), timeout=0)
+    response = NPCPacket(0, 90, (0,)).packet + NPCPacket(0, 90, (1, 2)).packet
+
+    async def respond_later():
+        read_task = asyncio.create_task(async_serial.read_response(2, 2))
+        await asyncio.sleep(0.01)  # let the read start waiting on the port
+        os.write(controller, response)
+        return await read_task
+
+    try:
+        result = asyncio.run(respond_later())
+        assert result.status
+        assert result.get_rx_payload(0) == [1, 2]
+        timed_out = asyncio.run(async_serial.read_response(1, 0.01))
+        assert not timed_out.status
+    finally:
+        async_serial._serial._device.close()
+        os.close(controller)
+        os.close(peripheral)
+
+
+def test_async_wait_without_descriptor():
+    """Checks ports that can't be watched are polled instead."""
+    start_ns = monotonic_ns()
+    asyncio.run(AsyncSerial._wait_readable(BufferedDevice(b""), 1))
+    assert monotonic_ns() - start_ns < 500_000_000
+
+
+def test_async_fault_cases():
+    """Checks the asyncio serial interface fails correctly when not open."""
+    async_serial = AsyncSerial("not_a_valid_connection")
+    assert not async_serial.is_active()
+    with pytest.raises(UOSCommunicationError):
+        asyncio.run(async_serial.open())
+    with pytest.raises(UOSCommunicationError):
+        asyncio.run(async_serial.execute_instruction(NPCPacket(61, 0, (13, 0, 1))))
+    with pytest.raises(UOSCommunicationError):
+        asyncio.run(async_serial.read_response(expect_packets=1, timeout_s=1))
+    with pytest.raises(UOSCommunicationError):
+        asyncio.run(async_serial.hard_reset())
+
+
+def test_port_inventory_cache(monkeypatch):
+    """Checks ports are only enumerated when the cache is stale or invalidated."""
+    enumerations = []
+
+    def comports():
+        enumerations.append(None)
+        return [ListPortInfo("/dev/ttyFAKE0", skip_link_detection=True)]
+
+    monkeypatch.setattr(serial_interface.list_ports, "comports", comports)
+    inventory = PortInventory(ttl_s=60)
+    assert inventory.find("/dev/ttyFAKE0") is not None
+    assert inventory.find("ttyFAKE0") is not None
+    assert len(inventory.get_ports()) == 1
+    assert len(enumerations) == 1  # served from the cache
+    assert inventory.find("/dev/ttyMISSING") is None
+    assert len(enumerations) == 2  # misses re-enumerate once
+    inventory.invalidate()
+    inventory.get_ports()
+    assert len(enumerations) == 3
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="Requires a pty")
+def test_check_port_exists_fast_path(monkeypatch):
+    """Checks existing device nodes are found without enumerating ports."""
+
+    def comports():
+        raise AssertionError("Ports shouldn't be enumerated for existing nodes.")
+
+    monkeypatch.setattr(serial_interface.list_ports, "comports", comports)
+    controller, peripheral = os.openpty()
+    try:
+        port = Serial.check_port_exists(os.ttyname(peripheral))
+        assert port is not None
+        assert port.device == os.ttyname(peripheral)
+    finally:
+        os.close(controller)
+        os.close(peripheral)
+    monkeypatch.setattr(serial_interface.list_ports, "comports", list)
+    PORT_INVENTORY.invalidate()
+    for path in ("/tmp", __file__):  # only character devices are ports
+        assert Serial.check_port_exists(path) is None
+
+
+def test_stub_state():
+    """Checks the stub keeps pin state and sizes responses like firmware."""
+    stub = Stub("STUB", model=Devices.arduino_nano)
+    stub.open()
+    stub.execute_instruction(NPCPacket(60, 0, (13, 1)))
+    assert stub.read_response(1, 0).status
+    stub.execute_instruction(NPCPacket(61, 0, (13, 0, 12, 1)))
+    result = stub.read_response(2, 0)
+    assert result.get_rx_payload(0) == [1, 1]  # output and pull up
+    stub.execute_instruction(NPCPacket(90, 0, (14, 15, 16)))
+    assert len(stub.read_response(2, 0).get_rx_payload(0)) == 6
+    stub.execute_instruction(NPCPacket(90, 0, (2,)))  # not an ADC pin
+    result = stub.read_response(2, 0)
+    assert not result.status
+    assert result.ack_packet == NPCPacket(0, 90, (ACK_ERROR,)).packet
+    assert stub.hard_reset().status
+    stub.execute_instruction(NPCPacket(61, 0, (13, 0)))
+    assert stub.read_response(2, 0).get_rx_payload(0) == [0]
+
+
+def test_stub_latency():
+    """Checks responses are only readable once the simulated latency passes."""
+    stub = Stub("STUB", simulation=StubSimulation(latency_s=0.05, jitter_s=0.01))
+    stub.open()
+    stub.execute_instruction(NPCPacket(61, 0, (13, 0)))
+    assert not stub.read_response(2, 0).status  # not arrived yet
+    start_ns = monotonic_ns()
+    assert stub.read_response(2, 1).status
+    assert monotonic_ns() - start_ns < 1_000_000_000
+
+
+@pytest.mark.parametrize(
+    "simulation, fault",
+    [
+        (StubSimulation(drop_rate=1), "dropped"),
+        (StubSimulation(corrupt_rate=1), "corrupted"),
+        (StubSimulation(truncate_rate=1), "truncated"),
+    ],
+)
+def test_stub_faults(simulation: StubSimulation, fault: str):
+    """Checks injected faults stop responses being received."""
+    stub = Stub("STUB", simulation=simulation)
+    stub.open()
+    for _ in range(10):
+        stub.execute_instruction(NPCPacket(90, 0, (14, 15)))
+        assert not stub.read_response(2, 0).status
+        assert stub.hard_reset().status  # flush partial frames
+    assert stub.faults[fault] == 10
+    assert sum(stub.faults.values()) == 10
+
+
+@pytest.mark.parametrize(
+    "simulation",
+    [StubSimulation(drop_rate=1), StubSimulation(truncate_rate=1)],
+)
+def test_stub_missing_waits(simulation: StubSimulation):
+    """Checks missing responses are waited for until the timeout."""
+    stub = Stub("STUB", simulation=simulation)
+    stub.open()
+    stub.execute_instruction(NPCPacket(90, 0, (14, 15)))
+    start_ns = monotonic_ns()
+    assert not stub.read_response(2, 0.05).status
+    assert monotonic_ns() - start_ns >= 50_000_000
+
+
+def test_stub_fault_rate():
+    """Checks seeded faults occur at roughly the configured rate."""
+    stub = Stub("STUB", simulation=StubSimulation(drop_rate=0.2, seed=1))
+    stub.open()
+    received = 0
+    for _ in range(500):
+        stub.execute_instruction(NPCPacket(61, 0, (13, 0)))
+        received += stub.read_response(2, 0).status
+    assert received + stub.faults["dropped"] == 500
+    assert 50 < stub.faults["dropped"] < 150
@@ -1,33 +1,15 @@
 """Unit tests for the `abstractions` module."""
 import pytest
 
-from tests import Packet
-from uoshardware import UOSUnsupportedError
-from uoshardware.abstractions import NPCPacket, UOSFunction, UOSFunctions, UOSInterface
-
-TEST_PACKETS = [
-    Packet(
-        address_to=0,
-        address_from=1,
-        payload=[1],
-        checksum=253,
-        binary=b">\x00\x01\x01\x01\xfd<",
-    ),
-    Packet(
-        address_to=64,
-        address_from=0,
-        payload=[13, 0, 1, 12, 1, 0],
-        checksum=159,
-        binary=b">\x40\x00\x06\x0d\x00\x01\x0c\x01\x00\x9f<",
-    ),
-    Packet(  # Bad packet
-        address_to=256,
-        address_from=256,
-        payload=[],
-        checksum=0,
-        binary=b"",
-    ),
-]
+from tests import TEST_PACKETS, Packet
+from uoshardware import UOSRuntimeError, UOSUnsupportedError
+from uoshardware.abstractions import (
+    ComResult,
+    NPCPacket,
+    UOSFunction,
+    UOSFunctions,
+    UOSInterface,
+)
 
 
 def test_execute_instruction():
@@ -141,3 +123,60 @@ def test_get_npc_packet(test_packet: Packet):
 def test_get_uos_function_from_address(address: int, function: UOSFunction):
     """Checks the function for looking up a function from its UOS addr."""
     assert UOSFunctions.get_from_address(address) == function
+
+
+def test_uos_function_registry():
+    """Checks the function registry lookups by name and address."""
+    functions = UOSFunctions.enumerate_functions()
+    assert UOSFunctions.set_gpio_output in functions
+    for function in functions:
+        assert UOSFunctions.get_from_name(function.name) is function
+        for volatility, address in function.address_lut.items():
+            assert UOSFunctions.get_from_address(address) is function
+            assert UOSFunctions.get_volatility_from_address(address) == volatility
+    assert UOSFunctions.get_from_name("bad_function") is None
+    assert UOSFunctions.get_volatility_from_address(257) is None
+
+
+def test_encode_into():
+    """Checks frames are encoded directly into caller supplied buffers."""
+    frames = [
+        (packet.address_to, packet.address_from, tuple(packet.payload))
+        for packet in TEST_PACKETS[:2]
+    ]
+    expected = TEST_PACKETS[0].binary + TEST_PACKETS[1].binary
+    assert NPCPacket.encode_sequence(frames) == expected
+    buffer = bytearray(len(expected) + 2)
+    assert NPCPacket.encode_into(memoryview(buffer), 2, frames) == len(buffer)
+    assert buffer[2:] == expected
+    with pytest.raises(UOSRuntimeError):
+        NPCPacket.encode_into(buffer, 3, frames)  # overflows the buffer
+    for frame in [(256, 0, ()), (0, -1, ()), (0, 0, (256,)), (0, 0, (-1,))]:
+        with pytest.raises(UOSRuntimeError):
+            NPCPacket.encode_sequence([frame])
+        with pytest.raises(UOSRuntimeError):
+            NPCPacket.encode_into(bytearray(8), 0, [frame])
+    for to_address, payload in [(-1, ()), (0, (256,))]:
+        with pytest.raises(UOSRuntimeError):
+            NPCPacket(to_address, 0, payload)
+
+
+def test_com_result_accessors():
+    """Checks rx payloads are exposed as views with typed accessors."""
+    frame = NPCPacket(0, 64, (0x01, 0xFF, 0x80, 0x00)).packet
+    result = ComResult(True, rx_packets=[frame])
+    assert not hasattr(result, "__dict__")  # slotted
+    payload = result.get_rx_payload_view(0)
+    assert payload.obj is frame  # a view not a copy
+    assert payload == b"\x01\xff\x80\x00"
+    assert result.get_rx_payload(0) == [0x01, 0xFF, 0x80, 0x00]
+    assert result.get_rx_int(0, offset=0, size=2) == 0x01FF
+    assert result.get_rx_int(0, offset=2, size=2, signed=True) == -0x8000
+    assert result.get_rx_ints(0) == [0x01, 0xFF, 0x80, 0x00]
+    assert result.get_rx_ints(0, size=2) == [0x01FF, 0x8000]
+    with pytest.raises(UOSRuntimeError):
+        result.get_rx_int(0, offset=3, size=2)
+    with pytest.raises(UOSRuntimeError):
+        result.get_rx_ints(0, size=3)
+    with pytest.raises(UOSRuntimeError):
+        result.get_rx_payload(1)
@@ -0,0 +1,81 @@
+"""Tests for the continuous acquisition module."""
+from threading import Thread
+from time import sleep
+
+import pytest
+
+from uoshardware import UOSCommunicationError, UOSRuntimeError, UOSUnsupportedError
+from uoshardware.abstractions import ComResult, UOSFunctions
+from uoshardware.acquisition import ADCStream
+from uoshardware.api import UOSDevice
+
+
+def test_stream_adc(uos_device: UOSDevice):
+    """Checks batches are acquired for every pin at the target rate."""
+    pins = sorted(uos_device.get_compatible_pins(UOSFunctions.get_adc_input))
+    with uos_device.stream_adc(pins, rate_hz=100, max_batches=10) as stream:
+        batches = list(stream)
+    assert len(batches) == 10
+    assert all(batch.pins == tuple(pins) for batch in batches)
+    assert all(len(batch.values) == len(pins) for batch in batches)
+    assert stream.stats.batches == 10
+    # A stalled test runner can miss periods, each one must be accounted for.
+    sequences = [batch.sequence for batch in batches]
+    assert sequences == sorted(set(sequences))
+    assert sequences[-1] + 1 == stream.stats.batches + stream.stats.dropped
+    assert stream.stats.achieved_rate_hz == pytest.approx(
+        100 * 9 / (9 + stream.stats.dropped), rel=0.3
+    )
+    assert uos_device.get_pin(pins[0]).adc_reading is not None
+
+
+def test_stream_adc_backpressure(uos_device: UOSDevice):
+    """Checks periods missed by a slow consumer are dropped, not burst."""
+    pins = sorted(uos_device.get_compatible_pins(UOSFunctions.get_adc_input))
+    with uos_device.stream_adc(pins[:1], rate_hz=200) as stream:
+        next(stream)
+        sleep(0.026)  # miss about 5 periods
+        batch = next(stream)
+    assert stream.stats.dropped >= 4
+    assert stream.stats.late >= 1
+    assert batch.sequence == 1 + stream.stats.dropped
+    with pytest.raises(StopIteration):
+        next(stream)  # closed streams stop
+
+
+def test_stream_adc_shared(uos_device: UOSDevice):
+    """Checks the device can be used by other threads between batches."""
+    pins = sorted(uos_device.get_compatible_pins(UOSFunctions.get_adc_input))
+    results = []
+    with uos_device.stream_adc(pins[:1], rate_hz=100) as stream:
+        next(stream)
+        reader = Thread(
+            target=lambda: results.append(uos_device.get_adc_input(pins[0]))
+        )
+        reader.start()
+        reader.join(timeout=1)
+        assert results and results[0].status
+        assert next(stream).sequence >= 1
+
+
+def test_stream_adc_invalid(uos_device: UOSDevice):
+    """Checks streams are validated when created."""
+    with pytest.raises(UOSUnsupportedError):
+        uos_device.stream_adc([-1], rate_hz=10)
+    with pytest.raises(UOSRuntimeError):
+        uos_device.stream_adc([], rate_hz=10)
+    pins = sorted(uos_device.get_compatible_pins(UOSFunctions.get_adc_input))
+    with pytest.raises(UOSRuntimeError):
+        uos_device.stream_adc(pins, rate_hz=0)
+
+
+def test_stream_failure():
+    """Checks failed instructions end the stream with an error."""
+    stream = ADCStream(
+        lambda: ComResult(False, exception="timed out"),
+        pins=(1,),
+        rate_hz=10,
+        scale=1,
+    )
+    with pytest.raises(UOSCommunicationError):
+        next(stream)
@@ -1,14 +1,31 @@
 """Unit tests for the api module."""
 from inspect import signature
+from time import monotonic, sleep
 
 import pytest
 
-from uoshardware import Loading, Persistence, UOSCommunicationError, UOSUnsupportedError
-from uoshardware.abstractions import Device, UOSFunction, UOSFunctions, UOSInterface
+from uoshardware import (
+    Loading,
+    Persistence,
+    UOSCircuitOpenError,
+    UOSCommunicationError,
+    UOSRuntimeError,
+    UOSUnsupportedError,
+)
+from uoshardware.abstractions import (
+    Device,
+    InstructionArguments,
+    NPCPacket,
+    UOSFunction,
+    UOSFunctions,
+    UOSInterface,
+)
 from uoshardware.api import UOSDevice, enumerate_system_devices, get_device_definition
 from uoshardware.devices import Devices
 from uoshardware.interface import Interface
-from uoshardware.interface.stub import Stub
+from uoshardware.interface.stub import Stub, StubSimulation
+from uoshardware.retry import CircuitBreaker
+from uoshardware.timeouts import AdaptiveTimeout
 
 
 def test_implemented_devices(uos_identities: dict):
@@ -55,7 +72,7 @@ def test_bad_connection(uos_identities: dict, interface: Interface):
             interface=interface,
             loading=uos_identities["loading"],
         )
-        if device.loading == Loading.LAZY:  # lazy connection so manually open
+        if device.loading != Loading.EAGER:  # connection not opened on creation
             device.open()
 
 
@@ -154,3 +171,287 @@ def test_enumerate_devices():
     # Test with a secondary filter.
     devices = enumerate_system_devices(Interface.SERIAL)
     assert len(devices) >= 0  # Basically just check this case doesn't error
+
+
+def test_get_gpio_inputs(uos_device: UOSDevice):
+    """Checks multiple GPIO pins are read with a single instruction."""
+    pins = sorted(uos_device.get_compatible_pins(UOSFunctions.get_gpio_input))
+    for pin in pins:
+        uos_device.get_pin(pin).gpio_reading = None
+    result = uos_device.get_gpio_inputs(pins, pull_ups=True)
+    assert result.status
+    assert len(result.rx_packets) == 1
+    assert len(result.get_rx_payload(0)) == len(pins)
+    assert result.tx_packet is not None
+    assert result.tx_packet.payload == tuple(
+        value for pin in pins for value in (pin, 1)
+    )
+    assert all(uos_device.get_pin(pin).gpio_reading is not None for pin in pins)
+
+
+def test_get_gpio_inputs_chunked(uos_device: UOSDevice):
+    """Checks reads that don't fit in one packet are split up."""
+    result = uos_device.get_gpio_inputs([13] * 200)
+    assert result.status
+    assert [len(packet) - 6 for packet in result.rx_packets] == [127, 73]
+
+
+def test_get_gpio_inputs_invalid(uos_device: UOSDevice):
+    """Checks invalid batched GPIO reads are rejected."""
+    with pytest.raises(UOSUnsupportedError):
+        uos_device.get_gpio_inputs([13, -1])
+    with pytest.raises(UOSRuntimeError):
+        uos_device.get_gpio_inputs([13, 12], pull_ups=[True])
+    with pytest.raises(UOSRuntimeError):
+        uos_device.get_gpio_inputs([])
+
+
+def test_get_adc_inputs(uos_device: UOSDevice):
+    """Checks all ADC channels are read with a single instruction."""
+    pins = sorted(uos_device.get_compatible_pins(UOSFunctions.get_adc_input))
+    for pin in pins:
+        uos_device.get_pin(pin).adc_reading = None
+    result = uos_device.get_adc_inputs(pins)
+    assert result.status
+    assert len(result.rx_packets) == 1
+    assert len(result.get_rx_payload(0)) == 2 * len(pins)
+    assert all(uos_device.get_pin(pin).adc_reading is not None for pin in pins)
+    # Responses are also limited by the payload size, 2 bytes per channel.
+    result = uos_device.get_adc_inputs([pins[0]] * 130)
+    assert result.status
+    assert [len(packet) - 6 for packet in result.rx_packets] == [254, 6]
+    with pytest.raises(UOSUnsupportedError):
+        uos_device.get_adc_inputs([pins[0], 2])
+
+
+def test_set_gpio_outputs(uos_device: UOSDevice):
+    """Checks multiple GPIO outputs are set with a single instruction."""
+    levels = {
+        pin: pin % 2
+        for pin in uos_device.get_compatible_pins(UOSFunctions.set_gpio_output)
+    }
+    result = uos_device.set_gpio_outputs(levels, volatility=Persistence.RAM)
+    assert result.status
+    assert result.tx_packet is not None
+    assert result.tx_packet.to_address == 70
+    assert result.tx_packet.payload == tuple(
+        value for pin, level in levels.items() for value in (pin, level)
+    )
+    with pytest.raises(UOSUnsupportedError):
+        uos_device.set_gpio_outputs({13: 1, -1: 0})
+
+
+@pytest.mark.parametrize("window", [1, 3, 16])
+def test_execute_pipelined(uos_device: UOSDevice, window: int):
+    """Checks pipelined instructions are matched to their responses."""
+    instructions = [
+        (
+            UOSFunctions.set_gpio_output,
+            InstructionArguments(payload=(13, 1), check_pin=13),
+        ),
+        (
+            UOSFunctions.get_gpio_input,
+            InstructionArguments(payload=(12, 0), expected_rx_packets=2),
+        ),
+        (
+            UOSFunctions.get_adc_input,
+            InstructionArguments(payload=(14,), expected_rx_packets=2),
+        ),
+    ] * 3
+    results = uos_device.execute_pipelined(instructions, window=window)
+    assert len(results) == len(instructions)
+    for (function, _), result in zip(instructions, results):
+        assert result.status
+        assert result.tx_packet is not None
+        assert result.ack_packet[2] == result.tx_packet.to_address
+        assert len(result.rx_packets) == len(function.rx_packets_expected)
+    assert uos_device.get_pin(14).adc_reading is not None
+
+
+def test_execute_pipelined_invalid(uos_device: UOSDevice):
+    """Checks instructions that can't be pipelined are rejected."""
+    with pytest.raises(UOSUnsupportedError):
+        uos_device.execute_pipelined(
+            [(UOSFunctions.hard_reset, InstructionArguments())]
+        )
+    with pytest.raises(UOSRuntimeError):
+        uos_device.execute_pipelined([], window=0)
+
+
+def test_execute_pipelined_gap():
+    """Checks a missing response fails the rest of the batch and the circuit."""
+    simulation = StubSimulation(drop_rate=0.2, seed=3)
+    instructions = [
+        (
+            UOSFunctions.get_gpio_input,
+            InstructionArguments(payload=(13, 0), expected_rx_packets=2),
+        ),
+        (
+            UOSFunctions.get_adc_input,
+            InstructionArguments(payload=(14,), expected_rx_packets=2),
+        ),
+    ] * 10
+    with UOSDevice(
+        Devices.arduino_nano, "STUB", Interface.STUB, simulation=simulation
+    ) as device:
+        device.timeouts = AdaptiveTimeout(initial_allowance_s=0.05)
+        device.circuit_breaker = CircuitBreaker(failure_threshold=1)
+        results = device.execute_pipelined(instructions, window=4)
+        statuses = [result.status for result in results]
+        assert not all(statuses)
+        gap = statuses.index(False)
+        assert all(statuses[:gap]) and not any(statuses[gap:])
+        for result in results[:gap]:
+            assert result.tx_packet is not None
+            assert result.ack_packet[2] == result.tx_packet.to_address
+        with pytest.raises(UOSCircuitOpenError):
+            device.execute_pipelined(instructions)
+
+
+def test_keep_alive_loading():
+    """Checks keep alive connections open on use and close once idle."""
+    device = UOSDevice(
+        Devices.arduino_nano,
+        "/dev/ttyUSB0",
+        Interface.STUB,
+        loading=Loading.KEEP_ALIVE,
+        idle_timeout_s=0.05,
+    )
+    assert not device.is_active()
+    assert device.reset_all_io().status
+    assert device.is_active()  # held open between instructions
+    sleep(0.02)
+    assert device.get_adc_input(14).status
+    assert device.is_active()  # idle time restarts on use
+    sleep(0.2)
+    assert not device.is_active()
+    assert device.reset_all_io().status  # re-opens on the next use
+    device.close()
+    assert not device.is_active()
+
+
+def test_prepare(uos_device: UOSDevice):
+    """Checks prepared instructions execute and patch their payload."""
+    prepared = uos_device.prepare(
+        UOSFunctions.set_gpio_output,
+        InstructionArguments(payload=(13, 0), check_pin=13),
+    )
+    first_result = prepared.execute()
+    assert first_result.status
+    for level in (1, 0, 1):
+        result = prepared.patch(1, level).execute()
+        assert result.status
+        assert result.tx_packet is not None
+        assert result.tx_packet.packet == NPCPacket(60, 0, (13, level)).packet
+    # Earlier results keep the packet they were sent with.
+    assert first_result.tx_packet.payload == (13, 0)
+    assert prepared.patch(0, 12).packet.packet == NPCPacket(60, 0, (12, 1)).packet
+    with pytest.raises(UOSUnsupportedError):
+        prepared.patch(0, -1)
+    with pytest.raises(UOSRuntimeError):
+        prepared.patch(2, 1)
+
+
+def test_prepare_updates_samples(uos_device: UOSDevice):
+    """Checks prepared reads update the pin samples."""
+    uos_device.get_pin(14).adc_reading = None
+    prepared = uos_device.prepare(
+        UOSFunctions.get_adc_input,
+        InstructionArguments(payload=(14,), expected_rx_packets=2, check_pin=14),
+    )
+    assert prepared.execute().status
+    assert uos_device.get_pin(14).adc_reading is not None
+    with pytest.raises(UOSUnsupportedError):
+        uos_device.prepare(UOSFunctions.hard_reset, InstructionArguments())
+
+
+def test_history(uos_device: UOSDevice):
+    """Checks readings are recorded in the pin histories once enabled."""
+    adc_pins = sorted(uos_device.get_compatible_pins(UOSFunctions.get_adc_input))
+    uos_device.enable_history(4, pins=adc_pins[:2])
+    try:
+        for _ in range(6):
+            assert uos_device.get_adc_inputs(adc_pins).status
+        history = uos_device.get_pin(adc_pins[0]).adc_history
+        assert history is not None and len(history) == 4
+        raw_values, values, times_ns = history.window()
+        assert len(raw_values) == len(values) == len(times_ns) == 4
+        assert list(times_ns) == sorted(times_ns)
+        assert raw_values[-1] == uos_device.get_pin(adc_pins[0]).adc_reading.raw_value
+        assert uos_device.get_pin(adc_pins[2]).adc_history is None
+        gpio_pin = adc_pins[0]  # analogue pins double as digital inputs
+        assert uos_device.get_gpio_input(gpio_pin).status
+        assert len(uos_device.get_pin(gpio_pin).gpio_history) == 1
+        with pytest.raises(UOSRuntimeError):
+            uos_device.enable_history(4, pins=[-1])
+    finally:
+        uos_device.disable_history()
+    assert uos_device.get_pin(adc_pins[0]).adc_history is None
+
+
+def test_device_pins_per_instance():
+    """Checks devices of the same identity keep their own readings."""
+    first = UOSDevice(Devices.arduino_nano, "STUB", Interface.STUB)
+    second = UOSDevice(Devices.arduino_nano, "STUB", Interface.STUB)
+    first.enable_history(10)
+    assert second.get_pin(14).adc_history is None
+    assert second.get_adc_input(14).status
+    assert first.get_pin(14).adc_reading is None
+    assert len(first.get_pin(14).adc_history) == 0
+    assert Devices.arduino_nano.pins[14].adc_history is None
+
+
+def test_stub_simulation():
+    """Checks stub devices keep pin state and apply the simulation."""
+    with UOSDevice(Devices.arduino_nano, "STUB", Interface.STUB) as device:
+        assert device.set_gpio_output(13, 1).status
+        assert device.get_gpio_input(13).get_rx_payload(0) == [1]
+        assert device.get_system_info().get_rx_payload(0) == [0, 7, 0, 0, 0, 0]
+    with UOSDevice(
+        Devices.arduino_uno,
+        "STUB",
+        Interface.STUB,
+        simulation=StubSimulation(drop_rate=1),
+    ) as device:
+        device.timeouts = AdaptiveTimeout(initial_allowance_s=0.05)
+        start_s = monotonic()
+        assert not device.get_gpio_input(13).status
+        assert monotonic() - start_s >= 0.05  # missing responses are waited for
+
+
+def test_metrics(uos_device: UOSDevice):
+    """Checks instructions are recorded in the device metrics."""
+    uos_device.metrics.reset()
+    assert uos_device.get_adc_input(14).status
+    assert uos_device.hard_reset().status
+    snapshot = uos_device.metrics.snapshot()
+    assert snapshot["get_adc_input"]["counters"]["instructions"] == 1
+    assert snapshot["get_adc_input"]["counters"]["rx_bytes"] > 0
+    assert set(snapshot["get_adc_input"]["latency"]) == {
+        "encode",
+        "write",
+        "read",
+        "round_trip",
+    }
+    assert set(snapshot["hard_reset"]["latency"]) == {"encode", "round_trip"}
+    uos_device.metrics.enabled = False
+    try:
+        assert uos_device.get_adc_input(14).status
+        assert uos_device.metrics.snapshot() == snapshot
+    finally:
+        uos_device.metrics.enabled = True
+
+
+def test_metrics_failures():
+    """Checks failed attempts and retries are counted."""
+    with UOSDevice(
+        Devices.arduino_nano,
+        "STUB",
+        Interface.STUB,
+        simulation=StubSimulation(corrupt_rate=1),
+    ) as device:
+        assert not device.get_gpio_input(13).status
+        counters = device.metrics.snapshot()["get_gpio_input"]["counters"]
+    assert counters["instructions"] == 1
+    assert counters["retries"] == 1
+    assert counters["failures"] == counters["checksum_errors"] == 2
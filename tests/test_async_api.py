@@ -0,0 +1,83 @@
+"""Unit tests for the asyncio device in the api module."""
+import asyncio
+
+import pytest
+
+from uoshardware import Loading, Persistence, UOSCommunicationError, UOSUnsupportedError
+from uoshardware.async_api import AsyncUOSDevice
+
+
+def create_async_device(identities: dict, address: str | None = None):
+    """Create an asyncio device from a test device definition."""
+    return AsyncUOSDevice(
+        identities["identity"],
+        identities["address"] if address is None else address,
+        identities["interface"],
+        loading=identities["loading"],
+    )
+
+
+@pytest.fixture(name="async_identities")
+def fixture_async_identities(uos_identities: dict):
+    """Device definitions with loading strategies supported by asyncio devices."""
+    if uos_identities["loading"] == Loading.KEEP_ALIVE:
+        with pytest.raises(UOSUnsupportedError):
+            create_async_device(uos_identities)
+        pytest.skip("Keep alive loading isn't supported by asyncio devices.")
+    return uos_identities
+
+
+def test_async_device_functions(async_identities: dict):
+    """Checks the asyncio device functions respond correctly."""
+
+    async def run_functions():
+        async with create_async_device(async_identities) as device:
+            assert (await device.set_gpio_output(13, 1, Persistence.RAM)).status
+            result = await device.get_gpio_input(12, pull_up=True)
+            assert result.status
+            assert len(result.rx_packets) == 1
+            assert device.get_pin(12).gpio_reading is not None
+            assert (await device.get_adc_input(14)).status
+            assert device.get_pin(14).adc_reading is not None
+            counters = device.metrics.snapshot()["get_adc_input"]["counters"]
+            assert counters["instructions"] == 1
+            assert (await device.get_system_info()).status
+            assert (await device.reset_all_io()).status
+            assert (await device.hard_reset()).status
+            with pytest.raises(UOSUnsupportedError):
+                await device.set_gpio_output(-1, 1)
+        assert not device.is_active()
+
+    asyncio.run(run_functions())
+
+
+def test_async_device_concurrency(async_identities: dict):
+    """Checks many devices and tasks can share a single event loop."""
+
+    async def poll_devices():
+        devices = [
+            create_async_device(
+                async_identities, f"{async_identities['address']}{index}"
+            )
+            for index in range(8)
+        ]
+        if async_identities["loading"] == Loading.EAGER:
+            await asyncio.gather(*(device.open() for device in devices))
+        results = await asyncio.gather(
+            *(device.get_adc_input(14) for device in devices for _ in range(4))
+        )
+        await asyncio.gather(*(device.close() for device in devices))
+        return results
+
+    assert all(result.status for result in asyncio.run(poll_devices()))
+
+
+def test_async_device_bad_connection(async_identities: dict):
+    """Checks that bad connections fail sensibly."""
+
+    async def open_device():
+        async with create_async_device(async_identities, "") as device:
+            await device.reset_all_io()
+
+    with pytest.raises(UOSCommunicationError):
+        asyncio.run(open_device())
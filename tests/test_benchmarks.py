@@ -0,0 +1,24 @@
+"""Tests for the benchmark suite harness."""
+from benchmarks import suite
+
+
+def test_suite_run_and_compare(tmp_path):
+    """Checks cases run and regressions are detected against a baseline."""
+    results = suite.run("encode.npc_packet", min_time_s=0.001)
+    assert list(results) == ["encode.npc_packet"]
+    assert results["encode.npc_packet"]["us"] > 0
+    baseline = {
+        "cases": {"encode.npc_packet": {"us": results["encode.npc_packet"]["us"] / 2}}
+    }
+    assert suite.compare(results, baseline, threshold=0.25) == ["encode.npc_packet"]
+    assert not suite.compare(results, baseline, threshold=2)
+    baseline_path = tmp_path / "baseline.json"
+    args = ["-k", "checksum.*", "--min-time", "0.001", "--baseline", str(baseline_path)]
+    assert suite.main(args + ["--save"]) == 0
+    assert "checksum.adc_response" in baseline_path.read_text(encoding="utf-8")
+
+
+def test_suite_cases_registered():
+    """Checks every stage of the instruction path has a case."""
+    for prefix in ("encode.", "checksum.", "decode.", "stub.", "samples.", "serial."):
+        assert any(name.startswith(prefix) for name in suite.CASES)
@@ -0,0 +1,51 @@
+"""Tests for the streaming NPC frame decoder."""
+import pytest
+
+from tests import TEST_PACKETS
+from uoshardware.abstractions import NPCPacket
+from uoshardware.decoder import NPCDecoder
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_npc_decoder_chunked(chunk_size: int):
+    """Checks frames are decoded regardless of how the stream is chunked."""
+    stream = TEST_PACKETS[0].binary + TEST_PACKETS[1].binary
+    decoder = NPCDecoder()
+    for offset in range(0, len(stream), chunk_size):
+        decoder.feed(memoryview(stream)[offset : offset + chunk_size])
+    assert list(decoder.frames) == [TEST_PACKETS[0].binary, TEST_PACKETS[1].binary]
+    assert decoder.checksum_errors == 0
+    assert decoder.discarded_bytes == 0
+
+
+def test_npc_decoder_resynchronises():
+    """Checks garbage and false start symbols are skipped."""
+    decoder = NPCDecoder()
+    # Noise, then a '>' that doesn't begin a real frame before a valid one.
+    assert decoder.feed(b"\x00\x11>\x01\x02\x00\x07\x00" + TEST_PACKETS[1].binary) == 1
+    assert decoder.frames.popleft() == TEST_PACKETS[1].binary
+    assert decoder.discarded_bytes == 8
+
+
+def test_npc_decoder_checksum():
+    """Checks frames with an invalid LRC are dropped and counted."""
+    corrupted = bytearray(TEST_PACKETS[0].binary)
+    corrupted[-2] ^= 0xFF
+    decoder = NPCDecoder()
+    assert decoder.feed(bytes(corrupted) + TEST_PACKETS[0].binary) == 1
+    assert decoder.checksum_errors == 1
+    result = decoder.pop_result(expect_packets=2)
+    assert not result.status
+    assert result.ack_packet == TEST_PACKETS[0].binary
+
+
+def test_npc_decoder_stale_frames():
+    """Checks frames from addresses that aren't expected are dropped."""
+    decoder = NPCDecoder()
+    decoder.expect(61)
+    stale = NPCPacket(0, 90, (0,)).packet
+    assert decoder.feed(stale + NPCPacket(0, 61, (0,)).packet) == 1
+    assert decoder.frames.popleft()[2] == 61
+    assert decoder.stale_frames == 1
+    decoder.reset()
+    assert decoder.feed(stale) == 1  # everything is accepted until expected
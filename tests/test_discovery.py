@@ -0,0 +1,64 @@
+"""Tests for the device discovery module."""
+import os
+import platform
+from time import monotonic
+
+import pytest
+
+from uoshardware import UOSUnsupportedError
+from uoshardware.devices import Devices
+from uoshardware.discovery import DiscoveredDevice, discover_devices
+from uoshardware.interface import Interface
+from uoshardware.simulator import FirmwareSimulator
+
+
+def test_discover_stub():
+    """Checks the stub is discovered and matched to a device definition."""
+    devices = discover_devices(Interface.STUB)
+    assert len(devices) == 1
+    assert devices[0].hwid == 0
+    assert devices[0].definition == Devices.hwid_0
+    with devices[0].connect() as device:
+        assert device.get_gpio_input(13).status
+    assert not discover_devices(Interface.STUB, addresses=[""])  # can't open
+
+
+def test_unknown_hwid():
+    """Checks devices with unknown hardware ids can't be connected."""
+    unknown = DiscoveredDevice("STUB", Interface.STUB, bytes(3) + b"\xff", None)
+    assert unknown.hwid == 255
+    assert unknown.version == (0, 0, 0)
+    with pytest.raises(UOSUnsupportedError):
+        unknown.connect()
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="Requires a pty")
+def test_discover_serial():
+    """Checks serial ports are probed concurrently, ignoring silent ports."""
+    silent = [os.openpty() for _ in range(3)]
+    try:
+        with FirmwareSimulator(Devices.arduino_uno) as simulator:
+            start_s = monotonic()
+            devices = discover_devices(
+                addresses=[simulator.address, "/dev/not_a_port"]
+                + [os.ttyname(peripheral) for _, peripheral in silent],
+                timeout_s=0.3,
+            )
+            elapsed_s = monotonic() - start_s
+            assert len(devices) == 1
+            assert devices[0].address == simulator.address
+    finally:
+        for controller, peripheral in silent:
+            os.close(controller)
+            os.close(peripheral)
+    assert devices[0].version == FirmwareSimulator.VERSION
+    assert devices[0].definition == Devices.hwid_1
+    assert elapsed_s < 0.6  # silent ports time out together, not in turn
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="Requires a pty")
+def test_discover_unopenable():
+    """Checks paths that can't be opened as ports are skipped."""
+    with FirmwareSimulator(Devices.arduino_uno) as simulator:
+        devices = discover_devices(addresses=[simulator.address, "/tmp"])
+        assert [device.address for device in devices] == [simulator.address]
@@ -0,0 +1,84 @@
+"""Tests for the fleet module."""
+import threading
+from time import sleep
+
+import pytest
+
+from uoshardware import Loading, UOSCommunicationError, UOSRuntimeError
+from uoshardware.api import UOSDevice
+from uoshardware.devices import Devices
+from uoshardware.fleet import UOSFleet
+from uoshardware.interface import Interface
+
+ADDRESSES = [f"STUB-{index}" for index in range(6)]
+
+
+def test_fleet_connect():
+    """Checks devices are created concurrently with failures isolated."""
+    with UOSFleet.connect(
+        Devices.arduino_nano, ADDRESSES + [""], Interface.STUB
+    ) as fleet:
+        assert list(fleet.devices) == ADDRESSES
+        assert isinstance(fleet.connection_errors[""], UOSCommunicationError)
+        assert all(device.is_active() for device in fleet.devices.values())
+        result = fleet.call("get_adc_input", 14)
+        assert result.ok
+        assert list(result.results) == ADDRESSES
+    assert not any(device.is_active() for device in fleet.devices.values())
+
+
+def test_fleet_concurrency():
+    """Checks operations run on several devices at once, bounded by workers."""
+    fleet = UOSFleet.connect(
+        Devices.arduino_nano, ADDRESSES, Interface.STUB, max_workers=3
+    )
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def operation(device: UOSDevice):
+        with lock:
+            active.append(device)
+            peak.append(len(active))
+        sleep(0.02)
+        with lock:
+            active.remove(device)
+        return device.address
+
+    result = fleet.execute(operation)
+    assert result.results == {address: address for address in ADDRESSES}
+    assert max(peak) == 3
+    result = fleet.execute(operation, keys=ADDRESSES[:2])
+    assert list(result.results) == ADDRESSES[:2]
+    with pytest.raises(UOSRuntimeError):
+        fleet.execute(operation, keys=["missing"])
+    fleet.close()
+
+
+def test_fleet_errors():
+    """Checks a failure on one device doesn't stop the others."""
+    devices = [
+        UOSDevice(Devices.arduino_nano, "STUB-0", Interface.STUB),
+        UOSDevice(Devices.arduino_nano, "", Interface.STUB, loading=Loading.LAZY),
+    ]
+    fleet = UOSFleet(devices)
+    result = fleet.call("set_gpio_output", 13, 1)
+    assert list(result.results) == ["STUB-0"]
+    assert list(result.errors) == [""]
+    assert not result.ok and result.failed == [""]
+    result = fleet.call("get_gpio_input", 99)  # invalid pin on every device
+    assert len(result.errors) == 2
+
+    def check_device(device: UOSDevice):
+        if device.address == "STUB-0":
+            raise KeyError(device.address)
+        return device.address
+
+    result = fleet.execute(check_device)
+    assert isinstance(result.errors["STUB-0"], KeyError)
+    assert result.results == {"": ""}
+    with pytest.raises(UOSRuntimeError):
+        fleet.call("_UOSDevice__connection")
+    with pytest.raises(UOSRuntimeError):
+        UOSFleet(devices + devices[:1])  # duplicate address
+    fleet.close()
@@ -0,0 +1,24 @@
+"""Tests for the array backed sample histories."""
+import pytest
+
+from uoshardware import UOSRuntimeError
+from uoshardware.history import SampleHistory
+
+
+def test_sample_history():
+    """Checks histories wrap around and export contiguous views."""
+    history = SampleHistory(3)
+    assert len(history) == 0
+    assert [len(column) for column in history.window()] == [0, 0, 0]
+    for sample in range(5):
+        history.append(sample, sample / 2, sample * 1000)
+    raw_values, values, times_ns = history.window()
+    assert list(raw_values) == [2, 3, 4]
+    assert list(values) == [1.0, 1.5, 2.0]
+    assert list(times_ns) == [2000, 3000, 4000]
+    assert list(history.window(2)[0]) == [3, 4]
+    assert list(history.window(10)[0]) == [2, 3, 4]
+    history.clear()
+    assert len(history) == 0
+    with pytest.raises(UOSRuntimeError):
+        SampleHistory(0)
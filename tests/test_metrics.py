@@ -0,0 +1,63 @@
+"""Tests for the instruction metrics module."""
+from uoshardware.abstractions import ComResult, NPCPacket
+from uoshardware.decoder import NPCDecoder
+from uoshardware.metrics import DeviceMetrics, Histogram, format_prometheus
+
+
+def test_histogram():
+    """Checks observations are counted into cumulative buckets."""
+    histogram = Histogram((0.001, 0.01))
+    for duration_ns in (500_000, 1_000_000, 5_000_000, 50_000_000):
+        histogram.observe_ns(duration_ns)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.001": 2, "0.01": 3, "+Inf": 4}
+    assert snapshot["count"] == histogram.count == 4
+    assert abs(snapshot["sum_s"] - 0.0565) < 1e-9
+
+
+def test_record_result():
+    """Checks results are classified into the failure counters."""
+    metrics = DeviceMetrics("/dev/ttyUSB0")
+    packet = NPCPacket(90, 0, (14,))
+    ack = NPCPacket(0, 90, (0,)).packet
+    for result in (
+        ComResult(True, ack_packet=ack, rx_packets=[ack], tx_packet=packet),
+        ComResult(False, NPCDecoder.MISSING_DATA_ERROR, tx_packet=packet),
+        ComResult(False, NPCDecoder.CHECKSUM_ERROR, tx_packet=packet),
+    ):
+        metrics.get("get_adc_input").record_result(result)
+    metrics.get("get_adc_input").observe_ns("read", 1000)
+    snapshot = metrics.snapshot()["get_adc_input"]
+    assert snapshot["counters"] == {
+        "instructions": 0,
+        "failures": 2,
+        "retries": 0,
+        "timeouts": 1,
+        "checksum_errors": 1,
+        "tx_bytes": 3 * len(packet.packet),
+        "rx_bytes": 2 * len(ack),
+    }
+    assert list(snapshot["latency"]) == ["read"]
+    metrics.reset()
+    assert not metrics.snapshot()
+
+
+def test_prometheus():
+    """Checks the metrics of many devices are grouped by metric family."""
+    first, second = DeviceMetrics("COM1"), DeviceMetrics('say "hi"')
+    for metrics in (first, second):
+        metrics.get("get_gpio_input").observe_ns("read", 2_000_000)
+        metrics.get("get_gpio_input").counters["instructions"] += 1
+    text = format_prometheus([first, second])
+    assert text.count("# TYPE uos_instruction_seconds histogram") == 1
+    assert text.count("# TYPE uos_instructions_total counter") == 1
+    assert (
+        'uos_instruction_seconds_bucket{device="COM1",function="get_gpio_input",'
+        'phase="read",le="0.0025"} 1' in text
+    )
+    assert (
+        'uos_instructions_total{device="say \\"hi\\"",function="get_gpio_input"} 1'
+        in text
+    )
+    assert 'uos_retries_total{device="COM1",function="get_gpio_input"} 0' in text
+    assert first.to_prometheus().endswith("\n")
@@ -0,0 +1,158 @@
+"""Tests for retry policies and circuit breakers."""
+import asyncio
+from time import monotonic, sleep
+
+import pytest
+
+from uoshardware import Loading, UOSCircuitOpenError, UOSCommunicationError
+from uoshardware.abstractions import ComResult
+from uoshardware.api import UOSDevice
+from uoshardware.async_api import AsyncUOSDevice
+from uoshardware.decoder import NPCDecoder
+from uoshardware.devices import Devices
+from uoshardware.interface import Interface
+from uoshardware.interface.stub import StubSimulation
+from uoshardware.retry import (
+    NO_RETRY,
+    CircuitBreaker,
+    CircuitState,
+    Failure,
+    RetryPolicy,
+    classify_failure,
+)
+from uoshardware.timeouts import AdaptiveTimeout
+from uoshardware.tracing import ChromeTraceRecorder
+
+
+def create_stub(simulation: StubSimulation, loading: Loading = Loading.EAGER):
+    """Create a stub device with a simulation that times out quickly."""
+    device = UOSDevice(
+        Devices.arduino_nano, "STUB", Interface.STUB, loading, simulation=simulation
+    )
+    device.timeouts = AdaptiveTimeout(initial_allowance_s=0.05)
+    return device
+
+
+def test_classify_failure():
+    """Checks results are classified by the cause of their failure."""
+    assert classify_failure(ComResult(True)) is None
+    assert classify_failure(ComResult(False, NPCDecoder.CHECKSUM_ERROR)) == (
+        Failure.CHECKSUM
+    )
+    assert classify_failure(ComResult(False, NPCDecoder.MISSING_DATA_ERROR)) == (
+        Failure.TIMEOUT
+    )
+    assert classify_failure(ComResult(False, "failed to send instruction")) == (
+        Failure.COMMUNICATION
+    )
+
+
+def test_retry_policy():
+    """Checks backoff grows to its limit and retries respect the deadline."""
+    policy = RetryPolicy(max_attempts=5, backoff_s=0.1, max_backoff_s=0.3)
+    assert [policy.get_backoff_s(attempt) for attempt in range(1, 5)] == [
+        0.1,
+        0.2,
+        0.3,
+        0.3,
+    ]
+    assert policy.should_retry(Failure.TIMEOUT, 1, None)
+    assert not policy.should_retry(None, 1, None)
+    assert not policy.should_retry(Failure.TIMEOUT, 5, None)
+    assert not policy.should_retry(Failure.TIMEOUT, 1, monotonic() + 0.05)
+    checksum_only = RetryPolicy(retry_on=frozenset({Failure.CHECKSUM}))
+    assert not checksum_only.should_retry(Failure.TIMEOUT, 1, None)
+    assert not NO_RETRY.should_retry(Failure.CHECKSUM, 1, None)
+
+
+def test_circuit_breaker():
+    """Checks the circuit opens, probes once after the timeout and recovers."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=0.05)
+    breaker.record(False)
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow()
+    sleep(0.06)
+    assert breaker.allow()  # the probe
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record(False)
+    assert breaker.state == CircuitState.OPEN
+    sleep(0.06)
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failures == 0
+
+
+def test_retries():
+    """Checks failures are retried on one connection with backoff."""
+    device = create_stub(StubSimulation(drop_rate=1), Loading.LAZY)
+    device.retry_policy = RetryPolicy(max_attempts=3, backoff_s=0.01)
+    start_s = monotonic()
+    with ChromeTraceRecorder() as recorder:
+        assert not device.get_gpio_input(13).status
+    assert monotonic() - start_s >= 0.03  # 0.01 then 0.02 of backoff
+    names = [event["name"] for event in recorder.events if event["ph"] == "B"]
+    assert names.count("uos.write") == 3
+    assert names.count("uos.connect") == 1  # lazy port only opened once
+    counters = device.metrics.snapshot()["get_gpio_input"]["counters"]
+    assert counters["retries"] == 2
+    assert counters["timeouts"] == 3
+    device.retry_policy = RetryPolicy(retry_on=frozenset({Failure.CHECKSUM}))
+    device.metrics.reset()
+    assert not device.get_gpio_input(13).status
+    assert device.metrics.snapshot()["get_gpio_input"]["counters"]["retries"] == 0
+
+
+def test_communication_retries():
+    """Checks errors raised by the interface are retried then raised."""
+    device = create_stub(StubSimulation())
+    device.close()  # the stub raises when used closed
+    device.circuit_breaker = CircuitBreaker(failure_threshold=1)
+    with pytest.raises(UOSCommunicationError):
+        device.get_gpio_input(13)
+    counters = device.metrics.snapshot()["get_gpio_input"]["counters"]
+    assert counters["retries"] == 1
+    assert counters["failures"] == 2
+    assert device.circuit_breaker.state == CircuitState.OPEN
+
+
+def test_device_circuit():
+    """Checks a failing device fails fast until a probe succeeds."""
+    simulation = StubSimulation(drop_rate=1)
+    with create_stub(simulation) as device:
+        device.retry_policy = NO_RETRY
+        device.circuit_breaker = CircuitBreaker(
+            failure_threshold=2, reset_timeout_s=0.05
+        )
+        for _ in range(2):
+            assert not device.get_gpio_input(13).status
+        with pytest.raises(UOSCircuitOpenError):
+            device.get_gpio_input(13)
+        simulation.drop_rate = 0
+        sleep(0.06)
+        assert device.get_gpio_input(13).status  # the probe closes the circuit
+        assert device.circuit_breaker.state == CircuitState.CLOSED
+        instructions = device.metrics.snapshot()["get_gpio_input"]["counters"]
+        assert instructions["instructions"] == 3  # rejected ones never ran
+
+
+def test_async_retries():
+    """Checks the asyncio device follows the retry policy and circuit."""
+
+    async def run():
+        simulation = StubSimulation(corrupt_rate=1)
+        async with AsyncUOSDevice(
+            Devices.arduino_nano, "STUB", Interface.STUB, simulation=simulation
+        ) as device:
+            device.retry_policy = RetryPolicy(max_attempts=4)
+            device.circuit_breaker = CircuitBreaker(failure_threshold=1)
+            assert not (await device.get_adc_input(14)).status
+            with pytest.raises(UOSCircuitOpenError):
+                await device.get_adc_input(14)
+            return device.metrics.snapshot()["get_adc_input"]["counters"]
+
+    counters = asyncio.run(run())
+    assert counters["retries"] == 3
+    assert counters["checksum_errors"] == 4
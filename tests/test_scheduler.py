@@ -0,0 +1,111 @@
+"""Tests for the polling scheduler module."""
+from time import monotonic_ns, sleep
+
+import pytest
+
+from uoshardware import Loading, UOSRuntimeError, UOSUnsupportedError
+from uoshardware.abstractions import UOSFunctions
+from uoshardware.api import UOSDevice
+from uoshardware.devices import Devices
+from uoshardware.interface import Interface
+from uoshardware.scheduler import PollingScheduler
+
+
+def test_poll_coalesces(uos_device: UOSDevice):
+    """Checks due pins are merged into one instruction per function."""
+    adc_pins = sorted(uos_device.get_compatible_pins(UOSFunctions.get_adc_input))
+    scheduler = PollingScheduler(uos_device)
+    samples = []
+    subscriptions = [
+        scheduler.subscribe(pin, UOSFunctions.get_adc_input, 1) for pin in adc_pins
+    ] + [
+        scheduler.subscribe(
+            adc_pins[0],
+            UOSFunctions.get_gpio_input,
+            0.01,
+            callback=lambda _, sample: samples.append(sample),
+        )
+    ]
+    for pin in adc_pins:
+        uos_device.get_pin(pin).adc_reading = None
+    wait_s = scheduler.poll()
+    assert wait_s is not None and 0 < wait_s <= 0.01
+    assert all(subscription.stats.polls == 1 for subscription in subscriptions)
+    assert all(uos_device.get_pin(pin).adc_reading is not None for pin in adc_pins)
+    assert len(samples) == 1
+    # Only the faster subscription is due after its period.
+    sleep(wait_s)
+    scheduler.poll()
+    assert subscriptions[-1].stats.polls == 2
+    assert subscriptions[0].stats.polls == 1
+
+
+def test_poll_missed_deadlines(uos_device: UOSDevice):
+    """Checks overdue polls are skipped rather than read in a burst."""
+    scheduler = PollingScheduler(uos_device)
+    subscription = scheduler.subscribe(13, UOSFunctions.get_gpio_input, 0.005)
+    subscription.due_ns = monotonic_ns() - 22000000  # over 4 periods late
+    scheduler.poll()
+    assert subscription.stats.polls == 1
+    assert subscription.stats.missed == 4
+    assert subscription.stats.jitter_max_ns >= 22000000
+    assert subscription.due_ns > monotonic_ns()
+    scheduler.unsubscribe(subscription)
+    assert scheduler.poll() is None
+    with pytest.raises(UOSRuntimeError):
+        scheduler.unsubscribe(subscription)
+
+
+def test_scheduler_thread(uos_device: UOSDevice):
+    """Checks subscriptions are polled in the background until stopped."""
+    with PollingScheduler(uos_device) as scheduler:
+        subscription = scheduler.subscribe(13, UOSFunctions.get_gpio_input, 0.002)
+        sleep(0.05)
+        with pytest.raises(UOSRuntimeError):
+            scheduler.start()
+    polls = subscription.stats.polls
+    assert polls > 5
+    assert subscription.stats.jitter_mean_ns < 5000000
+    sleep(0.01)
+    assert subscription.stats.polls == polls
+
+
+def test_callback_errors(uos_device: UOSDevice):
+    """Checks callbacks that raise don't stop the scheduler thread."""
+
+    def callback(*_):
+        raise ValueError("callback failed")
+
+    with PollingScheduler(uos_device) as scheduler:
+        subscription = scheduler.subscribe(
+            13, UOSFunctions.get_gpio_input, 0.002, callback=callback
+        )
+        sleep(0.03)
+        polls = subscription.stats.polls
+        sleep(0.03)
+    assert subscription.stats.polls > polls > 2  # still polling after errors
+    assert subscription.stats.callback_errors == subscription.stats.polls
+
+
+def test_subscribe_invalid(uos_device: UOSDevice):
+    """Checks subscriptions are validated."""
+    scheduler = PollingScheduler(uos_device)
+    with pytest.raises(UOSUnsupportedError):
+        scheduler.subscribe(13, UOSFunctions.set_gpio_output, 1)
+    with pytest.raises(UOSUnsupportedError):
+        scheduler.subscribe(-1, UOSFunctions.get_gpio_input, 1)
+    with pytest.raises(UOSRuntimeError):
+        scheduler.subscribe(13, UOSFunctions.get_gpio_input, 0)
+
+
+def test_poll_errors():
+    """Checks failed reads are counted and the next poll is still scheduled."""
+    device = UOSDevice(
+        Devices.arduino_nano, "", Interface.STUB, loading=Loading.LAZY
+    )  # can't be opened
+    scheduler = PollingScheduler(device)
+    subscription = scheduler.subscribe(13, UOSFunctions.get_gpio_input, 1)
+    scheduler.poll()
+    assert subscription.stats.errors == 1
+    assert subscription.stats.polls == 0
+    assert subscription.due_ns > monotonic_ns()
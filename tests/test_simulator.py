@@ -0,0 +1,79 @@
+"""Tests for the pty firmware simulator through the serial interface."""
+import platform
+from time import monotonic
+
+import pytest
+
+from uoshardware import UOSRuntimeError, UOSUnsupportedError
+from uoshardware.abstractions import NPCPacket
+from uoshardware.api import UOSDevice
+from uoshardware.devices import Devices
+from uoshardware.firmware import ACK_ERROR
+from uoshardware.interface import Interface
+from uoshardware.simulator import FirmwareSimulator
+
+pytestmark = pytest.mark.skipif(platform.system() != "Linux", reason="Requires a pty")
+
+
+@pytest.fixture(name="simulator")
+def fixture_simulator():
+    """Run a simulated Arduino Nano without wire delay."""
+    with FirmwareSimulator(Devices.arduino_nano, baudrate=0) as simulator:
+        yield simulator
+
+
+def test_gpio_state(simulator: FirmwareSimulator):
+    """Checks pin state is kept between instructions over the serial stack."""
+    with UOSDevice(Devices.arduino_nano, simulator.address, Interface.SERIAL) as device:
+        assert device.set_gpio_outputs({12: 1, 13: 0}).status
+        result = device.get_gpio_inputs([12, 13, 11], pull_ups=[False, False, True])
+        assert result.get_rx_payload(0) == [1, 0, 1]
+        simulator.set_input_level(10, 1)
+        assert device.get_gpio_input(10).get_rx_payload(0) == [1]
+        assert device.reset_all_io().status
+        assert device.get_gpio_input(12).get_rx_payload(0) == [0]
+        assert simulator.instructions == 5
+
+
+def test_adc_waveform(simulator: FirmwareSimulator):
+    """Checks ADC channels sample their configured waveform."""
+    simulator.set_adc_waveform(14, lambda _: 2.5)
+    simulator.set_adc_waveform(15, lambda seconds: 10 + seconds)  # clipped
+    with UOSDevice(Devices.arduino_nano, simulator.address, Interface.SERIAL) as device:
+        assert device.get_adc_inputs([14, 15, 16]).status
+        assert device.get_pin(14).adc_reading.raw_value == 512
+        assert device.get_pin(15).adc_reading.raw_value == 1023
+        assert device.get_pin(16).adc_reading.raw_value == 0
+    with pytest.raises(UOSUnsupportedError):
+        simulator.set_adc_waveform(2, lambda _: 0)
+
+
+def test_system_info(simulator: FirmwareSimulator):
+    """Checks the simulator reports the hardware id of its definition."""
+    with UOSDevice(Devices.arduino_nano, simulator.address, Interface.SERIAL) as device:
+        result = device.get_system_info()
+        assert result.status
+        assert result.get_rx_payload(0) == [0, 7, 0, 0, 0, 0]
+
+
+def test_invalid_instructions(simulator: FirmwareSimulator):
+    """Checks invalid instructions are answered with an error ACK."""
+    unknown = NPCPacket(200, 0, ()).packet
+    assert simulator.execute(unknown) == NPCPacket(0, 200, (ACK_ERROR,)).packet
+    bad_pin = NPCPacket(90, 0, (2,)).packet  # not an ADC pin
+    assert simulator.execute(bad_pin) == NPCPacket(0, 90, (ACK_ERROR,)).packet
+
+
+def test_wire_delay():
+    """Checks responses are delayed by latency and the modelled wire time."""
+    with FirmwareSimulator(baudrate=9600, latency_s=0.005) as simulator:
+        # ACK and a 2 byte rx packet, in response to a 7 byte instruction.
+        expected_s = 0.005 + simulator.wire_time_s(7 + 7 + 8)
+        with UOSDevice(
+            Devices.arduino_nano, simulator.address, Interface.SERIAL
+        ) as device:
+            start_s = monotonic()
+            assert device.get_adc_input(14).status
+            assert monotonic() - start_s >= expected_s
+    with pytest.raises(UOSRuntimeError):
+        _ = simulator.address  # stopped
@@ -0,0 +1,172 @@
+"""Tests for adaptive response timeouts and per-call deadlines."""
+import asyncio
+from time import monotonic, sleep
+
+import pytest
+
+from uoshardware import Loading, UOSTimeoutError
+from uoshardware.abstractions import ComResult, NPCPacket, UOSFunctions
+from uoshardware.api import UOSDevice
+from uoshardware.async_api import AsyncUOSDevice
+from uoshardware.decoder import NPCDecoder
+from uoshardware.devices import Devices
+from uoshardware.interface import Interface
+from uoshardware.interface.stub import Stub, StubSimulation
+from uoshardware.retry import NO_RETRY, RetryPolicy
+from uoshardware.timeouts import (
+    AdaptiveTimeout,
+    check_deadline,
+    deadline,
+    get_deadline_s,
+    get_transfer_s,
+)
+
+ADC_PACKET = NPCPacket(90, 0, (14,))
+
+
+def test_wire_time():
+    """Checks the wire time covers the instruction and expected responses."""
+    assert get_transfer_s(10, None) == 0
+    assert get_transfer_s(1152, 115200) == pytest.approx(0.1)
+    timeouts = AdaptiveTimeout(115200)
+    # 7 byte instruction, 7 byte ACK and a response with 2 bytes per pin.
+    assert timeouts.get_wire_s(
+        UOSFunctions.get_adc_input, ADC_PACKET, 2
+    ) == pytest.approx(22 * 10 / 115200)
+    assert timeouts.get_wire_s(
+        UOSFunctions.get_adc_input, NPCPacket(90, 0, (14, 15)), 2
+    ) == pytest.approx(25 * 10 / 115200)
+
+
+def test_adaptive_timeout():
+    """Checks timeouts tighten with measurements and back off on timeouts."""
+    timeouts = AdaptiveTimeout(
+        115200, initial_allowance_s=0.04, max_allowance_s=0.05, min_margin_s=0.01
+    )
+    function = UOSFunctions.get_adc_input
+    wire_s = timeouts.get_wire_s(function, ADC_PACKET, 2)
+    assert timeouts.get_timeout_s(function, ADC_PACKET, 2) == pytest.approx(
+        wire_s + 0.04
+    )
+    for _ in range(10):
+        timeouts.record(
+            function, ComResult(True, tx_packet=ADC_PACKET), 2, wire_s + 0.002
+        )
+    learnt_s = timeouts.get_timeout_s(function, ADC_PACKET, 2)
+    assert learnt_s == pytest.approx(wire_s + 0.002 + timeouts.min_margin_s)
+    missing = ComResult(False, NPCDecoder.MISSING_DATA_ERROR, tx_packet=ADC_PACKET)
+    timeouts.record(function, missing, 2, learnt_s)
+    assert timeouts.get_timeout_s(function, ADC_PACKET, 2) == pytest.approx(
+        wire_s + 2 * (learnt_s - wire_s)
+    )
+    for _ in range(3):
+        timeouts.record(function, missing, 2, learnt_s)
+    assert timeouts.get_timeout_s(function, ADC_PACKET, 2) == pytest.approx(
+        wire_s + 0.05
+    )
+    # Other function addresses haven't been measured.
+    gpio_packet = NPCPacket(61, 0, (13, 0))
+    assert timeouts.get_timeout_s(
+        UOSFunctions.get_gpio_input, gpio_packet, 2
+    ) == pytest.approx(
+        timeouts.get_wire_s(UOSFunctions.get_gpio_input, gpio_packet, 2) + 0.04
+    )
+    timeouts.reset()
+    assert not timeouts.estimates
+
+
+def test_deadline():
+    """Checks deadlines nest and limit timeouts."""
+    assert get_deadline_s() is None
+    timeouts = AdaptiveTimeout()
+    with deadline(0.5):
+        outer_s = get_deadline_s()
+        with deadline(10):
+            assert get_deadline_s() == outer_s  # can't be extended
+            assert (
+                timeouts.get_timeout_s(UOSFunctions.get_adc_input, ADC_PACKET, 2) <= 0.5
+            )
+        with deadline(0):
+            assert (
+                timeouts.get_timeout_s(UOSFunctions.get_adc_input, ADC_PACKET, 2) == 0
+            )
+            with pytest.raises(UOSTimeoutError):
+                check_deadline("testing")
+        check_deadline("testing")
+        policy = RetryPolicy(deadline_s=10)
+        assert policy.get_deadline_s() == outer_s
+    assert get_deadline_s() is None
+    assert RetryPolicy().get_deadline_s() is None
+
+
+def test_device_timeouts():
+    """Checks a device learns its latency and stops waiting for late responses."""
+    simulation = StubSimulation(latency_s=0.005)
+    with UOSDevice(
+        Devices.arduino_nano, "STUB", Interface.STUB, simulation=simulation
+    ) as device:
+        for _ in range(5):
+            assert device.get_adc_input(14).status
+        assert 90 in device.timeouts.estimates
+        simulation.latency_s = 2
+        start_s = monotonic()
+        result = device.get_adc_input(14)
+        assert not result.status
+        assert result.exception == NPCDecoder.MISSING_DATA_ERROR
+        # Two attempts with the minimum margin, rather than waiting seconds.
+        assert monotonic() - start_s < 1
+        simulation.latency_s = 0.005
+        result = device.get_system_info()  # the late ADC response is dropped
+        assert result.status
+        assert result.ack_packet[2] == result.rx_packets[0][2] == 250
+
+
+def test_device_deadline(monkeypatch):
+    """Checks deadlines propagate through opening, writing and reading."""
+    simulation = StubSimulation(latency_s=0.5)
+    device = UOSDevice(
+        Devices.arduino_nano,
+        "STUB",
+        Interface.STUB,
+        Loading.LAZY,
+        simulation=simulation,
+    )
+    with deadline(0), pytest.raises(UOSTimeoutError, match="opening"):
+        device.get_adc_input(14)
+    assert not device.is_active()
+    device.retry_policy = RetryPolicy(max_attempts=5)
+    start_s = monotonic()
+    with deadline(0.05):
+        assert not device.get_adc_input(14).status
+    assert monotonic() - start_s < 0.25
+    assert device.metrics.snapshot()["get_adc_input"]["counters"]["retries"] == 0
+    execute_instruction = Stub.execute_instruction
+
+    def slow_write(stub: Stub, packet: NPCPacket) -> ComResult:
+        sleep(0.02)
+        return execute_instruction(stub, packet)
+
+    monkeypatch.setattr(Stub, "execute_instruction", slow_write)
+    with deadline(0.01), pytest.raises(UOSTimeoutError, match="reading"):
+        device.get_adc_input(14)
+
+
+def test_async_deadline():
+    """Checks deadlines apply to asyncio devices."""
+
+    async def run():
+        async with AsyncUOSDevice(
+            Devices.arduino_nano,
+            "STUB",
+            Interface.STUB,
+            simulation=StubSimulation(latency_s=0.5),
+        ) as device:
+            device.retry_policy = NO_RETRY
+            start_s = monotonic()
+            with deadline(0.05):
+                assert not (await device.get_adc_input(14)).status
+                assert monotonic() - start_s < 0.25
+            with deadline(0), pytest.raises(UOSTimeoutError, match="sending"):
+                await device.get_adc_input(14)
+
+    asyncio.run(run())
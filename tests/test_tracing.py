@@ -0,0 +1,91 @@
+"""Tests for the tracing hooks on the execute path."""
+import json
+import platform
+
+import pytest
+
+from uoshardware import Loading
+from uoshardware.api import UOSDevice
+from uoshardware.devices import Devices
+from uoshardware.interface import Interface
+from uoshardware.simulator import FirmwareSimulator
+from uoshardware.tracing import ChromeTraceRecorder, Tracer, set_tracer, span
+
+
+def test_no_tracer():
+    """Checks spans are shared no-op contexts when tracing is disabled."""
+    assert set_tracer(None) is None
+    assert span("uos.read") is span("uos.write", function="get_adc_input")
+
+
+def test_chrome_trace(tmp_path):
+    """Checks each phase of an instruction is recorded as nested events."""
+    device = UOSDevice(Devices.arduino_nano, "STUB", Interface.STUB, Loading.LAZY)
+    with ChromeTraceRecorder() as recorder:
+        assert device.get_adc_input(14).status
+    assert set_tracer(None) is None  # restored on exit
+    assert [(event["ph"], event["name"]) for event in recorder.events] == [
+        ("B", "uos.encode"),
+        ("E", "uos.encode"),
+        ("B", "uos.instruction"),
+        ("B", "uos.connect"),
+        ("E", "uos.connect"),
+        ("B", "uos.write"),
+        ("E", "uos.write"),
+        ("B", "uos.read"),
+        ("E", "uos.read"),
+        ("B", "uos.disconnect"),
+        ("E", "uos.disconnect"),
+        ("E", "uos.instruction"),
+    ]
+    assert recorder.events[0]["args"] == {"function": "get_adc_input"}
+    timestamps = [event["ts"] for event in recorder.events]
+    assert timestamps == sorted(timestamps)
+    recorder.save(tmp_path / "trace.json")
+    trace = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+    assert trace["traceEvents"] == recorder.events
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="Requires a pty")
+def test_serial_phases():
+    """Checks the serial interface phases are traced within the device phases."""
+    with FirmwareSimulator(Devices.arduino_nano, baudrate=0) as simulator:
+        device = UOSDevice(
+            Devices.arduino_nano, simulator.address, Interface.SERIAL, Loading.LAZY
+        )
+        with ChromeTraceRecorder() as recorder:
+            assert device.get_gpio_input(13).status
+    names = [event["name"] for event in recorder.events if event["ph"] == "B"]
+    assert names[:4] == ["uos.encode", "uos.instruction", "uos.connect", "serial.open"]
+    for phase in ("serial.find_port", "serial.write", "serial.wait", "serial.decode"):
+        assert phase in names
+    assert names[-2:] == ["uos.disconnect", "serial.close"]
+
+
+def test_custom_tracer():
+    """Checks custom tracers receive matched begin and end calls."""
+
+    class DepthTracer(Tracer):
+        """Tracks the deepest nesting of spans."""
+
+        def __init__(self):
+            self.depth = self.max_depth = 0
+
+        def begin(self, name: str, args: dict):
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+
+        def end(self, name: str):
+            self.depth -= 1
+
+    tracer = DepthTracer()
+    set_tracer(tracer)
+    try:
+        with pytest.raises(ValueError):
+            with span("outer"):
+                with span("inner"):
+                    raise ValueError()
+    finally:
+        set_tracer(None)
+    assert tracer.depth == 0
+    assert tracer.max_depth == 2
@@ -24,6 +24,7 @@ class Loading(Enum):
 
     LAZY = 0
     EAGER = 1
+    KEEP_ALIVE = 2  # Opened on use, closed once idle.
 
 
 class UOSError(Exception):
@@ -38,6 +39,14 @@ class UOSCommunicationError(UOSError):
     """Exception while communicating with a UOS Device."""
 
 
+class UOSCircuitOpenError(UOSCommunicationError):
+    """Exception for instructions rejected while a device's circuit is open."""
+
+
+class UOSTimeoutError(UOSCommunicationError):
+    """Exception for instructions whose deadline expired before completing."""
+
+
 class UOSRuntimeError(UOSError):
     """General exception for runtime failure, usually indicates misuse."""
 
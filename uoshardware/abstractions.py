@@ -1,9 +1,14 @@
 """Module defining the base class and static func for interfaces."""
+import struct
 from abc import ABCMeta, abstractmethod
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
+from time import monotonic_ns
 
 from uoshardware import Persistence, UOSRuntimeError, UOSUnsupportedError, logger
+from uoshardware.history import SampleHistory
 
 
 @dataclass(frozen=True)
@@ -15,6 +20,21 @@ class UOSFunction:
     ack: bool
     rx_packets_expected: list = field(default_factory=list)
     pin_requirements: list | None = None
+    payload_stride: int = 1  # payload bytes used to describe each pin
+
+    def get_rx_packets_expected(self, payload: tuple[int, ...]) -> list[int]:
+        """Get the rx payload sizes expected in response to a tx payload.
+
+        The ``rx_packets_expected`` are defined for a single pin, these are
+        scaled by the number of pins in the payload of pin based functions.
+
+        :param payload: The payload of the instruction packet.
+        :return: List of expected payload sizes for each rx packet.
+        """
+        if self.pin_requirements is None or len(payload) <= self.payload_stride:
+            return self.rx_packets_expected
+        pin_count = len(payload) // self.payload_stride
+        return [size * pin_count for size in self.rx_packets_expected]
 
 
 @dataclass(init=False, repr=False, frozen=True)
@@ -29,6 +49,7 @@ class UOSFunctions:
         },
         ack=True,
         pin_requirements=["gpio_out"],
+        payload_stride=2,
     )
     get_gpio_input = UOSFunction(
         name="get_gpio_input",
@@ -39,6 +60,7 @@ class UOSFunctions:
         ack=True,
         rx_packets_expected=[1],
         pin_requirements=["gpio_in"],
+        payload_stride=2,
     )
     get_adc_input = UOSFunction(
         name="get_adc_input",
@@ -61,27 +83,61 @@ class UOSFunctions:
     )
 
     @staticmethod
-    def enumerate_functions() -> list:
+    def enumerate_functions() -> tuple[UOSFunction, ...]:
         """Return all the defined UOSFunction objects."""
-        return [
-            getattr(UOSFunctions, member_name)
-            for member_name in dir(UOSFunctions)
-            if isinstance(getattr(UOSFunctions, member_name), UOSFunction)
-        ]
+        return _FUNCTIONS
+
+    @staticmethod
+    def get_from_name(name: str) -> UOSFunction | None:
+        """Look up function from its name."""
+        return _FUNCTIONS_BY_NAME.get(name)
 
     @staticmethod
     def get_from_address(address: int) -> UOSFunction | None:
         """Look up function from the address."""
-        for function in UOSFunctions.enumerate_functions():
-            if address in function.address_lut.values():
-                return function  # function located.
-        return None  # function not found.
+        return _FUNCTIONS_BY_ADDRESS.get(address, (None, None))[0]
+
+    @staticmethod
+    def get_volatility_from_address(address: int) -> Persistence | None:
+        """Look up the volatility level a function address executes at."""
+        return _FUNCTIONS_BY_ADDRESS.get(address, (None, None))[1]
+
+
+# Function registry, built once as the schema is static.
+_FUNCTIONS: tuple[UOSFunction, ...] = tuple(
+    getattr(UOSFunctions, member_name)
+    for member_name in dir(UOSFunctions)
+    if isinstance(getattr(UOSFunctions, member_name), UOSFunction)
+)
+_FUNCTIONS_BY_NAME: dict[str, UOSFunction] = {
+    function.name: function for function in _FUNCTIONS
+}
+_FUNCTIONS_BY_ADDRESS: dict[int, tuple[UOSFunction, Persistence]] = {
+    address: (function, volatility)
+    # Reversed so the first function defining an address takes precedence.
+    for function in reversed(_FUNCTIONS)
+    for volatility, address in reversed(function.address_lut.items())
+}
+
+
+@lru_cache(maxsize=None)
+def _get_frame_struct(length: int) -> struct.Struct:
+    """Get the layout of an NPC frame with a payload length.
+
+    :param length: The number of bytes in the payload.
+    :return: Struct packing the header, payload and trailer uint8 values.
+    """
+    return struct.Struct(f"{4 + length + 2}B")
 
 
 @dataclass(init=False)
 class NPCPacket:
     """Class contains functions and data for the packet based communication."""
 
+    START_BYTE = 0x3E  # ">"
+    END_BYTE = 0x3C  # "<"
+    MAX_PAYLOAD = 255  # payload length must fit in a single byte
+
     to_address: int
     from_address: int
     payload: tuple[int, ...]
@@ -99,31 +155,155 @@ class NPCPacket:
         if (
             self.to_address < 256
             and self.from_address < 256
-            and len(self.payload) < 256
+            and len(self.payload) <= NPCPacket.MAX_PAYLOAD
         ):  # check input is possible to parse
-            packet_data = tuple(
-                [self.to_address, self.from_address, len(self.payload)]
-                + list(self.payload)
-            )
-            lrc = NPCPacket.get_npc_checksum(packet_data)
-            return bytes(
-                [0x3E, packet_data[0], packet_data[1], len(self.payload)]
-                + list(self.payload)
-                + [lrc, 0x3C]
+            length = len(self.payload)
+            checksum = -(
+                self.to_address + self.from_address + length + sum(self.payload)
             )
+            try:
+                return _get_frame_struct(length).pack(
+                    NPCPacket.START_BYTE,
+                    self.to_address,
+                    self.from_address,
+                    length,
+                    *self.payload,
+                    checksum & 0xFF,
+                    NPCPacket.END_BYTE,
+                )
+            except struct.error as exception:
+                raise UOSRuntimeError(
+                    f"Can't encode a packet to {self.to_address} from "
+                    f"{self.from_address} with payload {self.payload}, values "
+                    "must be 0-255."
+                ) from exception
         return bytes([])
 
     @staticmethod
-    def get_npc_checksum(packet_data: tuple[int, ...]) -> int:
+    def encode_into(
+        buffer: bytearray | memoryview,
+        offset: int,
+        frames: Sequence[tuple[int, int, tuple[int, ...] | bytes]],
+    ) -> int:
+        """Write NPC frames directly into a caller supplied buffer.
+
+        :param buffer: Writable buffer with room for the frames at the offset.
+        :param offset: Index in the buffer to write the start of the frames.
+        :param frames: The to address, from address and payload of each frame.
+        :return: The offset in the buffer following the frames.
+        :raises: UOSRuntimeError if a frame can't be encoded or doesn't fit,
+                frames before it will have been written.
+        """
+        if offset < 0:
+            raise UOSRuntimeError(f"Can't encode frames at offset {offset}.")
+        for to_address, from_address, payload in frames:
+            length = len(payload)
+            if (
+                not 0 <= to_address <= 0xFF
+                or not 0 <= from_address <= 0xFF
+                or length > NPCPacket.MAX_PAYLOAD
+            ):
+                raise UOSRuntimeError(
+                    f"Can't encode a packet to {to_address} from {from_address} "
+                    f"with a {length} byte payload."
+                )
+            frame_struct = _get_frame_struct(length)
+            if offset + frame_struct.size > len(buffer):
+                raise UOSRuntimeError(
+                    f"Encoding {frame_struct.size} bytes at {offset} "
+                    "overflows the buffer."
+                )
+            try:
+                frame_struct.pack_into(
+                    buffer,
+                    offset,
+                    NPCPacket.START_BYTE,
+                    to_address,
+                    from_address,
+                    length,
+                    *payload,
+                    -(to_address + from_address + length + sum(payload)) & 0xFF,
+                    NPCPacket.END_BYTE,
+                )
+            except struct.error as exception:
+                raise UOSRuntimeError(
+                    f"Can't encode payload {payload!r}, bytes must be 0-255."
+                ) from exception
+            offset += frame_struct.size
+        return offset
+
+    @staticmethod
+    def encode_sequence(
+        frames: Sequence[tuple[int, int, tuple[int, ...] | bytes]]
+    ) -> bytearray:
+        """Encode many NPC frames into a single contiguous buffer.
+
+        :param frames: The to address, from address and payload of each frame.
+        :return: Buffer containing every frame, ready for a single write.
+        :raises: UOSRuntimeError if a frame can't be encoded.
+        """
+        # Gathering the values of every frame and converting them once is
+        # faster than packing each frame into the buffer.
+        values: list[int] = []
+        extend = values.extend
+        for to_address, from_address, payload in frames:
+            length = len(payload)
+            if (
+                not 0 <= to_address <= 0xFF
+                or not 0 <= from_address <= 0xFF
+                or length > NPCPacket.MAX_PAYLOAD
+            ):
+                raise UOSRuntimeError(
+                    f"Can't encode a packet to {to_address} from {from_address} "
+                    f"with a {length} byte payload."
+                )
+            extend((NPCPacket.START_BYTE, to_address, from_address, length))
+            extend(payload)
+            extend(
+                (
+                    -(to_address + from_address + length + sum(payload)) & 0xFF,
+                    NPCPacket.END_BYTE,
+                )
+            )
+        try:
+            return bytearray(values)
+        except ValueError as exception:
+            raise UOSRuntimeError(
+                "Can't encode the frames, payload bytes must be 0-255."
+            ) from exception
+
+    def with_payload_byte(self, index: int, value: int) -> "NPCPacket":
+        """Copy the packet with a payload byte replaced.
+
+        The checksum is adjusted by the change in the byte rather than the
+        packet being recomputed.
+
+        :param index: The index of the payload byte to replace.
+        :param value: The new uint8 value of the byte.
+        :return: New NPCPacket object.
+        """
+        if not 0 <= index < len(self.payload) or not 0 <= value <= 0xFF:
+            raise UOSRuntimeError(
+                f"Can't set payload byte {index} of {len(self.payload)} to {value}."
+            )
+        patched = NPCPacket.__new__(NPCPacket)  # skip recomputing the packet
+        patched.to_address = self.to_address
+        patched.from_address = self.from_address
+        packet = bytearray(self.packet)
+        packet[4 + index] = value
+        packet[-2] = (packet[-2] + self.payload[index] - value) & 0xFF
+        patched.packet = bytes(packet)
+        patched.payload = self.payload[:index] + (value,) + self.payload[index + 1 :]
+        return patched
+
+    @staticmethod
+    def get_npc_checksum(packet_data: tuple[int, ...] | bytes | bytearray) -> int:
         """Generate a NPC LRC checksum.
 
         :param packet_data: List of the uint8 values from an NPC packet.
         :return: NPC checksum as an 8-bit integer.
         """
-        lrc = 0
-        for byte in packet_data:
-            lrc = (lrc + byte) & 0xFF
-        return ((lrc ^ 0xFF) + 1) & 0xFF
+        return -sum(packet_data) & 0xFF
 
     def expects_ack(self) -> bool:
         """Check if this packet is expected to be acknowledged."""
@@ -137,31 +317,93 @@ class NPCPacket:
     def expects_rx_packets(self) -> list[int]:
         """Check if this packet expects rx packets from the function def."""
         if function := UOSFunctions.get_from_address(self.to_address):
-            return function.rx_packets_expected
+            return function.get_rx_packets_expected(self.payload)
         raise UOSUnsupportedError(
             "When checking `expects_rx_packets, "
             f"function for address {self.to_address} could not be located."
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ComResult:
-    """Containing the data structure used to capture UOS results."""
+    """Containing the data structure used to capture UOS results.
+
+    Frames are held as the immutable bytes produced by the decoder, payload
+    accessors return views into those frames rather than copies.
+    """
 
     status: bool
     exception: str = ""
-    ack_packet: list = field(default_factory=list)
-    rx_packets: list = field(default_factory=list)
+    ack_packet: bytes = b""
+    rx_packets: list[bytes] = field(default_factory=list)
     tx_packet: NPCPacket | None = None
 
     def get_rx_payload(self, packet_index: int) -> list[int]:
-        """Return just the payload portion of a rx packet."""
+        """Return just the payload portion of a rx packet.
+
+        :param packet_index: The index of the rx packet, excluding the ACK.
+        :return: List of the uint8 payload values.
+        :raises: UOSRuntimeError if the packet index isn't in the result.
+        """
+        return list(self.get_rx_payload_view(packet_index))
+
+    def get_rx_payload_view(self, packet_index: int) -> memoryview:
+        """Return the payload portion of a rx packet without copying it.
+
+        :param packet_index: The index of the rx packet, excluding the ACK.
+        :return: A read-only view of the payload bytes.
+        :raises: UOSRuntimeError if the packet index isn't in the result.
+        """
         if len(self.rx_packets) <= packet_index:
             raise UOSRuntimeError(
                 f"Can't index payload {packet_index} of "
                 f"{len(self.rx_packets)} rx packet(s)."
             )
-        return self.rx_packets[packet_index][4:-2]
+        return memoryview(self.rx_packets[packet_index])[4:-2]
+
+    def get_rx_int(
+        self, packet_index: int, offset: int = 0, size: int = 1, signed: bool = False
+    ) -> int:
+        """Decode a big-endian integer from the payload of a rx packet.
+
+        :param packet_index: The index of the rx packet, excluding the ACK.
+        :param offset: The payload byte the integer starts at.
+        :param size: The number of bytes used to represent the integer.
+        :param signed: True if the integer is two's complement.
+        :return: The decoded integer.
+        :raises: UOSRuntimeError if the bytes aren't in the payload.
+        """
+        payload = self.get_rx_payload_view(packet_index)
+        if offset < 0 or size < 1 or offset + size > len(payload):
+            raise UOSRuntimeError(
+                f"Can't decode {size} byte(s) at offset {offset} of "
+                f"a {len(payload)} byte payload."
+            )
+        return int.from_bytes(payload[offset : offset + size], "big", signed=signed)
+
+    def get_rx_ints(
+        self, packet_index: int, size: int = 1, signed: bool = False
+    ) -> list[int]:
+        """Decode the whole payload of a rx packet as big-endian integers.
+
+        :param packet_index: The index of the rx packet, excluding the ACK.
+        :param size: The number of bytes used to represent each integer.
+        :param signed: True if the integers are two's complement.
+        :return: List of decoded integers in payload order.
+        :raises: UOSRuntimeError if the payload isn't a multiple of size.
+        """
+        payload = self.get_rx_payload_view(packet_index)
+        if size < 1 or len(payload) % size:
+            raise UOSRuntimeError(
+                f"Can't decode a {len(payload)} byte payload "
+                f"as {size} byte integers."
+            )
+        if size == 1 and not signed:
+            return list(payload)
+        return [
+            int.from_bytes(payload[index : index + size], "big", signed=signed)
+            for index in range(0, len(payload), size)
+        ]
 
 
 @dataclass(frozen=True)
@@ -171,9 +413,73 @@ class InstructionArguments:
     payload: tuple = ()
     expected_rx_packets: int = 1
     check_pin: int | None = None
+    check_pins: tuple[int, ...] = ()
     volatility: Persistence = Persistence.NONE
 
 
+class PreparedInstruction:
+    """An instruction that has been validated and encoded ahead of execution.
+
+    Created by ``UOSDevice.prepare``. Payload bytes can be patched between
+    executions, this updates the encoded packet rather than rebuilding it.
+
+    :ivar function: The UOS function the instruction executes.
+    :ivar packet: The encoded instruction packet.
+    :ivar expected_rx_packets: How many packets including ACK to expect.
+    """
+
+    def __init__(
+        self,
+        function: UOSFunction,
+        packet: NPCPacket,
+        expected_rx_packets: int,
+        compatible_pins: frozenset,
+        executor: Callable[["PreparedInstruction"], ComResult],
+    ):
+        """Create a prepared instruction, use ``UOSDevice.prepare`` instead.
+
+        :param function: The UOS function the instruction executes.
+        :param packet: The encoded instruction packet.
+        :param expected_rx_packets: How many packets including ACK to expect.
+        :param compatible_pins: Pins that may be patched into the payload.
+        :param executor: Callback executing the instruction on the device.
+        """
+        self.function = function
+        self.packet = packet
+        self.expected_rx_packets = expected_rx_packets
+        self._compatible_pins = compatible_pins
+        self._executor = executor
+
+    def patch(self, index: int, value: int) -> "PreparedInstruction":
+        """Replace a byte of the payload, such as the level of a GPIO write.
+
+        :param index: The index of the payload byte to replace.
+        :param value: The new uint8 value of the byte.
+        :return: This prepared instruction so calls can be chained.
+        :raises: UOSUnsupportedError if a pin is patched in that doesn't
+                support the function.
+        """
+        if (
+            self.function.pin_requirements is not None
+            and index < len(self.packet.payload)
+            and index % self.function.payload_stride == 0
+            and value not in self._compatible_pins
+        ):
+            raise UOSUnsupportedError(
+                f"{self.function.name} isn't supported on pin {value}."
+            )
+        # Results hold the packet they were sent with, so replace it.
+        self.packet = self.packet.with_payload_byte(index, value)
+        return self
+
+    def execute(self) -> ComResult:
+        """Execute the instruction on the device it was prepared for.
+
+        :return: ComResult object.
+        """
+        return self._executor(self)
+
+
 class UOSInterface(metaclass=ABCMeta):
     """Base class for low level UOS interfaces classes to inherit."""
 
@@ -213,6 +519,20 @@ class UOSInterface(metaclass=ABCMeta):
             f"{UOSInterface.read_response.__name__} prototype."
         )
 
+    @abstractmethod
+    def reset_input(self):
+        """Discard received data that hasn't been read, such as late responses.
+
+        :raises: UOSUnsupportedError if the interface hasn't been built
+                correctly.
+        :raises: UOSCommunicationError if there is a problem completing
+                the action.
+        """
+        raise UOSUnsupportedError(
+            "UOSInterfaces must over-ride "
+            f"{UOSInterface.reset_input.__name__} prototype."
+        )
+
     @abstractmethod
     def hard_reset(self) -> ComResult:
         """UOS loop reset functionality should be as hard a reset as possible.
@@ -281,6 +601,122 @@ class UOSInterface(metaclass=ABCMeta):
         )
 
 
+class AsyncUOSInterface(metaclass=ABCMeta):
+    """Base class for asyncio UOS interface classes to inherit.
+
+    Mirrors the blocking ``UOSInterface`` with awaitable methods, these must
+    not block the event loop while waiting on the device.
+    """
+
+    # Dead code suppression used as abstract interfaces are false positives.
+    @abstractmethod
+    async def execute_instruction(  # dead: disable
+        self, packet: NPCPacket
+    ) -> ComResult:
+        """Abstract method for executing instructions on AsyncUOSInterfaces.
+
+        :param packet: A tuple containing the uint8 npc packet for the UOS instruction.
+        :returns: ComResult object.
+        :raises: UOSUnsupportedError if the interface hasn't been built
+                correctly.
+        :raises: UOSCommunicationError if there is a problem completing
+                the action.
+        """
+        raise UOSUnsupportedError(
+            "AsyncUOSInterfaces must over-ride "
+            f"{AsyncUOSInterface.execute_instruction.__name__} prototype."
+        )
+
+    @abstractmethod
+    async def read_response(
+        self, expect_packets: int, timeout_s: float  # dead: disable
+    ) -> ComResult:
+        """Read ACK and Data packets from an AsyncUOSInterface.
+
+        :param expect_packets: How many packets including ACK to expect
+        :param timeout_s: The maximum time this function will wait for data.
+        :return: COM Result object.
+        :raises: UOSUnsupportedError if the interface hasn't been built
+                correctly.
+        :raises: UOSCommunicationError if there is a problem completing
+                the action.
+        """
+        raise UOSUnsupportedError(
+            "AsyncUOSInterfaces must over-ride "
+            f"{AsyncUOSInterface.read_response.__name__} prototype."
+        )
+
+    @abstractmethod
+    async def reset_input(self):
+        """Discard received data that hasn't been read, such as late responses.
+
+        :raises: UOSUnsupportedError if the interface hasn't been built
+                correctly.
+        :raises: UOSCommunicationError if there is a problem completing
+                the action.
+        """
+        raise UOSUnsupportedError(
+            "AsyncUOSInterfaces must over-ride "
+            f"{AsyncUOSInterface.reset_input.__name__} prototype."
+        )
+
+    @abstractmethod
+    async def hard_reset(self) -> ComResult:
+        """UOS loop reset functionality should be as hard a reset as possible.
+
+        :return: COM Result object.
+        :raises: UOSUnsupportedError if the interface hasn't been built
+                correctly.
+        :raises: UOSCommunicationError if there is a problem completing
+                the action.
+        """
+        raise UOSUnsupportedError(
+            "AsyncUOSInterfaces must over-ride "
+            f"{AsyncUOSInterface.hard_reset.__name__} prototype"
+        )
+
+    @abstractmethod
+    async def open(self):
+        """Abstract method for opening a connection to an AsyncUOSInterface.
+
+        :raises: UOSUnsupportedError if the interface hasn't been built
+                correctly.
+        :raises: UOSCommunicationError if there is a problem completing
+                the action.
+        """
+        raise UOSUnsupportedError(
+            "AsyncUOSInterfaces must over-ride "
+            f"{AsyncUOSInterface.open.__name__} prototype."
+        )
+
+    @abstractmethod
+    async def close(self):
+        """Abstract method for closing a connection to an AsyncUOSInterface.
+
+        :raises: UOSUnsupportedError if the interface hasn't been built
+                correctly.
+        :raises: UOSCommunicationError if there is a problem completing
+                the action.
+        """
+        raise UOSUnsupportedError(
+            "AsyncUOSInterfaces must over-ride "
+            f"{AsyncUOSInterface.close.__name__} prototype."
+        )
+
+    @abstractmethod
+    def is_active(self) -> bool:
+        """Abstract method for checking if a connection is being held active.
+
+        :return: Success boolean.
+        :raises: UOSUnsupportedError if the interface hasn't been built
+                correctly.
+        """
+        raise UOSUnsupportedError(
+            "AsyncUOSInterfaces must over-ride "
+            f"{AsyncUOSInterface.is_active.__name__} prototype."
+        )
+
+
 @dataclass(init=False)
 class Sample:
     """A converted response from a reading on a pin."""
@@ -294,9 +730,9 @@ class Sample:
 class ADCSample(Sample):
     """ADC specific Sample constructor for ADC readings."""
 
-    def __init__(self, raw_value: list[int], steps: int, reference: float):
+    def __init__(self, raw_value: Sequence[int], steps: int, reference: float):
         """Create an ADC Sample."""
-        self.raw_value = int(bytes(raw_value).hex(), 16)  # convert bytes to int
+        self.raw_value = int.from_bytes(raw_value, "big")
         self.value = (self.raw_value / steps) * reference
         self.time = datetime.now()
         logger.debug(
@@ -339,6 +775,9 @@ class Pin:
     # Values updated during runtime.
     gpio_reading: DigitalSample | None = None
     adc_reading: ADCSample | None = None
+    # Optional histories of the readings, see UOSDevice.enable_history.
+    gpio_history: SampleHistory | None = None
+    adc_history: SampleHistory | None = None
 
 
 @dataclass(frozen=True)
@@ -362,25 +801,25 @@ class Device:
             or "adc_resolution" not in self.aux_params
         ):
             raise UOSRuntimeError("Device not properly defined for ADC updates.")
-        sample_values = result.get_rx_payload(0)
-        logger.debug("Device returned sampled adc values %s", sample_values)
+        sample_values = result.get_rx_payload_view(0)
+        logger.debug("Device returned sampled adc packet %s", result.rx_packets[0])
+        time_ns = monotonic_ns()
         for sample_index, pin in enumerate(result.tx_packet.payload):
             if pin not in self.pins:
                 raise UOSRuntimeError(
                     f"Can't update ADC samples on pin {pin} "
                     f"as it's invalid for {self.name}."
                 )
-            self.pins[pin].adc_reading = ADCSample(
+            reading = ADCSample(
                 sample_values[sample_index * 2 : sample_index * 2 + 2],
                 steps=pow(2, self.aux_params["adc_resolution"]),
                 reference=self.aux_params["adc_reference"],
             )
-            logger.debug(
-                "Setting pin %s adc reading to %s",
-                pin,
-                # This is a false call as it can't be None here.
-                self.pins[pin].adc_reading.value,  # type: ignore
-            )
+            self.pins[pin].adc_reading = reading
+            history = self.pins[pin].adc_history
+            if history is not None:
+                history.append(reading.raw_value, reading.value, time_ns)
+            logger.debug("Setting pin %s adc reading to %s", pin, reading.value)
 
     def update_gpio_samples(self, result: ComResult):
         """Update the pin samples with the response of a get_gpio_inpout."""
@@ -388,8 +827,9 @@ class Device:
             raise UOSRuntimeError("Can't update GPIO samples from a failed responsee.")
         if result.tx_packet is None or len(result.rx_packets) < 1:
             raise UOSRuntimeError("Can't update GPIO samples without a valid result.")
-        sample_values = result.get_rx_payload(0)
-        logger.debug("Device returned sampled gpio values %s", sample_values)
+        sample_values = result.get_rx_payload_view(0)
+        logger.debug("Device returned sampled gpio packet %s", result.rx_packets[0])
+        time_ns = monotonic_ns()
         for sample_index, pin in enumerate(sample_values):
             pin = result.tx_packet.payload[2 * sample_index]
             if pin not in self.pins:
@@ -398,6 +838,11 @@ class Device:
                     f"as it's invalid for {self.name}."
                 )
             self.pins[pin].gpio_reading = DigitalSample(sample_values[sample_index])
+            history = self.pins[pin].gpio_history
+            if history is not None:
+                history.append(
+                    sample_values[sample_index], sample_values[sample_index], time_ns
+                )
             logger.debug(
                 "Setting pin %s gpio reading to %s",
                 pin,
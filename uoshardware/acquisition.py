@@ -0,0 +1,170 @@
+"""Provides continuous acquisition of readings from UOS devices."""
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from time import monotonic_ns, sleep
+
+from uoshardware import UOSCommunicationError, UOSRuntimeError, logger
+from uoshardware.abstractions import ComResult
+
+# Fraction of a period a batch can be requested after schedule and not be late.
+LATE_TOLERANCE = 0.1
+
+
+@dataclass(frozen=True, slots=True)
+class ADCBatch:
+    """ADC readings of every streamed pin taken by a single instruction.
+
+    :ivar sequence: The index of the sampling period the batch was taken in,
+        gaps in the sequence indicate dropped periods.
+    :ivar time_ns: The monotonic timestamp of the response in ns.
+    :ivar pins: The pin indices in the order they were sampled.
+    :ivar raw_values: The raw ADC value of each pin.
+    :ivar values: The ADC value of each pin converted to volts.
+    """
+
+    sequence: int
+    time_ns: int
+    pins: tuple[int, ...]
+    raw_values: tuple[int, ...]
+    values: tuple[float, ...]
+
+
+@dataclass
+class StreamStats:
+    """Statistics on how well a stream is keeping to its target rate.
+
+    :ivar batches: The number of batches acquired.
+    :ivar late: Batches requested after their scheduled time.
+    :ivar dropped: Sampling periods skipped as the consumer fell behind.
+    """
+
+    target_rate_hz: float
+    batches: int = 0
+    late: int = 0
+    dropped: int = 0
+    first_ns: int | None = None
+    last_ns: int | None = None
+
+    @property
+    def achieved_rate_hz(self) -> float:
+        """The mean rate batches have been acquired at."""
+        if self.batches < 2 or self.first_ns is None or self.last_ns is None:
+            return 0.0
+        return (self.batches - 1) * 1e9 / max(1, self.last_ns - self.first_ns)
+
+
+class ADCStream:
+    """Iterator acquiring ADC batches from a device at a target rate.
+
+    Created by ``UOSDevice.stream_adc``. Instructions are only sent as batches
+    are requested, so a consumer that falls behind applies backpressure.
+    Sampling periods the consumer misses entirely are skipped and counted as
+    dropped rather than being read in a burst to catch up.
+
+    Each batch holds the device only while its instruction executes, so the
+    device can be used by other threads while the consumer handles a batch.
+    Lazily loaded devices open their connection for every batch.
+
+    :ivar stats: The statistics of the stream so far.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[], ComResult],
+        pins: tuple[int, ...],
+        rate_hz: float,
+        *,
+        scale: float,
+        max_batches: int | None = None,
+    ):
+        """Create a stream, use ``UOSDevice.stream_adc`` instead.
+
+        :param read: Callback executing a single ADC instruction on the device.
+        :param pins: The pin indices sampled by the instruction.
+        :param rate_hz: The target rate to acquire batches at.
+        :param scale: Multiplier converting raw values to volts.
+        :param max_batches: Stop after this many batches, None runs forever.
+        :raises: UOSRuntimeError if the rate isn't positive.
+        """
+        if rate_hz <= 0:
+            raise UOSRuntimeError(f"Can't stream ADC at {rate_hz}Hz.")
+        self.stats = StreamStats(rate_hz)
+        self._read = read
+        self._pins = pins
+        self._period_ns = int(1e9 / rate_hz)
+        self._scale = scale
+        self._batches = self._acquire(max_batches)
+
+    def __iter__(self) -> Iterator[ADCBatch]:
+        """Return the stream itself as it's an iterator."""
+        return self
+
+    def __next__(self) -> ADCBatch:
+        """Wait for the next sampling period and acquire a batch."""
+        return next(self._batches)
+
+    def __enter__(self):
+        """Use the stream as a context manager, closing it on exit."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):  # dead: disable
+        """Close the stream."""
+        self.close()
+
+    def close(self):
+        """Stop the stream, no more batches are acquired."""
+        self._batches.close()
+
+    def _acquire(self, max_batches: int | None) -> Iterator[ADCBatch]:
+        """Generate batches on schedule.
+
+        :param max_batches: Stop after this many batches, None runs forever.
+        """
+        tolerance_ns = int(self._period_ns * LATE_TOLERANCE)
+        deadline_ns = monotonic_ns()
+        sequence = 0
+        while max_batches is None or self.stats.batches < max_batches:
+            now_ns = monotonic_ns()
+            if now_ns < deadline_ns:
+                sleep((deadline_ns - now_ns) / 1e9)
+            elif now_ns - deadline_ns >= self._period_ns:
+                # The consumer has missed whole periods, skip rather than burst.
+                missed = (now_ns - deadline_ns) // self._period_ns
+                self.stats.dropped += missed
+                sequence += missed
+                deadline_ns += missed * self._period_ns
+                self.stats.late += 1
+            elif now_ns - deadline_ns > tolerance_ns:
+                self.stats.late += 1
+            yield self._read_batch(sequence)
+            sequence += 1
+            deadline_ns += self._period_ns
+
+    def _read_batch(self, sequence: int) -> ADCBatch:
+        """Execute a single ADC instruction and decode the batch.
+
+        :param sequence: The index of the sampling period.
+        :return: The decoded batch.
+        :raises: UOSCommunicationError if the instruction fails.
+        """
+        result = self._read()
+        if not result.status:
+            raise UOSCommunicationError(
+                f"ADC stream failed after {self.stats.batches} batches: "
+                f"{result.exception}"
+            )
+        time_ns = monotonic_ns()
+        raw_values = tuple(result.get_rx_ints(0, size=2))
+        stats = self.stats
+        if stats.first_ns is None:
+            stats.first_ns = time_ns
+        stats.last_ns = time_ns
+        stats.batches += 1
+        logger.debug("ADC stream acquired batch %s", sequence)
+        return ADCBatch(
+            sequence,
+            time_ns,
+            self._pins,
+            raw_values,
+            tuple(raw_value * self._scale for raw_value in raw_values),
+        )
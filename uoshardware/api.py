@@ -1,7 +1,14 @@
 """Provides the HAL layer for communicating with the hardware."""
+import threading
+from collections import deque
+from collections.abc import Callable, Sequence
+from contextlib import contextmanager
+from time import monotonic, perf_counter_ns, sleep
+
 from uoshardware import (
     Loading,
     Persistence,
+    UOSCommunicationError,
     UOSRuntimeError,
     UOSUnsupportedError,
     logger,
@@ -11,15 +18,23 @@ from uoshardware.abstractions import (
     Device,
     InstructionArguments,
     NPCPacket,
-    Pin,
+    PreparedInstruction,
     UOSFunction,
     UOSFunctions,
     UOSInterface,
 )
-from uoshardware.devices import Devices
+from uoshardware.acquisition import ADCStream
+
+# Re-exported as client projects look up device definitions from the api.
+from uoshardware.base import get_device_definition  # pylint: disable=unused-import
+from uoshardware.base import _UOSDeviceBase
+from uoshardware.decoder import NPCDecoder
 from uoshardware.interface import Interface
 from uoshardware.interface.serial import Serial
 from uoshardware.interface.stub import Stub
+from uoshardware.metrics import FunctionMetrics
+from uoshardware.timeouts import check_deadline
+from uoshardware.tracing import span
 
 
 # This is an interface for client implementations dead code false positive.
@@ -41,21 +56,8 @@ def enumerate_system_devices(  # dead: disable
     return system_devices
 
 
-def get_device_definition(identity: str) -> Device | None:
-    """Look up the system config dictionary for the defined device mappings.
-
-    :param identity: String containing the lookup key of the device in the dictionary.
-    :return: Device Object or None if not found
-    """
-    if identity is not None and hasattr(Devices, identity):
-        device = getattr(Devices, identity)
-    else:
-        device = None
-    return device
-
-
 # Interface aimed for use by client projects, dead false positive.
-class UOSDevice:  # dead: disable
+class UOSDevice(_UOSDeviceBase):  # dead: disable
     """Class for high level object-orientated control of UOS devices.
 
     :ivar identity: The type of device, this is must have a valid device in the config.
@@ -63,11 +65,7 @@ class UOSDevice:  # dead: disable
         device and interface.
     """
 
-    __device: Device  # Device definitions as parsed from a compatible ini.
-    identity = ""
-    address = ""
     __device_interface: UOSInterface  # Lower level communication protocol layer.
-    loading: Loading
     __kwargs: dict = {}  # Connection specific / optional parameters.
 
     def __init__(
@@ -76,6 +74,7 @@ class UOSDevice:  # dead: disable
         address: str,
         interface: Interface = Interface.SERIAL,
         loading: Loading = Loading.EAGER,
+        idle_timeout_s: float = 5.0,
         **kwargs,
     ):
         """Instantiate a UOS device instance for communication.
@@ -85,37 +84,27 @@ class UOSDevice:  # dead: disable
         interface.
         :param interface: Set the type of interface to use for communication.
         loading: Alter the loading strategy for managing the communication.
+        :param idle_timeout_s: How long a keep alive connection can be idle
+        before it is closed.
         :param kwargs: Additional optional connection parameters as defined in
         documentation.
         """
-        self.address = address
+        super().__init__(identity, address, loading)
         self.__kwargs = kwargs
-        self.loading = loading
-        device = None
-        if isinstance(identity, Device):
-            self.identity = identity.name
-            device = identity
-        elif isinstance(identity, str):
-            self.identity = identity
-            device = get_device_definition(identity)
-        if device is None:
-            raise UOSUnsupportedError(
-                f"'{self.identity}' does not have a valid look up table"
-            )
-        self.__device = device
+        self.__lock = threading.RLock()
+        self.__idle_timeout_s = idle_timeout_s
+        self.__last_used_s = monotonic()
+        self.__reaper: threading.Thread | None = None
         if (
             interface == Interface.SERIAL
-            and Interface.SERIAL in self.__device.interfaces
+            and Interface.SERIAL in self._device.interfaces
         ):
             self.__device_interface = Serial(
                 address,
-                baudrate=self.__device.aux_params["default_baudrate"],
-            )
-        elif interface == Interface.STUB and Interface.STUB in self.__device.interfaces:
-            self.__device_interface = Stub(
-                connection=address,
-                errored=(kwargs["errored"] if "errored" in kwargs else False),
+                baudrate=self._device.aux_params["default_baudrate"],
             )
+        elif interface == Interface.STUB and Interface.STUB in self._device.interfaces:
+            self.__device_interface = Stub(**self._get_stub_arguments(kwargs))
         else:
             raise UOSUnsupportedError(
                 f"'{interface}' cannot be used for device `{self.identity}`"
@@ -149,11 +138,25 @@ class UOSDevice:  # dead: disable
         """
         return self.__execute_instruction(
             UOSFunctions.set_gpio_output,
-            InstructionArguments(
-                payload=(pin, level),
-                check_pin=pin,
-                volatility=volatility,
-            ),
+            self._get_gpio_output_arguments(pin, level, volatility),
+        )
+
+    def set_gpio_outputs(
+        self, levels: dict[int, int], volatility: Persistence = Persistence.NONE
+    ) -> ComResult:
+        """Set multiple pins to digital output mode with a single instruction.
+
+        :param levels: Mapping of pin numbers to their output level,
+                0 - low, 1 - High.
+        :param volatility: How volatile should the command be, use constants
+                from uoshardware.
+        :return: ComResult object, if the pins don't fit in a single packet
+                the status reflects every packet sent.
+        """
+        return self.__execute_batched(
+            UOSFunctions.set_gpio_output,
+            list(levels.items()),
+            volatility,
         )
 
     def get_gpio_input(
@@ -173,17 +176,41 @@ class UOSDevice:  # dead: disable
         """
         result = self.__execute_instruction(
             UOSFunctions.get_gpio_input,
-            InstructionArguments(
-                payload=(pin, 1 if pull_up else 0),
-                expected_rx_packets=2,
-                check_pin=pin,
-                volatility=volatility,
-            ),
+            self._get_gpio_input_arguments(pin, pull_up, volatility),
         )
         if result.status:
-            self.__device.update_gpio_samples(result)
+            self._device.update_gpio_samples(result)
         return result
 
+    def get_gpio_inputs(
+        self,
+        pins: Sequence[int],
+        pull_ups: bool | Sequence[bool] = False,
+        volatility: Persistence = Persistence.NONE,
+    ) -> ComResult:
+        """Read the levels of multiple GPIO pins with a single instruction.
+
+        :param pins: The numeric numbers of the pins as defined in the
+                dictionary for that device.
+        :param pull_ups: Enable the internal pull-up resistors, either a single
+                setting for all pins or a setting per pin. Default is false.
+        :param volatility: How volatile should the command be, use
+                constants from uoshardware.
+        :return: ComResult object, if the pins don't fit in a single packet
+                the rx packets for each packet sent are included in order.
+        """
+        if isinstance(pull_ups, bool):
+            pull_ups = [pull_ups] * len(pins)
+        if len(pull_ups) != len(pins):
+            raise UOSRuntimeError("A pull-up setting must be provided for each pin.")
+        return self.__execute_batched(
+            UOSFunctions.get_gpio_input,
+            [(pin, 1 if pull_up else 0) for pin, pull_up in zip(pins, pull_ups)],
+            volatility,
+            expected_rx_packets=2,
+            update_samples=self._device.update_gpio_samples,
+        )
+
     def get_adc_input(
         self,
         pin: int,
@@ -194,15 +221,68 @@ class UOSDevice:  # dead: disable
         :return: ComResult object containing the ADC readings.
         """
         result = self.__execute_instruction(
-            UOSFunctions.get_adc_input,
-            InstructionArguments(
-                payload=tuple([pin]), expected_rx_packets=2, check_pin=pin
-            ),
+            UOSFunctions.get_adc_input, self._get_adc_input_arguments(pin)
         )
         if result.status:  # update the samples in the device.
-            self.__device.update_adc_samples(result)
+            self._device.update_adc_samples(result)
         return result
 
+    def get_adc_inputs(self, pins: Sequence[int]) -> ComResult:
+        """Read the current 10 bit ADC values of multiple channels at once.
+
+        :param pins: The indices of the analog pins to read.
+        :return: ComResult object containing the ADC readings, two bytes
+                per pin in the order requested.
+        """
+        return self.__execute_batched(
+            UOSFunctions.get_adc_input,
+            [(pin,) for pin in pins],
+            Persistence.NONE,
+            expected_rx_packets=2,
+            update_samples=self._device.update_adc_samples,
+        )
+
+    def stream_adc(
+        self, pins: Sequence[int], rate_hz: float, max_batches: int | None = None
+    ) -> ADCStream:
+        """Continuously sample ADC channels at a target rate.
+
+        The instruction is prepared once and executed each sampling period as
+        batches are consumed from the stream. The device is only held while
+        each batch is read, so it can be shared with other threads. Pin
+        readings and histories are updated as with ``get_adc_inputs``.
+
+        :param pins: The indices of the analog pins to read.
+        :param rate_hz: The target rate to sample the pins at.
+        :param max_batches: Stop after this many batches, None runs until closed.
+        :return: ADCStream iterator of ADCBatch objects.
+        :raises: UOSUnsupportedError if a pin doesn't support ADC reads.
+        :raises: UOSRuntimeError if the pins don't fit in a single instruction
+                or the device doesn't define its ADC.
+        """
+        pins = tuple(pins)
+        if not 0 < len(pins) <= NPCPacket.MAX_PAYLOAD // 2:
+            raise UOSRuntimeError(
+                f"ADC streams sample 1 to {NPCPacket.MAX_PAYLOAD // 2} pins."
+            )
+        if (
+            "adc_reference" not in self._device.aux_params
+            or "adc_resolution" not in self._device.aux_params
+        ):
+            raise UOSRuntimeError("Device not properly defined for ADC streams.")
+        prepared = self.prepare(
+            UOSFunctions.get_adc_input,
+            InstructionArguments(payload=pins, expected_rx_packets=2, check_pins=pins),
+        )
+        return ADCStream(
+            prepared.execute,
+            pins,
+            rate_hz,
+            scale=self._device.aux_params["adc_reference"]
+            / pow(2, self._device.aux_params["adc_resolution"]),
+            max_batches=max_batches,
+        )
+
     def get_system_info(self) -> ComResult:
         """Read the UOS version and device type.
 
@@ -247,135 +327,439 @@ class UOSDevice:  # dead: disable
         :raises: UOSCommunicationError - Problem closing the connection
         to an active device.
         """
-        self.__device_interface.close()
+        with self.__lock:
+            self.__device_interface.close()
+
+    @contextmanager
+    def __connection(self):
+        """Hold the connection for instructions as required by the loading strategy.
+
+        Instructions are serialised so the keep alive reaper can't close the
+        connection while it's in use.
+        """
+        with self.__lock:
+            try:
+                with span("uos.connect", loading=self.loading.name):
+                    if self.loading == Loading.LAZY:  # Lazy loaded
+                        check_deadline("opening the connection")
+                        self.open()
+                    elif self.loading == Loading.KEEP_ALIVE:
+                        self.__keep_alive()
+                yield
+            finally:  # Safety check for lazy loading outside of context manager
+                if self.loading == Loading.LAZY:  # Lazy loaded
+                    with span("uos.disconnect"):
+                        self.close()
+                self.__last_used_s = monotonic()
+
+    def __keep_alive(self):
+        """Open the connection if required and ensure the idle reaper is running."""
+        if not self.is_active():
+            check_deadline("opening the connection")
+            self.open()
+        if self.__reaper is None:
+            self.__reaper = threading.Thread(
+                target=self.__reap_idle_connection,
+                name=f"uos-keep-alive-{self.address}",
+                daemon=True,
+            )
+            self.__reaper.start()
+
+    def __reap_idle_connection(self):
+        """Close the connection once it has been idle for the idle timeout."""
+        while True:
+            with self.__lock:
+                idle_s = monotonic() - self.__last_used_s
+                if not self.is_active() or idle_s >= self.__idle_timeout_s:
+                    if self.is_active():
+                        logger.debug("Closing %s after %ss idle", self.address, idle_s)
+                        self.close()
+                    self.__reaper = None
+                    return
+            sleep(self.__idle_timeout_s - idle_s)
 
     def __execute_instruction(
         self,
         function: UOSFunction,
         instruction_data: InstructionArguments,
-        retry: bool = True,
     ) -> ComResult:
         """Execute a generic UOS function and get the result.
 
         :param function: The name of the function in the OOL.
         :param instruction_data: device_functions from the LUT, payload ect.
-        :param retry: Allows the instruction to retry execution when fails.
         :return: ComResult object
         :raises: UOSUnsupportedError if function is not possible on the
                 loaded device.
         """
-        if (
-            function.name not in self.__device.functions_enabled
-            or (
-                instruction_data.check_pin is not None
-                and instruction_data.check_pin not in self.get_compatible_pins(function)
-            )
-            or instruction_data.volatility
-            not in self.__device.functions_enabled[function.name]
-        ):
-            logger.debug(
-                "Known functions %s", str(self.__device.functions_enabled.keys())
-            )
-            raise UOSUnsupportedError(
-                f"{function.name}({instruction_data.volatility.name}) "
-                f"has not been implemented for {self.identity}"
-            )
-        rx_response = ComResult(False)
-        try:
-            if self.loading == Loading.LAZY:  # Lazy loaded
-                self.open()
+        start_ns = perf_counter_ns() if self.metrics.enabled else 0
+        with span("uos.encode", function=function.name):
+            self._validate_instruction(function, instruction_data)
+            packet = None
             if function.address_lut[instruction_data.volatility] >= 0:
-                # a normal instruction
-                packet = NPCPacket(
-                    to_address=function.address_lut[instruction_data.volatility],
-                    from_address=0,
-                    payload=instruction_data.payload,
-                )
-                logger.debug("Function %s assembled packet: %s", function.name, packet)
-                tx_response = self.__device_interface.execute_instruction(packet)
-                if tx_response.status:
-                    rx_response = self.__device_interface.read_response(
-                        instruction_data.expected_rx_packets, 2
+                packet = self._get_packet(function, instruction_data)
+        if start_ns:
+            self.metrics.get(function.name).observe_ns(
+                "encode", perf_counter_ns() - start_ns
+            )
+        return self.__execute_packet(
+            function, packet, instruction_data.expected_rx_packets, start_ns
+        )
+
+    def __execute_packet(
+        self,
+        function: UOSFunction,
+        packet: NPCPacket | None,
+        expected_rx_packets: int,
+        start_ns: int = 0,
+    ) -> ComResult:
+        """Execute a validated instruction, retrying as the retry policy allows.
+
+        :param function: The name of the function in the OOL.
+        :param packet: The assembled instruction packet, None for special actions.
+        :param expected_rx_packets: How many packets including ACK to expect.
+        :param start_ns: When the instruction started being encoded, if timed.
+        :return: ComResult object
+        :raises: UOSCircuitOpenError if the device's circuit is open.
+        :raises: UOSCommunicationError if the final attempt raised.
+        """
+        metrics = self._get_function_metrics(function)
+        if metrics and not start_ns:
+            start_ns = perf_counter_ns()
+        with span("uos.instruction", function=function.name, address=self.address):
+            self._check_circuit()
+            try:
+                # The connection is held so lazy devices only open once.
+                with self.__connection():
+                    rx_response = self.__attempt(
+                        function, packet, expected_rx_packets, metrics
                     )
-                    if rx_response.status:
-                        # validate checksums on all packets
-                        for count in range(len(rx_response.rx_packets) + 1):
-                            current_packet = (
-                                rx_response.ack_packet
-                                if count == 0
-                                else rx_response.rx_packets[count - 1]
-                            )
-                            computed_checksum = NPCPacket.get_npc_checksum(
-                                current_packet[1:-2]
-                            )
-                            logger.debug(
-                                "Calculated checksum %s must match rx %s",
-                                computed_checksum,
-                                current_packet[-2],
-                            )
-                            rx_response.status = rx_response.status & (
-                                computed_checksum == current_packet[-2]
-                            )
-                # include the tx packet for convenience
-                rx_response.tx_packet = packet
-            else:  # run a special action
-                rx_response = getattr(self.__device_interface, function.name)()
-        finally:  # Safety check for lazy loading being used outside of context manager
-            if self.loading == Loading.LAZY:  # Lazy loaded
-                self.close()
-        if not rx_response.status and retry:
-            # allow one retry per instruction due to DTR resets
-            return self.__execute_instruction(function, instruction_data, False)
+            except UOSCommunicationError:
+                self._record_instruction(None, metrics, start_ns)
+                raise
+        self._record_instruction(rx_response, metrics, start_ns)
         return rx_response
 
-    def is_active(self) -> bool:
-        """Check if a connection is being held active to the device.
+    def __attempt(
+        self,
+        function: UOSFunction,
+        packet: NPCPacket | None,
+        expected_rx_packets: int,
+        metrics: FunctionMetrics | None,
+    ) -> ComResult:
+        """Attempt an instruction until it succeeds or the retry policy gives up.
 
-        :return: Boolean, true if connection is held active.
+        :param function: The name of the function in the OOL.
+        :param packet: The assembled instruction packet, None for special actions.
+        :param expected_rx_packets: How many packets including ACK to expect.
+        :param metrics: The metrics to record the attempts in, None to skip.
+        :return: ComResult object of the final attempt.
+        :raises: UOSCommunicationError if the final attempt raised.
         """
-        return self.__device_interface.is_active()
+        deadline_s = self.retry_policy.get_deadline_s()
+        attempt = 1
+        while True:
+            try:
+                rx_response = self.__transfer(
+                    function, packet, expected_rx_packets, metrics
+                )
+            except UOSCommunicationError:
+                backoff_s = self._get_retry_backoff_s(
+                    function, None, attempt, deadline_s, metrics
+                )
+                if backoff_s is None:
+                    raise
+            else:
+                backoff_s = self._get_retry_backoff_s(
+                    function, rx_response, attempt, deadline_s, metrics
+                )
+                if backoff_s is None:
+                    return rx_response
+            sleep(backoff_s)
+            attempt += 1
 
-    # False positive as this is a client-facing function.
-    def get_pin(self, pin: int) -> Pin:  # dead: disable
-        """Return a pin object corresponding to index.
+    def __transfer(
+        self,
+        function: UOSFunction,
+        packet: NPCPacket | None,
+        expected_rx_packets: int,
+        metrics: FunctionMetrics | None,
+    ) -> ComResult:
+        """Make a single attempt at executing an instruction on the connection.
 
-        :param pin: The index of the pin to return.
-        :return: Pin object for provided index.
+        :param function: The name of the function in the OOL.
+        :param packet: The assembled instruction packet, None for special actions.
+        :param expected_rx_packets: How many packets including ACK to expect.
+        :param metrics: The metrics to record the attempt in, None to skip.
+        :return: ComResult object
+        :raises: UOSTimeoutError if the caller's deadline has expired.
         """
-        if pin not in self.__device.pins:
-            raise UOSRuntimeError(
-                f"Pin index {pin} doesn't exist for device {self.__device.name}"
+        check_deadline("sending the instruction")
+        if packet is None:  # run a special action
+            with span("uos.special_action", function=function.name):
+                rx_response = getattr(self.__device_interface, function.name)()
+            if metrics:
+                metrics.record_result(rx_response)
+            return rx_response
+        # Late responses to earlier instructions mustn't be read as this one's.
+        self.__device_interface.reset_input()
+        write_ns = perf_counter_ns()
+        with span("uos.write"):
+            tx_response = self.__device_interface.execute_instruction(packet)
+        read_ns = perf_counter_ns()
+        if tx_response.status:
+            check_deadline("reading the response")
+            with span("uos.read", expect_packets=expected_rx_packets):
+                rx_response = self.__device_interface.read_response(
+                    expected_rx_packets,
+                    self._get_read_timeout_s(function, packet, expected_rx_packets),
+                )
+        else:
+            rx_response = ComResult(False, "failed to send instruction")
+        rx_response.tx_packet = packet  # include the tx packet for convenience
+        return self._record_transfer(
+            function, rx_response, expected_rx_packets, (write_ns, read_ns), metrics
+        )
+
+    def prepare(
+        self, function: UOSFunction, instruction_data: InstructionArguments
+    ) -> "PreparedInstruction":
+        """Validate and encode an instruction once so it can be executed repeatedly.
+
+        :param function: The UOS function to prepare.
+        :param instruction_data: The arguments to prepare the function with.
+        :return: PreparedInstruction object which executes on this device.
+        :raises: UOSUnsupportedError if function is not possible on the
+                loaded device or is a special action.
+        """
+        self._validate_instruction(function, instruction_data)
+        if function.address_lut[instruction_data.volatility] < 0:
+            raise UOSUnsupportedError(
+                f"{function.name} is a special action and can't be prepared."
             )
-        return self.__device.pins[pin]
+        return PreparedInstruction(
+            function,
+            self._get_packet(function, instruction_data),
+            instruction_data.expected_rx_packets,
+            self._get_compatible_pins(function),
+            self.__execute_prepared,
+        )
 
-    def get_compatible_pins(self, function: UOSFunction) -> set:
-        """Get pins suitable for use with a particular UOS Function.
+    def __execute_prepared(self, prepared: "PreparedInstruction") -> ComResult:
+        """Execute a prepared instruction, storing any pin samples it reads.
 
-        :param function: the string name of the UOS Schema function.
-        :return: Set of pin indices which support the function.
+        :param prepared: The prepared instruction to execute.
+        :return: ComResult object
         """
-        if (
-            not isinstance(function, UOSFunction)
-            or function not in UOSFunctions.enumerate_functions()
-        ):
-            raise UOSUnsupportedError(f"UOS function {function.name} doesn't exist.")
-        if function.pin_requirements is None:  # pins are not relevant to this function
-            return set()
-        return {
-            pin_index
-            for pin_index, pin in self.__device.pins.items()
-            if all(
-                getattr(pin, requirement) for requirement in function.pin_requirements
+        result = self.__execute_packet(
+            prepared.function, prepared.packet, prepared.expected_rx_packets
+        )
+        if result.status:
+            self._update_samples(prepared.function, result)
+        return result
+
+    def execute_pipelined(
+        self,
+        instructions: Sequence[tuple[UOSFunction, InstructionArguments]],
+        window: int = 4,
+    ) -> list[ComResult]:
+        """Execute a sequence of instructions without waiting for each response.
+
+        Up to ``window`` instructions are written to the device before their
+        responses are read back. Responses are matched to instructions by their
+        from address, so instructions to the same address wait for the earlier
+        one's response before being written. If a response is missing the
+        rest of the batch fails, as a late response can't be told apart from
+        those of later instructions. Unlike single instructions, failures are
+        not retried, the batch is a single outcome for the circuit breaker.
+
+        :param instructions: The functions and their arguments to execute in
+                order.
+        :param window: The maximum number of instructions awaiting a response.
+        :return: A ComResult object for each instruction, in the same order.
+        :raises: UOSUnsupportedError if any instruction is not possible on the
+                loaded device or can't be pipelined.
+        :raises: UOSCircuitOpenError if the device's circuit is open.
+        """
+        if window < 1:
+            raise UOSRuntimeError(
+                "Pipelined execution requires a window of at least 1."
             )
-        }
+        packets = []
+        for function, instruction_data in instructions:
+            self._validate_instruction(function, instruction_data)
+            if function.address_lut[instruction_data.volatility] < 0:
+                raise UOSUnsupportedError(
+                    f"{function.name} is a special action and can't be pipelined."
+                )
+            packets.append(self._get_packet(function, instruction_data))
+        results = [ComResult(False, tx_packet=packet) for packet in packets]
+        self._check_circuit()
+        try:
+            with self.__connection():
+                self.__device_interface.reset_input()
+                self.__pipeline(instructions, packets, results, window)
+        except UOSCommunicationError:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record(False)
+            raise
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(all(result.status for result in results))
+        if self.metrics.enabled:  # phases overlap so only the I/O is counted
+            for (function, _), result in zip(instructions, results):
+                function_metrics = self.metrics.get(function.name)
+                function_metrics.counters["instructions"] += 1
+                function_metrics.record_result(result)
+        return results
+
+    def __pipeline(
+        self,
+        instructions: Sequence[tuple[UOSFunction, InstructionArguments]],
+        packets: list[NPCPacket],
+        results: list[ComResult],
+        window: int,
+    ):
+        """Write and read back pipelined instructions on the open connection.
 
-    # False positive as this is a client-facing function.
-    def get_functions_enabled(self) -> dict:  # dead: disable
-        """Return functions enabled for the device.
+        :param instructions: The functions and their arguments to execute.
+        :param packets: The assembled packet of each instruction.
+        :param results: The result of each instruction, updated in place.
+        :param window: The maximum number of instructions awaiting a response.
+        """
+        in_flight: deque[int] = deque()  # indices awaiting a response
+        addresses: set[int] = set()  # addresses of the instructions in flight
+        frame: bytes | None = None  # a received frame that hasn't been matched
+        next_index = 0
+        while next_index < len(packets) or in_flight:
+            while (
+                next_index < len(packets)
+                and len(in_flight) < window
+                and packets[next_index].to_address not in addresses
+            ):
+                if self.__device_interface.execute_instruction(
+                    packets[next_index]
+                ).status:
+                    in_flight.append(next_index)
+                    addresses.add(packets[next_index].to_address)
+                else:
+                    results[next_index].exception = "failed to send instruction"
+                next_index += 1
+            if not in_flight:
+                continue
+            index = in_flight.popleft()
+            addresses.discard(packets[index].to_address)
+            frames, frame = self.__read_pipelined_frames(
+                instructions[index][0],
+                packets[index],
+                instructions[index][1].expected_rx_packets,
+                frame,
+            )
+            if len(frames) < instructions[index][1].expected_rx_packets:
+                results[index].exception = NPCDecoder.MISSING_DATA_ERROR
+                for abandoned in [*in_flight, *range(next_index, len(packets))]:
+                    results[
+                        abandoned
+                    ].exception = "abandoned after an earlier response was missing"
+                return
+            results[index].ack_packet = frames[0]
+            results[index].rx_packets = frames[1:]
+            results[index].status = True
+            self._update_samples(instructions[index][0], results[index])
+
+    def __read_pipelined_frames(
+        self,
+        function: UOSFunction,
+        packet: NPCPacket,
+        expect_packets: int,
+        frame: bytes | None,
+    ) -> tuple[list[bytes], bytes | None]:
+        """Read the frames responding to a pipelined instruction.
+
+        :param function: The UOS function of the instruction.
+        :param packet: The instruction packet awaiting a response.
+        :param expect_packets: How many packets including ACK to expect.
+        :param frame: A frame already read but not yet matched, if any.
+        :return: Tuple containing the frames matched to the packet and any
+                frame read that responds to a later instruction.
+        """
+        frames: list[bytes] = []
+        while len(frames) < expect_packets:
+            if frame is None:
+                response = self.__device_interface.read_response(
+                    1, self.timeouts.get_timeout_s(function, packet, expect_packets)
+                )
+                if not response.status:
+                    break
+                frame = response.ack_packet
+            if frame[2] != packet.to_address:
+                break  # frame is a response to a later instruction
+            frames.append(frame)
+            frame = None
+        return frames, frame
+
+    def __execute_batched(
+        self,
+        function: UOSFunction,
+        pin_payloads: list[tuple[int, ...]],
+        volatility: Persistence,
+        expected_rx_packets: int = 1,
+        update_samples: Callable[[ComResult], None] | None = None,
+    ) -> ComResult:
+        """Execute a pin based function on many pins using as few packets as possible.
+
+        :param function: The pin based UOS function to execute.
+        :param pin_payloads: The payload for each pin, the pin index first.
+        :param volatility: The volatility level to execute the function at.
+        :param expected_rx_packets: How many packets including ACK to expect
+                in response to each packet.
+        :param update_samples: Optional callback to store the pin samples from
+                each successful response.
+        :return: ComResult object, containing the rx packets of every packet.
+        :raises: UOSUnsupportedError if any pin doesn't support the function.
+        """
+        if len(pin_payloads) == 0:
+            raise UOSRuntimeError(f"{function.name} requires at least one pin.")
+        pins = tuple(pin_payload[0] for pin_payload in pin_payloads)
+        # Validate every pin up front so nothing executes if any are invalid.
+        if not self._get_compatible_pins(function).issuperset(pins):
+            raise UOSUnsupportedError(
+                f"{function.name} isn't supported on all pins {pins} "
+                f"for {self.identity}"
+            )
+        # Both the instruction and its responses must fit the payload limit.
+        pins_per_packet = NPCPacket.MAX_PAYLOAD // max(
+            [function.payload_stride] + function.rx_packets_expected
+        )
+        result = None
+        for chunk in range(0, len(pin_payloads), pins_per_packet):
+            chunk_result = self.__execute_instruction(
+                function,
+                InstructionArguments(
+                    payload=tuple(
+                        value
+                        for pin_payload in pin_payloads[chunk : chunk + pins_per_packet]
+                        for value in pin_payload
+                    ),
+                    expected_rx_packets=expected_rx_packets,
+                    volatility=volatility,
+                ),
+            )
+            if chunk_result.status and update_samples is not None:
+                update_samples(chunk_result)
+            if result is None:
+                result = chunk_result
+            else:  # merge the chunks into a single result
+                result.status = result.status and chunk_result.status
+                result.exception = result.exception or chunk_result.exception
+                result.rx_packets.extend(chunk_result.rx_packets)
+        # There is always at least one chunk so this can't be None.
+        return result  # type: ignore
+
+    def is_active(self) -> bool:
+        """Check if a connection is being held active to the device.
 
-        :return: Dictionary of function names to list of Persistence levels.
+        :return: Boolean, true if connection is held active.
         """
-        return self.__device.functions_enabled
+        return self.__device_interface.is_active()
 
     def __repr__(self):
         """Representation of the UOS device.
@@ -384,6 +768,6 @@ class UOSDevice:  # dead: disable
         """
         return (
             f"<UOSDevice(address='{self.address}', identity='{self.identity}', "
-            f"device={self.__device}, __device_interface='{self.__device_interface}', "
+            f"device={self._device}, __device_interface='{self.__device_interface}', "
             f"__kwargs={self.__kwargs})>"
         )
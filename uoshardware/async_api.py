@@ -0,0 +1,339 @@
+"""Provides the HAL layer for communicating with hardware from asyncio."""
+import asyncio
+from time import perf_counter_ns
+
+from uoshardware import (
+    Loading,
+    Persistence,
+    UOSCommunicationError,
+    UOSUnsupportedError,
+    logger,
+)
+from uoshardware.abstractions import (
+    AsyncUOSInterface,
+    ComResult,
+    Device,
+    InstructionArguments,
+    NPCPacket,
+    UOSFunction,
+    UOSFunctions,
+)
+from uoshardware.base import _UOSDeviceBase
+from uoshardware.interface import Interface
+from uoshardware.interface.serial import AsyncSerial
+from uoshardware.interface.stub import AsyncStub
+from uoshardware.metrics import FunctionMetrics
+from uoshardware.timeouts import check_deadline
+
+
+# Interface aimed for use by client projects, dead false positive.
+class AsyncUOSDevice(_UOSDeviceBase):  # dead: disable
+    """Class for asyncio control of UOS devices from a single event loop.
+
+    Eager connections are opened when entering the async context manager or
+    by explicitly awaiting ``open``. Instructions on a device are serialised
+    so concurrent tasks can safely share it.
+
+    :ivar identity: The type of device, this is must have a valid device in the config.
+    :ivar address: Compliant connection string for identifying the
+        device and interface.
+    """
+
+    __device_interface: AsyncUOSInterface  # Lower level communication layer.
+    __kwargs: dict = {}  # Connection specific / optional parameters.
+
+    def __init__(
+        self,
+        identity: str | Device,
+        address: str,
+        interface: Interface = Interface.SERIAL,
+        loading: Loading = Loading.EAGER,
+        **kwargs,
+    ):
+        """Instantiate an asyncio UOS device instance for communication.
+
+        :param identity: Specify the type of device, this must exist in the device LUT.
+        :param address: Compliant connection string for identifying the device and
+        interface.
+        :param interface: Set the type of interface to use for communication.
+        loading: Alter the loading strategy for managing the communication.
+        :param kwargs: Additional optional connection parameters as defined in
+        documentation.
+        """
+        super().__init__(identity, address, loading)
+        if loading == Loading.KEEP_ALIVE:
+            raise UOSUnsupportedError(
+                f"{loading} loading is not supported by asyncio devices."
+            )
+        self.__kwargs = kwargs
+        self.__lock = asyncio.Lock()
+        if (
+            interface == Interface.SERIAL
+            and Interface.SERIAL in self._device.interfaces
+        ):
+            self.__device_interface = AsyncSerial(
+                address,
+                baudrate=self._device.aux_params["default_baudrate"],
+            )
+        elif interface == Interface.STUB and Interface.STUB in self._device.interfaces:
+            self.__device_interface = AsyncStub(**self._get_stub_arguments(kwargs))
+        else:
+            raise UOSUnsupportedError(
+                f"'{interface}' cannot be used for device `{self.identity}`"
+            )
+        logger.debug("Created device %s", self.__device_interface.__repr__())
+
+    async def __aenter__(self):
+        """Dunder function for opening the interface as an async context manager."""
+        if self.loading == Loading.EAGER:
+            await self.open()
+        return self
+
+    # Dunder context manager prototype, false positive for dead variables.
+    async def __aexit__(self, exc_type, exc_val, exc_tb):  # dead: disable
+        """Dunder function for closing the interface as an async context manager."""
+        await self.close()
+
+    async def set_gpio_output(
+        self, pin: int, level: int, volatility: Persistence = Persistence.NONE
+    ) -> ComResult:
+        """Set a pin to digital output mode and sets a level on that pin.
+
+        :param pin: The numeric number of the pin as defined in the dictionary
+        for that device.
+        :param level: The output level, 0 - low, 1 - High.
+        :param volatility: How volatile should the command be, use constants
+        from uoshardware.
+        :return: ComResult object.
+        """
+        return await self.__execute_instruction(
+            UOSFunctions.set_gpio_output,
+            self._get_gpio_output_arguments(pin, level, volatility),
+        )
+
+    async def get_gpio_input(
+        self,
+        pin: int,
+        pull_up: bool = False,
+        volatility: Persistence = Persistence.NONE,
+    ) -> ComResult:
+        """Read a GPIO pins level from device and returns the value.
+
+        :param pin: The numeric number of the pin as defined in the
+                dictionary for that device.
+        :param pull_up: Enable the internal pull-up resistor. Default is false.
+        :param volatility: How volatile should the command be, use
+                constants from uoshardware.
+        :return: ComResult object.
+        """
+        function = UOSFunctions.get_gpio_input
+        result = await self.__execute_instruction(
+            function, self._get_gpio_input_arguments(pin, pull_up, volatility)
+        )
+        if result.status:
+            self._update_samples(function, result)
+        return result
+
+    async def get_adc_input(
+        self,
+        pin: int,
+    ) -> ComResult:
+        """Read the current 10 bit ADC value.
+
+        :param pin: The index of the analog pin to read
+        :return: ComResult object containing the ADC readings.
+        """
+        function = UOSFunctions.get_adc_input
+        result = await self.__execute_instruction(
+            function, self._get_adc_input_arguments(pin)
+        )
+        if result.status:  # update the samples in the device.
+            self._update_samples(function, result)
+        return result
+
+    async def get_system_info(self) -> ComResult:
+        """Read the UOS version and device type.
+
+        :return: ComResult object containing the system information.
+        """
+        return await self.__execute_instruction(
+            UOSFunctions.get_system_info,
+            InstructionArguments(
+                expected_rx_packets=2,
+            ),
+        )
+
+    async def reset_all_io(self, volatility=Persistence.RAM) -> ComResult:
+        """Execute the reset IO at the defined volatility level.
+
+        :param volatility: Where should the pins reset from, use
+                constants from uoshardware.
+        :return: ComResult object containing the result of the reset operation..
+        """
+        return await self.__execute_instruction(
+            UOSFunctions.reset_all_io,
+            InstructionArguments(volatility=volatility),
+        )
+
+    async def hard_reset(self) -> ComResult:
+        """Hard reset functionality for the UOS Device."""
+        return await self.__execute_instruction(
+            UOSFunctions.hard_reset,
+            InstructionArguments(),
+        )
+
+    async def open(self):
+        """Connect to the device, explict calls are required for eager loading.
+
+        :raises: UOSCommunicationError - Problem opening a connection.
+        """
+        await self.__device_interface.open()
+
+    async def close(self):
+        """Release connection, must be called explicitly if loading is eager.
+
+        :raises: UOSCommunicationError - Problem closing the connection
+        to an active device.
+        """
+        await self.__device_interface.close()
+
+    async def __execute_instruction(
+        self,
+        function: UOSFunction,
+        instruction_data: InstructionArguments,
+    ) -> ComResult:
+        """Execute a generic UOS function, retrying as the retry policy allows.
+
+        :param function: The name of the function in the OOL.
+        :param instruction_data: device_functions from the LUT, payload ect.
+        :return: ComResult object
+        :raises: UOSUnsupportedError if function is not possible on the
+                loaded device.
+        :raises: UOSCircuitOpenError if the device's circuit is open.
+        :raises: UOSCommunicationError if the final attempt raised.
+        """
+        metrics = self._get_function_metrics(function)
+        start_ns = perf_counter_ns() if metrics else 0
+        self._validate_instruction(function, instruction_data)
+        packet = None
+        if function.address_lut[instruction_data.volatility] >= 0:
+            packet = self._get_packet(function, instruction_data)
+        async with self.__lock:  # one instruction on the wire at a time
+            self._check_circuit()
+            try:
+                try:
+                    # The connection is held so lazy devices only open once.
+                    if self.loading == Loading.LAZY:  # Lazy loaded
+                        check_deadline("opening the connection")
+                        await self.open()
+                    result = await self.__attempt(
+                        function, packet, instruction_data.expected_rx_packets, metrics
+                    )
+                finally:  # Safety check for lazy loading outside of context manager
+                    if self.loading == Loading.LAZY:  # Lazy loaded
+                        await self.close()
+            except UOSCommunicationError:
+                self._record_instruction(None, metrics, start_ns)
+                raise
+        self._record_instruction(result, metrics, start_ns)
+        return result
+
+    async def __attempt(
+        self,
+        function: UOSFunction,
+        packet: NPCPacket | None,
+        expected_rx_packets: int,
+        metrics: FunctionMetrics | None,
+    ) -> ComResult:
+        """Attempt an instruction until it succeeds or the retry policy gives up.
+
+        :param function: The name of the function in the OOL.
+        :param packet: The assembled instruction packet, None for special actions.
+        :param expected_rx_packets: How many packets including ACK to expect.
+        :param metrics: The metrics to record the attempts in, None to skip.
+        :return: ComResult object of the final attempt.
+        :raises: UOSCommunicationError if the final attempt raised.
+        """
+        deadline_s = self.retry_policy.get_deadline_s()
+        attempt = 1
+        while True:
+            try:
+                result = await self.__transfer(
+                    function, packet, expected_rx_packets, metrics
+                )
+            except UOSCommunicationError:
+                if (
+                    delay_s := self._get_retry_backoff_s(
+                        function, None, attempt, deadline_s, metrics
+                    )
+                ) is None:
+                    raise
+            else:
+                if (
+                    delay_s := self._get_retry_backoff_s(
+                        function, result, attempt, deadline_s, metrics
+                    )
+                ) is None:
+                    return result
+            await asyncio.sleep(delay_s)
+            attempt += 1
+
+    async def __transfer(
+        self,
+        function: UOSFunction,
+        packet: NPCPacket | None,
+        expected_rx_packets: int,
+        metrics: FunctionMetrics | None,
+    ) -> ComResult:
+        """Make a single attempt at executing an instruction on the connection.
+
+        :param function: The name of the function in the OOL.
+        :param packet: The assembled instruction packet, None for special actions.
+        :param expected_rx_packets: How many packets including ACK to expect.
+        :param metrics: The metrics to record the attempt in, None to skip.
+        :return: ComResult object
+        :raises: UOSTimeoutError if the caller's deadline has expired.
+        """
+        check_deadline("sending the instruction")
+        interface = self.__device_interface
+        if packet is None:  # run a special action
+            result = await getattr(interface, function.name)()
+            if metrics:
+                metrics.record_result(result)
+            return result
+        await interface.reset_input()  # drop late responses to earlier instructions
+        times_ns = (perf_counter_ns(), 0)
+        sent = (await interface.execute_instruction(packet)).status
+        times_ns = (times_ns[0], perf_counter_ns())
+        if sent:
+            check_deadline("reading the response")
+        result = (
+            await interface.read_response(
+                expected_rx_packets,
+                self._get_read_timeout_s(function, packet, expected_rx_packets),
+            )
+            if sent
+            else ComResult(False, "failed to send instruction")
+        )
+        result.tx_packet = packet
+        return self._record_transfer(
+            function, result, expected_rx_packets, times_ns, metrics
+        )
+
+    def is_active(self) -> bool:
+        """Check if a connection is being held active to the device.
+
+        :return: Boolean, true if connection is held active.
+        """
+        return self.__device_interface.is_active()
+
+    def __repr__(self):
+        """Representation of the asyncio UOS device.
+
+        :return: String containing connection and identity of the device
+        """
+        return (
+            f"<AsyncUOSDevice(address='{self.address}', identity='{self.identity}', "
+            f"device={self._device}, __device_interface='{self.__device_interface}', "
+            f"__kwargs={self.__kwargs})>"
+        )
@@ -0,0 +1,390 @@
+"""Provides the device handling shared by the blocking and asyncio HAL layers."""
+import copy
+from collections.abc import Sequence
+from time import perf_counter_ns
+
+from uoshardware import (
+    Loading,
+    Persistence,
+    UOSCircuitOpenError,
+    UOSRuntimeError,
+    UOSUnsupportedError,
+    logger,
+)
+from uoshardware.abstractions import (
+    ComResult,
+    Device,
+    InstructionArguments,
+    NPCPacket,
+    Pin,
+    UOSFunction,
+    UOSFunctions,
+)
+from uoshardware.devices import Devices, get_hwid
+from uoshardware.firmware import FirmwareModel
+from uoshardware.history import SampleHistory
+from uoshardware.metrics import DeviceMetrics, FunctionMetrics
+from uoshardware.retry import CircuitBreaker, Failure, RetryPolicy, classify_failure
+from uoshardware.timeouts import AdaptiveTimeout
+
+
+def get_device_definition(identity: str) -> Device | None:
+    """Look up the system config dictionary for the defined device mappings.
+
+    :param identity: String containing the lookup key of the device in the dictionary.
+    :return: Device Object or None if not found
+    """
+    if identity is not None and hasattr(Devices, identity):
+        device = getattr(Devices, identity)
+    else:
+        device = None
+    return device
+
+
+class _UOSDeviceBase:
+    """Device definition handling shared by the blocking and asyncio devices.
+
+    :ivar identity: The type of device, this is must have a valid device in the config.
+    :ivar address: Compliant connection string for identifying the
+        device and interface.
+    :ivar retry_policy: How failed instructions are retried.
+    :ivar circuit_breaker: Fails instructions fast after repeated failures,
+        None to always attempt instructions.
+    :ivar timeouts: Derives response timeouts from the baud rate and the
+        latencies measured on the device.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # Due to holding the execution policies as well as the device definition.
+
+    _device: Device  # Device definitions as parsed from a compatible ini.
+    identity = ""
+    address = ""
+    loading: Loading
+
+    def __init__(self, identity: str | Device, address: str, loading: Loading):
+        """Look up the device definition for the identity.
+
+        :param identity: Specify the type of device, this must exist in the device LUT.
+        :param address: Compliant connection string for identifying the device and
+        interface.
+        :param loading: Alter the loading strategy for managing the communication.
+        """
+        self.address = address
+        self.loading = loading
+        device = None
+        if isinstance(identity, Device):
+            self.identity = identity.name
+            device = identity
+        elif isinstance(identity, str):
+            self.identity = identity
+            device = get_device_definition(identity)
+        if device is None:
+            raise UOSUnsupportedError(
+                f"'{self.identity}' does not have a valid look up table"
+            )
+        self._hwid = get_hwid(device)  # looked up from the shared definition
+        # Each device holds its own pin readings and histories.
+        self._device = copy.deepcopy(device)
+        # Pin capabilities are static so compatibility is only computed once.
+        self._compatible_pins: dict[str, frozenset] = {}
+        self.metrics = DeviceMetrics(address)
+        self.retry_policy = RetryPolicy()
+        self.circuit_breaker: CircuitBreaker | None = None
+        self.timeouts = AdaptiveTimeout(self._device.aux_params.get("default_baudrate"))
+
+    def _check_circuit(self):
+        """Check the circuit breaker allows an instruction to be executed.
+
+        :raises: UOSCircuitOpenError if the circuit is open.
+        """
+        if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+            raise UOSCircuitOpenError(
+                f"Circuit for {self.address} is open after "
+                f"{self.circuit_breaker.failures} failed instructions."
+            )
+
+    def _get_stub_arguments(self, kwargs: dict) -> dict:
+        """Get the arguments to create a stub interface simulating the device.
+
+        :param kwargs: The optional connection parameters of the device.
+        :return: Dictionary of the stub's keyword arguments.
+        """
+        return {
+            "connection": self.address,
+            "errored": kwargs.get("errored", False),
+            "model": FirmwareModel(self._device, self._hwid),
+            "simulation": kwargs.get("simulation"),
+        }
+
+    @staticmethod
+    def _get_gpio_output_arguments(
+        pin: int, level: int, volatility: Persistence
+    ) -> InstructionArguments:
+        """Get the arguments setting the level of a GPIO output.
+
+        :param pin: The numeric number of the pin.
+        :param level: The output level, 0 - low, 1 - High.
+        :param volatility: How volatile the instruction is.
+        :return: The instruction arguments.
+        """
+        return InstructionArguments(
+            payload=(pin, level), check_pin=pin, volatility=volatility
+        )
+
+    @staticmethod
+    def _get_gpio_input_arguments(
+        pin: int, pull_up: bool, volatility: Persistence
+    ) -> InstructionArguments:
+        """Get the arguments reading the level of a GPIO input.
+
+        :param pin: The numeric number of the pin.
+        :param pull_up: Enable the internal pull-up resistor.
+        :param volatility: How volatile the instruction is.
+        :return: The instruction arguments.
+        """
+        return InstructionArguments(
+            payload=(pin, 1 if pull_up else 0),
+            expected_rx_packets=2,
+            check_pin=pin,
+            volatility=volatility,
+        )
+
+    @staticmethod
+    def _get_adc_input_arguments(pin: int) -> InstructionArguments:
+        """Get the arguments reading an ADC channel.
+
+        :param pin: The index of the analog pin.
+        :return: The instruction arguments.
+        """
+        return InstructionArguments(
+            payload=(pin,), expected_rx_packets=2, check_pin=pin
+        )
+
+    def _get_function_metrics(self, function: UOSFunction) -> FunctionMetrics | None:
+        """Get the metrics to record an instruction in.
+
+        :param function: The UOS function being executed.
+        :return: The metrics of the function, None if metrics are disabled.
+        """
+        return self.metrics.get(function.name) if self.metrics.enabled else None
+
+    def _record_instruction(
+        self, result: ComResult | None, metrics: FunctionMetrics | None, start_ns: int
+    ):
+        """Record the outcome of an instruction in the circuit breaker and metrics.
+
+        :param result: The result of the final attempt, None if it raised.
+        :param metrics: The metrics to record the instruction in, None to skip.
+        :param start_ns: When the instruction started, if timed.
+        """
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(result is not None and result.status)
+        if metrics and result is not None:
+            metrics.counters["instructions"] += 1
+            metrics.observe_ns("round_trip", perf_counter_ns() - start_ns)
+
+    def _get_retry_backoff_s(
+        self,
+        function: UOSFunction,
+        result: ComResult | None,
+        attempt: int,
+        deadline_s: float | None,
+        metrics: FunctionMetrics | None,
+    ) -> float | None:
+        """Decide if a finished attempt should be retried, counting the retry.
+
+        :param function: The UOS function being executed.
+        :param result: The result of the attempt, None if the interface raised.
+        :param attempt: The number of the attempt, starting at 1.
+        :param deadline_s: The monotonic time the attempts must finish by.
+        :param metrics: The metrics to record the retry in, None to skip.
+        :return: The delay before retrying, None if the attempt is final.
+        """
+        if result is None:
+            failure: Failure | None = Failure.COMMUNICATION
+            if metrics:
+                metrics.counters["failures"] += 1
+        else:
+            failure = classify_failure(result)
+        if not self.retry_policy.should_retry(failure, attempt, deadline_s):
+            return None
+        logger.debug("Retrying %s after %s failure", function.name, failure)
+        if metrics:
+            metrics.counters["retries"] += 1
+        return self.retry_policy.get_backoff_s(attempt)
+
+    def _get_read_timeout_s(
+        self, function: UOSFunction, packet: NPCPacket, expected_rx_packets: int
+    ) -> float:
+        """Get how long to wait for the response to an instruction.
+
+        :param function: The UOS function being executed.
+        :param packet: The instruction packet written.
+        :param expected_rx_packets: How many packets including ACK to expect.
+        :return: The timeout in seconds.
+        """
+        return self.timeouts.get_timeout_s(function, packet, expected_rx_packets)
+
+    def _record_transfer(
+        self,
+        function: UOSFunction,
+        result: ComResult,
+        expected_rx_packets: int,
+        times_ns: tuple[int, int],
+        metrics: FunctionMetrics | None,
+    ) -> ComResult:
+        """Record an attempt at an instruction in the timeouts and metrics.
+
+        :param function: The UOS function being executed.
+        :param result: The result of the attempt, including its tx packet.
+        :param expected_rx_packets: How many packets including ACK to expect.
+        :param times_ns: When the write and the read started.
+        :param metrics: The metrics to record the attempt in, None to skip.
+        :return: The result recorded.
+        """
+        end_ns = perf_counter_ns()
+        write_ns, read_ns = times_ns
+        self.timeouts.record(
+            function, result, expected_rx_packets, (end_ns - write_ns) / 1e9
+        )
+        if metrics:
+            metrics.observe_ns("write", read_ns - write_ns)
+            metrics.observe_ns("read", end_ns - read_ns)
+            metrics.record_result(result)
+        return result
+
+    def _validate_instruction(
+        self, function: UOSFunction, instruction_data: InstructionArguments
+    ):
+        """Check an instruction can be executed on the loaded device.
+
+        :param function: The name of the function in the OOL.
+        :param instruction_data: device_functions from the LUT, payload ect.
+        :raises: UOSUnsupportedError if function is not possible on the
+                loaded device.
+        """
+        check_pins = instruction_data.check_pins
+        if instruction_data.check_pin is not None:
+            check_pins += (instruction_data.check_pin,)
+        if (
+            function.name not in self._device.functions_enabled
+            or (
+                check_pins
+                and not self._get_compatible_pins(function).issuperset(check_pins)
+            )
+            or instruction_data.volatility
+            not in self._device.functions_enabled[function.name]
+        ):
+            logger.debug(
+                "Known functions %s", str(self._device.functions_enabled.keys())
+            )
+            raise UOSUnsupportedError(
+                f"{function.name}({instruction_data.volatility.name}) "
+                f"has not been implemented for {self.identity}"
+            )
+
+    @staticmethod
+    def _get_packet(
+        function: UOSFunction, instruction_data: InstructionArguments
+    ) -> NPCPacket:
+        """Assemble the packet for a normal instruction.
+
+        :param function: The name of the function in the OOL.
+        :param instruction_data: device_functions from the LUT, payload ect.
+        :return: The instruction packet.
+        """
+        packet = NPCPacket(
+            to_address=function.address_lut[instruction_data.volatility],
+            from_address=0,
+            payload=instruction_data.payload,
+        )
+        logger.debug("Function %s assembled packet: %s", function.name, packet)
+        return packet
+
+    def _update_samples(self, function: UOSFunction, result: ComResult):
+        """Store pin samples from a successful response if the function reads pins.
+
+        :param function: The function that produced the result.
+        :param result: The successful result of the function.
+        """
+        if function.name == UOSFunctions.get_gpio_input.name:
+            self._device.update_gpio_samples(result)
+        elif function.name == UOSFunctions.get_adc_input.name:
+            self._device.update_adc_samples(result)
+
+    # False positive as this is a client-facing function.
+    def get_pin(self, pin: int) -> Pin:  # dead: disable
+        """Return a pin object corresponding to index.
+
+        :param pin: The index of the pin to return.
+        :return: Pin object for provided index.
+        """
+        if pin not in self._device.pins:
+            raise UOSRuntimeError(
+                f"Pin index {pin} doesn't exist for device {self._device.name}"
+            )
+        return self._device.pins[pin]
+
+    def enable_history(self, capacity: int, pins: Sequence[int] | None = None):
+        """Keep a fixed capacity history of the readings taken on pins.
+
+        Histories are added for GPIO input and ADC readings the pins support,
+        replacing any existing history.
+
+        :param capacity: The maximum number of samples retained per reading.
+        :param pins: The pin indices to record, defaults to all pins.
+        :raises: UOSRuntimeError if a pin doesn't exist on the device.
+        """
+        for pin in self._device.pins if pins is None else pins:
+            pin_definition = self.get_pin(pin)
+            if pin_definition.gpio_in:
+                pin_definition.gpio_history = SampleHistory(capacity)
+            if pin_definition.adc_in:
+                pin_definition.adc_history = SampleHistory(capacity)
+
+    # False positive as this is a client-facing function.
+    def disable_history(self):  # dead: disable
+        """Stop recording and discard the histories of all pins."""
+        for pin_definition in self._device.pins.values():
+            pin_definition.gpio_history = None
+            pin_definition.adc_history = None
+
+    def get_compatible_pins(self, function: UOSFunction) -> set:
+        """Get pins suitable for use with a particular UOS Function.
+
+        :param function: the string name of the UOS Schema function.
+        :return: Set of pin indices which support the function.
+        """
+        return set(self._get_compatible_pins(function))
+
+    def _get_compatible_pins(self, function: UOSFunction) -> frozenset:
+        """Get the cached pins suitable for use with a particular UOS Function.
+
+        :param function: the string name of the UOS Schema function.
+        :return: Frozen set of pin indices which support the function.
+        """
+        if (
+            not isinstance(function, UOSFunction)
+            or UOSFunctions.get_from_name(function.name) != function
+        ):
+            raise UOSUnsupportedError(f"UOS function {function.name} doesn't exist.")
+        if function.name not in self._compatible_pins:
+            self._compatible_pins[function.name] = frozenset(
+                pin_index
+                for pin_index, pin in self._device.pins.items()
+                if function.pin_requirements is not None
+                and all(
+                    getattr(pin, requirement)
+                    for requirement in function.pin_requirements
+                )
+            )
+        return self._compatible_pins[function.name]
+
+    # False positive as this is a client-facing function.
+    def get_functions_enabled(self) -> dict:  # dead: disable
+        """Return functions enabled for the device.
+
+        :return: Dictionary of function names to list of Persistence levels.
+        """
+        return self._device.functions_enabled
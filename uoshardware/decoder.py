@@ -0,0 +1,115 @@
+"""Provides the streaming decoder for NPC frames received from devices."""
+from collections import deque
+
+from uoshardware import logger
+from uoshardware.abstractions import ComResult, NPCPacket
+
+
+class NPCDecoder:
+    """Stateful decoder that extracts validated NPC frames from a byte stream.
+
+    Data can be fed in chunks of any size, partial frames are held until the
+    remaining bytes arrive. Bytes that can't be part of a frame are skipped so
+    the decoder resynchronises on the next start symbol. Frames are only
+    queued if the LRC checksum is valid. Once instructions are expected,
+    frames from other addresses are dropped as late responses to instructions
+    that have been abandoned.
+
+    :ivar frames: Queue of complete validated frames awaiting consumption.
+    :ivar checksum_errors: Count of well-formed frames dropped for bad LRCs.
+    :ivar discarded_bytes: Count of bytes skipped while resynchronising.
+    :ivar stale_frames: Count of valid frames dropped from unexpected addresses.
+    :ivar addresses: The addresses of the instructions awaiting responses.
+    """
+
+    START_BYTE = NPCPacket.START_BYTE
+    END_BYTE = NPCPacket.END_BYTE
+    # Start, to address, from address, payload length, checksum, end.
+    FRAME_OVERHEAD = 6
+    # ComResult exceptions, shared by the interfaces to classify failures.
+    MISSING_DATA_ERROR = "did not receive all the expected data"
+    CHECKSUM_ERROR = "received a packet with an invalid checksum"
+
+    def __init__(self):
+        """Create a decoder with an empty buffer."""
+        self._buffer = bytearray()
+        self.frames: deque[bytes] = deque()
+        self.checksum_errors = 0
+        self.discarded_bytes = 0
+        self.stale_frames = 0
+        self.addresses: set[int] = set()
+
+    def feed(self, data: bytes | bytearray | memoryview) -> int:
+        """Decode a chunk of data, queuing any frames it completes.
+
+        :param data: The next chunk of bytes received from the interface.
+        :return: The number of new frames queued by this chunk.
+        """
+        buffer = self._buffer
+        buffer += data
+        frames_found = 0
+        position = 0
+        buffer_len = len(buffer)
+        while True:
+            start = buffer.find(self.START_BYTE, position)
+            if start < 0:
+                self.discarded_bytes += buffer_len - position
+                position = buffer_len
+                break
+            self.discarded_bytes += start - position
+            position = start
+            if buffer_len - start < 4:
+                break  # need the payload length to size the frame
+            end = start + buffer[start + 3] + self.FRAME_OVERHEAD
+            if end > buffer_len:
+                break  # wait for the rest of the frame
+            if buffer[end - 1] != self.END_BYTE:
+                # Not a real start symbol, resynchronise from the next byte.
+                self.discarded_bytes += 1
+                position = start + 1
+                continue
+            if sum(buffer[start + 1 : end - 1]) & 0xFF:
+                logger.debug("Dropping frame with invalid checksum")
+                self.checksum_errors += 1
+            elif self.addresses and buffer[start + 2] not in self.addresses:
+                logger.debug("Dropping frame from address %s", buffer[start + 2])
+                self.stale_frames += 1
+            else:
+                self.frames.append(bytes(buffer[start:end]))
+                frames_found += 1
+            position = end
+        del buffer[:position]
+        return frames_found
+
+    def pop_result(self, expect_packets: int) -> ComResult:
+        """Move queued frames into a result object, the first being the ACK.
+
+        :param expect_packets: How many packets including ACK to expect.
+        :return: ComResult object, status is only set if all packets were
+                available otherwise the exception is set.
+        """
+        result = ComResult(False)
+        for packet_index in range(min(expect_packets, len(self.frames))):
+            frame = self.frames.popleft()
+            if packet_index == 0:
+                result.ack_packet = frame
+            else:
+                result.rx_packets.append(frame)
+            if packet_index + 1 == expect_packets:
+                result.status = True
+        if not result.status:
+            result.exception = self.MISSING_DATA_ERROR
+        return result
+
+    def expect(self, address: int):
+        """Accept the response frames of an instruction until the next reset.
+
+        :param address: The address the instruction was sent to.
+        """
+        self.addresses.add(address)
+
+    def reset(self):
+        """Discard any buffered data, queued frames and expected addresses."""
+        self._buffer.clear()
+        self.frames.clear()
+        self.addresses.clear()
@@ -19,3 +19,20 @@ class Devices:
     arduino_nano: Device = _ARDUINO_NANO_3
     hwid_1: Device = _ARDUINO_UNO_3
     arduino_uno: Device = _ARDUINO_UNO_3
+
+
+def get_hwid(device: Device, default: int = 255) -> int:
+    """Find the hardware id of a device definition.
+
+    :param device: The definition to look up.
+    :param default: The id returned for devices without a hardware id.
+    :return: The hardware id.
+    """
+    return next(
+        (
+            int(name[len("hwid_") :])
+            for name in dir(Devices)
+            if name.startswith("hwid_") and getattr(Devices, name) is device
+        ),
+        default,
+    )
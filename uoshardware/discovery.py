@@ -0,0 +1,152 @@
+"""Provides discovery of the UOS devices connected to the system."""
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from uoshardware import (
+    Loading,
+    Persistence,
+    UOSError,
+    UOSUnsupportedError,
+    logger,
+)
+from uoshardware.abstractions import Device, NPCPacket, UOSFunctions, UOSInterface
+from uoshardware.api import UOSDevice
+from uoshardware.devices import Devices
+from uoshardware.interface import Interface
+from uoshardware.interface.serial import PORT_INVENTORY, Serial
+from uoshardware.interface.stub import Stub
+
+# Layout of the get_system_info response payload.
+VERSION_BYTES = slice(0, 3)  # major, minor, patch
+HWID_INDEX = 3
+
+
+@dataclass(frozen=True)
+class DiscoveredDevice:
+    """Describes a UOS device that responded to discovery.
+
+    :ivar address: The connection string the device was found on.
+    :ivar interface: The interface the device was found on.
+    :ivar system_info: The payload of the device's system info response.
+    :ivar definition: The matching definition from ``Devices``, None if the
+        hardware id isn't known to this version of the library.
+    """
+
+    address: str
+    interface: Interface
+    system_info: bytes
+    definition: Device | None
+
+    @property
+    def hwid(self) -> int:
+        """The hardware id reported by the device."""
+        return self.system_info[HWID_INDEX]
+
+    @property
+    def version(self) -> tuple[int, ...]:
+        """The UOS firmware version reported by the device."""
+        return tuple(self.system_info[VERSION_BYTES])
+
+    def connect(self, loading: Loading = Loading.EAGER, **kwargs) -> UOSDevice:
+        """Create a UOSDevice for the discovered device.
+
+        :param loading: Alter the loading strategy for managing the communication.
+        :param kwargs: Additional optional connection parameters.
+        :return: The UOSDevice.
+        :raises: UOSUnsupportedError if the hardware id isn't known.
+        """
+        if self.definition is None:
+            raise UOSUnsupportedError(
+                f"Device at {self.address} has unknown hardware id {self.hwid}."
+            )
+        return UOSDevice(
+            self.definition, self.address, self.interface, loading, **kwargs
+        )
+
+
+def discover_devices(
+    interface: Interface = Interface.SERIAL,
+    addresses: Iterable[str] | None = None,
+    timeout_s: float = 0.5,
+    max_workers: int = 64,
+    baudrate: int = 115200,
+) -> list[DiscoveredDevice]:
+    """Probe addresses concurrently for devices responding to system info.
+
+    Every candidate is probed at once, so discovery takes roughly one
+    timeout regardless of the number of ports. Addresses that fail to open
+    or respond are skipped.
+
+    :param interface: The interface to discover devices on.
+    :param addresses: Connection strings to probe, defaults to every port
+            the interface enumerates.
+    :param timeout_s: How long each device has to respond.
+    :param max_workers: The maximum number of addresses probed at once.
+    :param baudrate: The baudrate serial ports are probed at.
+    :return: The discovered devices ordered by address.
+    """
+    if addresses is None:
+        if interface == Interface.SERIAL:
+            addresses = [port.device for port in PORT_INVENTORY.get_ports(True)]
+        else:
+            addresses = [stub.connection for stub in Stub.enumerate_devices()]
+    addresses = sorted(set(addresses))
+    if not addresses:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(addresses)),
+        thread_name_prefix="uos-discovery",
+    ) as executor:
+        probes = executor.map(
+            lambda address: _probe(interface, address, timeout_s, baudrate),
+            addresses,
+        )
+        return [device for device in probes if device is not None]
+
+
+def _probe(
+    interface: Interface, address: str, timeout_s: float, baudrate: int
+) -> DiscoveredDevice | None:
+    """Request the system info of a device at an address.
+
+    :param interface: The interface to use.
+    :param address: The connection string to probe.
+    :param timeout_s: How long the device has to respond.
+    :param baudrate: The baudrate serial ports are probed at.
+    :return: The discovered device, None if no UOS device responded.
+    """
+    port: UOSInterface
+    if interface == Interface.SERIAL:
+        port = Serial(address, baudrate=baudrate)
+    else:
+        port = Stub(address)
+    function = UOSFunctions.get_system_info
+    packet = NPCPacket(function.address_lut[Persistence.NONE], 0, ())
+    try:
+        port.open()
+        try:
+            result = port.execute_instruction(packet)
+            if result.status:
+                # The ACK followed by the system info packet.
+                result = port.read_response(
+                    1 + len(packet.expects_rx_packets()), timeout_s
+                )
+        finally:
+            port.close()
+    except (UOSError, OSError) as error:
+        logger.debug("Discovery probe of %s failed: %s", address, error)
+        return None
+    if not result.status or len(result.rx_packets) < 1:
+        logger.debug("No UOS response from %s: %s", address, result.exception)
+        return None
+    system_info = bytes(result.get_rx_payload_view(0))
+    if len(system_info) <= HWID_INDEX:
+        logger.debug("Invalid system info from %s: %s", address, system_info)
+        return None
+    return DiscoveredDevice(
+        address,
+        interface,
+        system_info,
+        getattr(Devices, f"hwid_{system_info[HWID_INDEX]}", None),
+    )
@@ -0,0 +1,219 @@
+"""Provides a model of UOS firmware used to simulate devices."""
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from time import monotonic
+
+from uoshardware import UOSUnsupportedError, logger
+from uoshardware.abstractions import Device, NPCPacket, UOSFunctions
+
+ACK_OK = 0
+ACK_ERROR = 1
+# ADC characteristics used when the model isn't given a device definition.
+DEFAULT_ADC = {"adc_reference": 5, "adc_resolution": 10}
+
+
+@dataclass
+class SimulatedPin:
+    """Runtime state of a simulated pin.
+
+    :ivar output: True if the pin has been set as an output.
+    :ivar level: The level driven when the pin is an output.
+    :ivar input_level: The level applied externally when the pin is an input.
+    :ivar pull_up: True if the internal pull-up is enabled.
+    """
+
+    output: bool = False
+    level: int = 0
+    input_level: int = 0
+    pull_up: bool = False
+
+    def read(self) -> int:
+        """Get the level the pin reads as."""
+        if self.output:
+            return self.level
+        return 1 if self.input_level or self.pull_up else 0
+
+
+class FirmwareModel:
+    """Executes NPC instruction frames against simulated pin state.
+
+    Pins keep their state between instructions so outputs can be read back,
+    ADC channels return the value of a configurable waveform. With a device
+    definition, instructions are validated against the functions and pins it
+    supports, otherwise any pin is accepted.
+
+    :ivar device: The definition of the device being modelled, if any.
+    :ivar hwid: The hardware id reported in the system info.
+    :ivar pins: The state of each pin by index.
+    :ivar instructions: The number of instructions executed.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # Due to holding the pin state and waveforms of the modelled device.
+
+    VERSION = (0, 7, 0)
+
+    def __init__(self, device: Device | None = None, hwid: int = 0):
+        """Create a model with every pin as a floating input.
+
+        :param device: The definition of the device to model.
+        :param hwid: The hardware id reported in the system info.
+        """
+        self.device = device
+        self.hwid = hwid
+        self.pins: dict[int, SimulatedPin] = (
+            {} if device is None else {index: SimulatedPin() for index in device.pins}
+        )
+        self.instructions = 0
+        self._adc = DEFAULT_ADC if device is None else device.aux_params
+        self._waveforms: dict[int, Callable[[float], float]] = {}
+        self._lock = threading.Lock()
+        self._started_s = monotonic()
+        self._handlers = {
+            UOSFunctions.set_gpio_output.name: self._set_gpio_output,
+            UOSFunctions.get_gpio_input.name: self._get_gpio_input,
+            UOSFunctions.get_adc_input.name: self._get_adc_input,
+            UOSFunctions.reset_all_io.name: self._reset_all_io,
+            UOSFunctions.get_system_info.name: self._get_system_info,
+        }
+
+    def get_pin(self, pin: int) -> SimulatedPin:
+        """Get the state of a pin, creating it on first use.
+
+        :param pin: The index of the pin.
+        :return: The state of the pin.
+        """
+        if pin not in self.pins:
+            self.pins[pin] = SimulatedPin()
+        return self.pins[pin]
+
+    def set_adc_waveform(self, pin: int, waveform: Callable[[float], float]):
+        """Set the voltage applied to an ADC channel over time.
+
+        :param pin: The index of the ADC pin.
+        :param waveform: Called with the seconds since the model was created,
+                returning the voltage to sample.
+        :raises: UOSUnsupportedError if the pin doesn't support ADC reads.
+        """
+        if not self._check_pins((pin,), "adc_in"):
+            raise UOSUnsupportedError(f"Pin {pin} isn't an ADC pin.")
+        with self._lock:
+            self._waveforms[pin] = waveform
+
+    def set_input_level(self, pin: int, level: int):
+        """Drive the level applied to a pin when it's an input.
+
+        :param pin: The index of the pin.
+        :param level: The level applied externally, 0 or 1.
+        :raises: UOSUnsupportedError if the pin doesn't exist.
+        """
+        if not self._check_pins((pin,), "gpio_in"):
+            raise UOSUnsupportedError(f"Pin {pin} isn't a GPIO input.")
+        with self._lock:
+            self.get_pin(pin).input_level = 1 if level else 0
+
+    def reset(self):
+        """Return every pin to a floating input, as after a hard reset."""
+        with self._lock:
+            self._reset_all_io(())
+
+    def execute(self, frame: bytes) -> bytes:
+        """Execute an instruction frame, returning the encoded response.
+
+        Unsupported or invalid instructions are answered with an error ACK.
+
+        :param frame: A complete, validated NPC frame.
+        :return: The encoded ACK and any response packets.
+        """
+        address = frame[1]
+        payload = tuple(frame[4:-2])
+        function = UOSFunctions.get_from_address(address)
+        self.instructions += 1
+        if (
+            function is None
+            or function.name not in self._handlers
+            or (
+                self.device is not None
+                and UOSFunctions.get_volatility_from_address(address)
+                not in self.device.functions_enabled.get(function.name, [])
+            )
+        ):
+            logger.debug("Simulated firmware received unsupported address %s", address)
+            return NPCPacket(0, address, (ACK_ERROR,)).packet
+        with self._lock:
+            responses = self._handlers[function.name](payload)
+        if responses is None:  # invalid arguments
+            return NPCPacket(0, address, (ACK_ERROR,)).packet
+        return bytes(
+            NPCPacket.encode_sequence(
+                [(0, address, (ACK_OK,))]
+                + [(0, address, response) for response in responses]
+            )
+        )
+
+    def _check_pins(self, pins: tuple[int, ...], requirement: str) -> bool:
+        """Check pins exist and meet a requirement.
+
+        :param pins: The pin indices used by an instruction.
+        :param requirement: The Pin attribute the instruction needs.
+        :return: True if all pins are valid.
+        """
+        if self.device is None:
+            return True
+        return all(
+            pin in self.device.pins and getattr(self.device.pins[pin], requirement)
+            for pin in pins
+        )
+
+    def _set_gpio_output(self, payload: tuple[int, ...]) -> list | None:
+        """Drive pins as outputs from (pin, level) pairs."""
+        pins = payload[::2]
+        if len(payload) % 2 or not self._check_pins(pins, "gpio_out"):
+            return None
+        for pin, level in zip(pins, payload[1::2]):
+            state = self.get_pin(pin)
+            state.output = True
+            state.level = 1 if level else 0
+        return []
+
+    def _get_gpio_input(self, payload: tuple[int, ...]) -> list | None:
+        """Read pin levels from (pin, pull_up) pairs, outputs read back."""
+        pins = payload[::2]
+        if len(payload) % 2 or not self._check_pins(pins, "gpio_in"):
+            return None
+        for pin, pull_up in zip(pins, payload[1::2]):
+            state = self.get_pin(pin)
+            if not state.output:
+                state.pull_up = bool(pull_up)
+        return [tuple(self.get_pin(pin).read() for pin in pins)]
+
+    def _get_adc_input(self, payload: tuple[int, ...]) -> list | None:
+        """Sample the waveform of each ADC pin as big-endian raw values."""
+        if not payload or not self._check_pins(payload, "adc_in"):
+            return None
+        steps = pow(2, self._adc["adc_resolution"])
+        reference = self._adc["adc_reference"]
+        now_s = monotonic() - self._started_s
+        values = bytearray()
+        for pin in payload:
+            voltage = self._waveforms[pin](now_s) if pin in self._waveforms else 0.0
+            raw = min(steps - 1, max(0, round(voltage / reference * steps)))
+            values += raw.to_bytes(2, "big")
+        return [tuple(values)]
+
+    def _reset_all_io(self, payload: tuple[int, ...]) -> list | None:
+        """Return every pin to a floating input."""
+        if payload:
+            return None
+        for state in self.pins.values():
+            state.output = False
+            state.level = 0
+            state.pull_up = False
+        return []
+
+    def _get_system_info(self, payload: tuple[int, ...]) -> list | None:
+        """Report the firmware version and hardware id of the device."""
+        if payload:
+            return None
+        return [self.VERSION + (self.hwid, 0, 0)]
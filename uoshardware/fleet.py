@@ -0,0 +1,197 @@
+"""Provides concurrent control of many UOS devices."""
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from uoshardware import Loading, UOSRuntimeError, logger
+from uoshardware.abstractions import ComResult, Device
+from uoshardware.api import UOSDevice
+from uoshardware.interface import Interface
+
+
+@dataclass
+class FleetResult:
+    """The outcome of an operation fanned out across a fleet.
+
+    :ivar results: The value returned for each device that didn't raise.
+    :ivar errors: The exception raised by each device that failed.
+    """
+
+    results: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """True if no device raised or returned an unsuccessful ComResult."""
+        return not self.failed
+
+    @property
+    def failed(self) -> list[str]:
+        """Keys of devices that raised or returned an unsuccessful ComResult."""
+        return list(self.errors) + [
+            key
+            for key, result in self.results.items()
+            if isinstance(result, ComResult) and not result.status
+        ]
+
+
+class UOSFleet:
+    """A group of devices operated on concurrently from a bounded thread pool.
+
+    Operations are run on every device at once, a failure on one device is
+    captured in the ``FleetResult`` rather than stopping the others.
+
+    :ivar devices: The devices in the fleet keyed by name.
+    :ivar connection_errors: Devices that couldn't be created by ``connect``.
+    """
+
+    def __init__(
+        self,
+        devices: Mapping[str, UOSDevice] | Iterable[UOSDevice],
+        max_workers: int = 8,
+    ):
+        """Group existing devices into a fleet.
+
+        :param devices: Devices keyed by name, or devices to key by address.
+        :param max_workers: The maximum number of devices operated on at once.
+        :raises: UOSRuntimeError if two devices share a key.
+        """
+        if max_workers < 1:
+            raise UOSRuntimeError(f"Fleets need at least 1 worker not {max_workers}.")
+        if isinstance(devices, Mapping):
+            self.devices = dict(devices)
+        else:
+            self.devices = {}
+            for device in devices:
+                if device.address in self.devices:
+                    raise UOSRuntimeError(
+                        f"Fleet already contains a device at {device.address}."
+                    )
+                self.devices[device.address] = device
+        self.max_workers = max_workers
+        self.connection_errors: dict[str, Exception] = {}
+        self._executor: ThreadPoolExecutor | None = None
+
+    @classmethod
+    def connect(  # pylint: disable=too-many-arguments
+        cls,
+        identity: str | Device,
+        addresses: Iterable[str],
+        interface: Interface = Interface.SERIAL,
+        loading: Loading = Loading.EAGER,
+        max_workers: int = 8,
+        **kwargs,
+    ) -> "UOSFleet":
+        """Create a device for each address in parallel.
+
+        Eager devices are opened as they're created, devices that fail are
+        left out of the fleet and recorded in ``connection_errors``.
+
+        :param identity: The type of all the devices.
+        :param addresses: The connection string of each device.
+        :param interface: The interface used for all the devices.
+        :param loading: The loading strategy for all the devices.
+        :param max_workers: The maximum number of devices operated on at once.
+        :param kwargs: Additional connection parameters passed to each device.
+        :return: The fleet of devices that were created.
+        """
+        fleet = cls({}, max_workers)
+        created = fleet._map(
+            {address: address for address in addresses},
+            lambda address: UOSDevice(identity, address, interface, loading, **kwargs),
+        )
+        fleet.devices = created.results
+        fleet.connection_errors = created.errors
+        return fleet
+
+    def __enter__(self):
+        """Use the fleet as a context manager, closing it on exit."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):  # dead: disable
+        """Close every device in the fleet."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of devices in the fleet."""
+        return len(self.devices)
+
+    def execute(
+        self,
+        operation: Callable[[UOSDevice], Any],
+        keys: Iterable[str] | None = None,
+    ) -> FleetResult:
+        """Run an operation on devices in the fleet concurrently.
+
+        :param operation: Called with each device, the return is the result.
+        :param keys: Limit the operation to these devices, defaults to all.
+        :return: FleetResult keyed by device.
+        :raises: UOSRuntimeError if a key isn't in the fleet.
+        """
+        if keys is None:
+            devices = self.devices
+        else:
+            devices = {}
+            for key in keys:
+                if key not in self.devices:
+                    raise UOSRuntimeError(f"Fleet doesn't contain a device {key}.")
+                devices[key] = self.devices[key]
+        return self._map(devices, operation)
+
+    def call(self, method: str, *args, **kwargs) -> FleetResult:
+        """Call the same UOSDevice method on every device concurrently.
+
+        :param method: The name of the method, for example ``get_adc_input``.
+        :param args: Positional arguments for the method.
+        :param kwargs: Keyword arguments for the method.
+        :return: FleetResult keyed by device.
+        :raises: UOSRuntimeError if the method doesn't exist.
+        """
+        if method.startswith("_") or not callable(getattr(UOSDevice, method, None)):
+            raise UOSRuntimeError(f"UOSDevice has no method {method}.")
+        return self.execute(lambda device: getattr(device, method)(*args, **kwargs))
+
+    def open(self) -> FleetResult:
+        """Open every device's connection concurrently.
+
+        :return: FleetResult keyed by device.
+        """
+        return self.execute(UOSDevice.open)
+
+    def close(self) -> FleetResult:
+        """Close every device's connection concurrently and stop the workers.
+
+        :return: FleetResult keyed by device.
+        """
+        result = self.execute(UOSDevice.close)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return result
+
+    def _map(self, items: Mapping[str, Any], operation: Callable) -> FleetResult:
+        """Apply an operation to each item on the pool, isolating failures.
+
+        :param items: The arguments for the operation keyed by name.
+        :param operation: Called once with each item.
+        :return: FleetResult keyed by name.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="uos-fleet"
+            )
+        futures = {
+            key: self._executor.submit(operation, item) for key, item in items.items()
+        }
+        result = FleetResult()
+        for key, future in futures.items():
+            # Due to operations being user code that can raise anything, which
+            # mustn't hide the results of the other devices.
+            # pylint: disable=broad-exception-caught
+            try:
+                result.results[key] = future.result()
+            except Exception as error:
+                logger.debug("Fleet operation failed on %s: %s", key, error)
+                result.errors[key] = error
+        return result
@@ -0,0 +1,72 @@
+"""Provides array backed histories of the samples read from pins."""
+from array import array
+
+from uoshardware import UOSRuntimeError
+
+
+class SampleHistory:
+    """Fixed capacity history of samples stored in array backed columns.
+
+    Each column is twice the capacity and every sample is written to both
+    halves, so the latest samples are always contiguous and windows can be
+    exported as views without copying. Views are only valid until the
+    next append, copy them or convert with ``numpy.frombuffer`` to retain.
+
+    :ivar capacity: The maximum number of samples retained.
+    """
+
+    def __init__(self, capacity: int):
+        """Allocate the columns for a history.
+
+        :param capacity: The maximum number of samples retained.
+        :raises: UOSRuntimeError if the capacity isn't positive.
+        """
+        if capacity < 1:
+            raise UOSRuntimeError(f"Can't create a sample history of {capacity}.")
+        self.capacity = capacity
+        self._raw_values = array("q", bytes(16 * capacity))
+        self._values = array("d", bytes(16 * capacity))
+        self._times_ns = array("q", bytes(16 * capacity))
+        self._head = 0  # index the next sample is written to
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples currently retained."""
+        return self._count
+
+    def append(self, raw_value: int, value: float, time_ns: int):
+        """Add a sample, overwriting the oldest if the history is full.
+
+        :param raw_value: The raw value returned by the device.
+        :param value: The converted value of the sample.
+        :param time_ns: The monotonic timestamp of the sample in ns.
+        """
+        head = self._head
+        mirror = head + self.capacity
+        self._raw_values[head] = self._raw_values[mirror] = raw_value
+        self._values[head] = self._values[mirror] = value
+        self._times_ns[head] = self._times_ns[mirror] = time_ns
+        self._head = (head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def window(
+        self, count: int | None = None
+    ) -> tuple[memoryview, memoryview, memoryview]:
+        """Get views of the most recent samples, oldest first.
+
+        :param count: The number of samples wanted, defaults to all retained.
+        :return: Tuple of raw value, value and monotonic ns timestamp views.
+        """
+        count = self._count if count is None else max(0, min(count, self._count))
+        end = self._head + self.capacity
+        return (
+            memoryview(self._raw_values)[end - count : end],
+            memoryview(self._values)[end - count : end],
+            memoryview(self._times_ns)[end - count : end],
+        )
+
+    def clear(self):
+        """Discard all retained samples."""
+        self._head = 0
+        self._count = 0
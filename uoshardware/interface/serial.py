@@ -1,22 +1,91 @@
 """Module defining the low level UOSImplementation for serial port devices."""
+import asyncio
+import io
+import os
 import platform
-from time import sleep, time_ns
+import select
+import stat
+import threading
+from time import monotonic, monotonic_ns, sleep
 
 import serial
 from serial.serialutil import SerialException
 from serial.tools import list_ports
+from serial.tools.list_ports_common import ListPortInfo
 
 from uoshardware import UOSCommunicationError, logger
-from uoshardware.abstractions import ComResult, NPCPacket, UOSInterface
+from uoshardware.abstractions import (
+    AsyncUOSInterface,
+    ComResult,
+    NPCPacket,
+    UOSInterface,
+)
+from uoshardware.decoder import NPCDecoder
+from uoshardware.tracing import span
 
 if platform.system() == "Linux":
     import termios  # pylint: disable=E0401
 
 
+class PortInventory:
+    """Thread safe cache of the serial ports enumerated on the system.
+
+    Enumerating ports walks every tty on the system, so the result is reused
+    until it is older than the TTL or explicitly invalidated.
+
+    :ivar ttl_s: How long an enumeration is reused for in seconds.
+    """
+
+    def __init__(self, ttl_s: float = 5.0):
+        """Create an empty port inventory.
+
+        :param ttl_s: How long an enumeration is reused for in seconds.
+        """
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._ports: list[ListPortInfo] = []
+        self._expires_s = 0.0
+
+    def get_ports(self, refresh: bool = False) -> list[ListPortInfo]:
+        """Get the ports on the system, enumerating them if the cache is stale.
+
+        :param refresh: Force the ports to be enumerated.
+        :return: List of pyserial port information objects.
+        """
+        with self._lock:
+            if refresh or monotonic() >= self._expires_s:
+                self._ports = list_ports.comports()
+                self._expires_s = monotonic() + self.ttl_s
+                logger.debug("Enumerated %s serial ports", len(self._ports))
+            return list(self._ports)
+
+    def find(self, device: str) -> ListPortInfo | None:
+        """Look up a port, re-enumerating once if it isn't in the cache.
+
+        :param device: OS connection string for the serial port.
+        :return: The port information if it exists, else None.
+        """
+        for refresh in (False, True):
+            for port in self.get_ports(refresh):
+                if device in port.device:
+                    return port
+        return None
+
+    def invalidate(self):
+        """Discard the cached ports so the next lookup enumerates them."""
+        with self._lock:
+            self._expires_s = 0.0
+
+
+# Ports are shared by every serial interface in the process.
+PORT_INVENTORY = PortInventory()
+
+
 class Serial(UOSInterface):
     """Pyserial class that handles reading / writing to ports.
 
     :ivar _device: Holds the pyserial device once opened. None if not opened.
+    :ivar _decoder: Frame decoder holding any partially received data.
     :ivar _connection: Holds the standard connection string
         'Interface'|'OS Connection String.
     :ivar _port: Holds the port class, none type if device not instantiated.
@@ -24,6 +93,7 @@ class Serial(UOSInterface):
     """
 
     _device = None
+    _decoder: NPCDecoder
 
     _connection = ""
     _port = None
@@ -35,6 +105,7 @@ class Serial(UOSInterface):
         :param connection: OS connection string for the serial port.
         """
         self._connection = connection
+        self._decoder = NPCDecoder()
         self._port = self.check_port_exists(connection)
         self._kwargs = kwargs
         if self._port is None:
@@ -44,58 +115,63 @@ class Serial(UOSInterface):
 
     def open(self):
         """Open a connection to the port and creates the device object."""
-        try:
-            self._port = self.check_port_exists(self._connection)
-            if self._port is None:
-                logger.error("%s device was not present to open", self._connection)
-                raise UOSCommunicationError("Device could not be found on system.")
-            self._device = serial.Serial()
-            self._device.port = self._connection
-            if "baudrate" in self._kwargs:
-                self._device.baudrate = self._kwargs["baudrate"]
-            if platform.system() == "Linux":  # DTR transient workaround for Unix
-                logger.debug("Linux platform found so using DTR workaround")
-                with open(self._connection, mode="rb") as port:
-                    attrs = termios.tcgetattr(port)
-                    attrs[2] = attrs[2] & ~termios.HUPCL
-                    termios.tcsetattr(port, termios.TCSAFLUSH, attrs)
-            else:  # DTR transient workaround for Windows
-                self._device.dtr = False
-            self._device.open()
-            logger.debug("%s opened successfully", self._port.device)
-            return
-        except (SerialException, FileNotFoundError) as exception:
-            logger.error(
-                "Opening %s threw error %s",
-                self._port.device if self._port is not None else "None",
-                str(exception),
-            )
-            if (
-                exception.errno == 13
-            ):  # permission denied another connection open to this device.
+        with span("serial.open", port=self._connection):
+            try:
+                with span("serial.find_port", port=self._connection):
+                    self._port = self.check_port_exists(self._connection)
+                if self._port is None:
+                    logger.error("%s device was not present to open", self._connection)
+                    raise UOSCommunicationError("Device could not be found on system.")
+                self._device = serial.Serial()
+                self._device.port = self._connection
+                if "baudrate" in self._kwargs:
+                    self._device.baudrate = self._kwargs["baudrate"]
+                if platform.system() == "Linux":  # DTR transient workaround for Unix
+                    logger.debug("Linux platform found so using DTR workaround")
+                    with open(self._connection, mode="rb") as port:
+                        attrs = termios.tcgetattr(port)
+                        attrs[2] = attrs[2] & ~termios.HUPCL
+                        termios.tcsetattr(port, termios.TCSAFLUSH, attrs)
+                else:  # DTR transient workaround for Windows
+                    self._device.dtr = False
+                self._device.open()
+                self._decoder.reset()
+                logger.debug("%s opened successfully", self._port.device)
+                return
+            except (SerialException, FileNotFoundError) as exception:
+                PORT_INVENTORY.invalidate()  # the port may have been removed
                 logger.error(
-                    "Cannot open connection, account has insufficient permissions."
+                    "Opening %s threw error %s",
+                    self._port.device if self._port is not None else "None",
+                    str(exception),
                 )
+                if (
+                    exception.errno == 13
+                ):  # permission denied another connection open to this device.
+                    logger.error(
+                        "Cannot open connection, account has insufficient permissions."
+                    )
+                    raise UOSCommunicationError(
+                        "Cannot open connection insufficient permissions."
+                    ) from exception
                 raise UOSCommunicationError(
-                    "Cannot open connection insufficient permissions."
+                    f"Failed to open device '{exception}'"
                 ) from exception
-            raise UOSCommunicationError(
-                f"Failed to open device '{exception}'"
-            ) from exception
 
     def close(self):
         """Close the serial connection and clear the device."""
         if self._device is None:
             return  # already closed
-        try:
-            self._device.close()
-        except SerialException as exception:
-            logger.debug("Closing the connection threw error %s", str(exception))
-            raise UOSCommunicationError(
-                f"Closing connection threw error '{exception}'."
-            ) from exception
-        logger.debug("Connection closed successfully")
-        self._device = None
+        with span("serial.close", port=self._connection):
+            try:
+                self._device.close()
+            except SerialException as exception:
+                logger.debug("Closing the connection threw error %s", str(exception))
+                raise UOSCommunicationError(
+                    f"Closing connection threw error '{exception}'."
+                ) from exception
+            logger.debug("Connection closed successfully")
+            self._device = None
 
     def execute_instruction(self, packet: NPCPacket):
         """Build and execute a new instruction packet.
@@ -108,16 +184,16 @@ class Serial(UOSInterface):
             raise UOSCommunicationError(
                 "Connection must be open to execute instructions."
             )
+        self._decoder.expect(packet.to_address)
         try:  # Send the packet.
-            num_bytes = self._device.write(packet.packet)
-            self._device.flush()
+            with span("serial.write", bytes=len(packet.packet)):
+                num_bytes = self._device.write(packet.packet)
+                self._device.flush()
             logger.debug("Sent %s bytes of data", num_bytes)
         except serial.SerialException as exception:
             raise UOSCommunicationError(
                 f"Executing instruction threw error '{exception}'"
             ) from exception
-        finally:
-            self._device.reset_output_buffer()
         return ComResult(num_bytes == len(packet.packet))
 
     def read_response(self, expect_packets: int, timeout_s: float):
@@ -131,43 +207,67 @@ class Serial(UOSInterface):
             raise UOSCommunicationError(
                 "Connection must be open to read response from device."
             )
-        response_object = ComResult(False)
-        start_ns = time_ns()
-        packet: list = []
-        byte_index = -1  # tracks the byte position index of the current packet
-        packet_index = 0  # tracks the packet number being received 0 = ACK
+        deadline_ns = monotonic_ns() + int(timeout_s * 1000000000)
+        decoder = self._decoder
+        checksum_errors = decoder.checksum_errors
         try:
-            while (timeout_s * 1000000000) > time_ns() - start_ns and byte_index > -2:
-                # read until packet or timeout
-                num_bytes = self._device.in_waiting
-                for _ in range(num_bytes):
-                    byte_in = self._device.read(1)
-                    byte_index, packet = self.decode_and_capture(
-                        byte_index, byte_in, packet
-                    )
-                    if byte_index == -2:
-                        if packet_index == 0:
-                            response_object.ack_packet = packet
-                        else:
-                            response_object.rx_packets.append(packet)
-                        packet_index += 1
-                        if expect_packets == packet_index:
-                            break
-                        byte_index = -1
-                        packet = []
-                    byte_index += 1
-                sleep(0.05)  # Don't churn CPU cycles waiting for data
-            logger.debug("Packet received %s", packet)
-            if expect_packets != packet_index or len(packet) < 6 or byte_index != -2:
-                response_object.rx_packets.append(packet)
-                response_object.exception = "did not receive all the expected data"
-                return response_object
-            response_object.status = True
-            return response_object
+            # Setting the timeout reconfigures the port, so it's only set once
+            # and waits for data are bounded by the deadline instead.
+            self._device.timeout = timeout_s
+            # Frames with invalid checksums still count towards the response,
+            # so all of its frames are consumed before the error is reported.
+            while (
+                len(decoder.frames) + decoder.checksum_errors - checksum_errors
+                < expect_packets
+            ):
+                remaining_s = (deadline_ns - monotonic_ns()) / 1000000000
+                if remaining_s <= 0:
+                    break
+                with span("serial.wait"):
+                    data = self._read_available(self._device, remaining_s)
+                with span("serial.decode", bytes=len(data)):
+                    decoder.feed(data)
         except serial.SerialException as exception:
             raise UOSCommunicationError(
                 f"Reading response raised exception '{exception}'"
             ) from exception
+        response_object = decoder.pop_result(expect_packets)
+        logger.debug("Response received %s", response_object)
+        if decoder.checksum_errors != checksum_errors:
+            response_object.status = False
+            response_object.exception = NPCDecoder.CHECKSUM_ERROR
+        return response_object
+
+    @staticmethod
+    def _read_available(device, timeout_s: float) -> bytes:
+        """Wait for data to arrive then take everything buffered in one read.
+
+        :param device: The open pyserial device.
+        :param timeout_s: The maximum time to wait for data.
+        :return: The bytes read, empty if none arrived in time.
+        """
+        if not device.in_waiting:
+            try:
+                readable, _, _ = select.select([device.fileno()], [], [], timeout_s)
+            except io.UnsupportedOperation:
+                # Windows ports can't be selected, so the read blocks instead.
+                device.timeout = timeout_s
+            else:
+                if not readable:
+                    return b""
+        return device.read(max(1, device.in_waiting))
+
+    def reset_input(self):
+        """Discard received data that hasn't been read, such as late responses."""
+        self._decoder.reset()
+        if self._device is None:
+            return
+        try:
+            self._device.reset_input_buffer()
+        except serial.SerialException as exception:
+            raise UOSCommunicationError(
+                f"Resetting the input buffer threw error '{exception}'"
+            ) from exception
 
     def hard_reset(self):
         """Manually drive the DTR line low to reset the device.
@@ -197,41 +297,10 @@ class Serial(UOSInterface):
             f"_device={self._device})>"
         )
 
-    @staticmethod
-    def decode_and_capture(
-        byte_index: int, byte_in: bytes, packet: list
-    ) -> tuple[int, list]:
-        """Parser takes in a byte and vets it against UOS packet.
-
-        :param byte_index: The index of the last 'valid' byte found.
-        :param byte_in: The current byte for inspection.
-        :param packet: The current packet of validated bytes.
-        :return: Tuple containing the updated byte index and updated packet.
-        """
-        if byte_index == -1:  # start symbol
-            if byte_in == b">":
-                byte_index += 1
-        if byte_index >= 0:
-            logger.debug(
-                "read %s byte index = %s",
-                byte_in,
-                byte_index,
-            )
-            payload_len = packet[3] if len(packet) > 3 else 0
-            if byte_index == 3 + 2 + payload_len:  # End packet symbol
-                if byte_in == b"<":
-                    byte_index = -2  # packet complete
-                    logger.debug("Found end packet symbol")
-                else:  # Errored data
-                    byte_index = -1
-                    packet = []
-            packet.append(int.from_bytes(byte_in, byteorder="little"))
-        return byte_index, packet
-
     @staticmethod
     def enumerate_devices():
         """Get the available ports on the system."""
-        return [Serial(port.device) for port in list_ports.comports()]
+        return [Serial(port.device) for port in PORT_INVENTORY.get_ports()]
 
     @staticmethod
     def check_port_exists(device: str):
@@ -240,8 +309,157 @@ class Serial(UOSInterface):
         :param device: OS connection string for the serial port.
         :return: The port device class if it exists, else None.
         """
-        ports = list_ports.comports()
-        for port in ports:
-            if device in port.device:
-                return port
-        return None
+        if os.sep in device:
+            try:  # Fast path, a device node exists so skip enumerating ports.
+                if stat.S_ISCHR(os.stat(device).st_mode):
+                    return ListPortInfo(device)
+            except OSError:
+                pass  # fall back to the ports enumerated on the system
+        return PORT_INVENTORY.find(device)
+
+
+class AsyncSerial(AsyncUOSInterface):
+    """Asyncio serial interface, waiting on responses through the event loop.
+
+    Connection management is delegated to a blocking ``Serial`` instance.
+    Once open the port is used without blocking, on platforms where the port
+    has a file descriptor the event loop is notified when data arrives.
+
+    :ivar _serial: The blocking serial interface managing the connection.
+    """
+
+    # The blocking implementation's protected members are shared deliberately.
+    # pylint: disable=protected-access
+
+    def __init__(self, connection: str, **kwargs):
+        """Create an asyncio serial interface.
+
+        :param connection: OS connection string for the serial port.
+        """
+        self._serial = Serial(connection, **kwargs)
+
+    async def open(self):
+        """Open a connection to the port without blocking the event loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self._serial.open)
+        self._serial._device.timeout = 0  # reads must never block the loop
+
+    async def close(self):
+        """Close the serial connection without blocking the event loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self._serial.close)
+
+    async def execute_instruction(self, packet: NPCPacket) -> ComResult:
+        """Write an instruction packet to the port.
+
+        :param packet: A tuple containing the uint8 npc packet for the UOS instruction.
+        :return: ComResult object.
+        """
+        if self._serial._device is None:
+            raise UOSCommunicationError(
+                "Connection must be open to execute instructions."
+            )
+        self._serial._decoder.expect(packet.to_address)
+        try:  # Instructions are small enough to not block in the OS buffers.
+            num_bytes = self._serial._device.write(packet.packet)
+            logger.debug("Sent %s bytes of data", num_bytes)
+        except serial.SerialException as exception:
+            raise UOSCommunicationError(
+                f"Executing instruction threw error '{exception}'"
+            ) from exception
+        return ComResult(num_bytes == len(packet.packet))
+
+    async def read_response(self, expect_packets: int, timeout_s: float) -> ComResult:
+        """Read ACK and response packets from the serial device.
+
+        :param expect_packets: How many packets including ACK to expect.
+        :param timeout_s: The maximum time this function will wait for data.
+        :return: ComResult object.
+        """
+        device = self._serial._device
+        if device is None:
+            raise UOSCommunicationError(
+                "Connection must be open to read response from device."
+            )
+        loop = asyncio.get_running_loop()
+        deadline_s = loop.time() + timeout_s
+        decoder = self._serial._decoder
+        checksum_errors = decoder.checksum_errors
+        try:
+            while (
+                len(decoder.frames) + decoder.checksum_errors - checksum_errors
+                < expect_packets
+            ):
+                data = device.read(device.in_waiting)
+                if data:
+                    decoder.feed(data)
+                    continue
+                remaining_s = deadline_s - loop.time()
+                if remaining_s <= 0:
+                    break
+                await self._wait_readable(device, remaining_s)
+        except serial.SerialException as exception:
+            raise UOSCommunicationError(
+                f"Reading response raised exception '{exception}'"
+            ) from exception
+        response_object = decoder.pop_result(expect_packets)
+        if decoder.checksum_errors != checksum_errors:
+            response_object.status = False
+            response_object.exception = NPCDecoder.CHECKSUM_ERROR
+        return response_object
+
+    @staticmethod
+    async def _wait_readable(device, timeout_s: float):
+        """Wait until the port has data to read or the timeout expires.
+
+        :param device: The open pyserial device.
+        :param timeout_s: The maximum time to wait.
+        """
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+
+        def on_readable():
+            if not readable.done():  # the reader can fire again before removal
+                readable.set_result(None)
+
+        try:
+            file_descriptor = device.fileno()
+            loop.add_reader(file_descriptor, on_readable)
+        except (io.UnsupportedOperation, NotImplementedError):
+            # Windows ports have no descriptor and the proactor loop can't
+            # watch one, so the port is polled instead.
+            await asyncio.sleep(min(timeout_s, 0.001))
+            return
+        try:
+            await asyncio.wait_for(readable, timeout_s)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(file_descriptor)
+
+    async def reset_input(self):
+        """Discard received data that hasn't been read, such as late responses."""
+        self._serial.reset_input()
+
+    async def hard_reset(self) -> ComResult:
+        """Manually drive the DTR line low to reset the device.
+
+        :return: ComResult object.
+        """
+        device = self._serial._device
+        if device is None:
+            raise UOSCommunicationError("Connection must be open to hard reset device.")
+        logger.debug("Resetting the device using the DTR line")
+        device.dtr = not device.dtr
+        await asyncio.sleep(0.2)
+        device.dtr = not device.dtr
+        return ComResult(True)
+
+    def is_active(self) -> bool:
+        """Check if connection is active to the device."""
+        return self._serial.is_active()
+
+    def __repr__(self):
+        """Representation of object.
+
+        :return: String containing the wrapped serial interface.
+        """
+        return f"<AsyncSerial(_serial={self._serial})>"
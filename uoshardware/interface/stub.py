@@ -1,64 +1,180 @@
 """Package is used as a simulated UOSInterface for test purposes."""
-from uoshardware import UOSCommunicationError
-from uoshardware.abstractions import ComResult, NPCPacket, UOSInterface
+import asyncio
+import random
+from collections import deque
+from dataclasses import dataclass
+from time import monotonic, sleep
+
+from uoshardware import UOSCommunicationError, logger
+from uoshardware.abstractions import (
+    AsyncUOSInterface,
+    ComResult,
+    Device,
+    NPCPacket,
+    UOSInterface,
+)
+from uoshardware.decoder import NPCDecoder
+from uoshardware.firmware import FirmwareModel
+
+
+@dataclass
+class StubSimulation:
+    """Timing and faults of the simulated device behind a stub.
+
+    Rates are the probability of the fault affecting each instruction's
+    response, the default simulation responds instantly without faults.
+
+    :ivar latency_s: The mean time before a response is available.
+    :ivar jitter_s: Standard deviation of normally distributed noise added to
+        the latency, the delay is never negative.
+    :ivar drop_rate: Rate at which responses are lost, including the ACK.
+    :ivar corrupt_rate: Rate at which a response frame has a bad checksum.
+    :ivar truncate_rate: Rate at which a response is cut short.
+    :ivar seed: Seeds the random faults and jitter so runs are repeatable.
+    """
+
+    latency_s: float = 0.0
+    jitter_s: float = 0.0
+    drop_rate: float = 0.0
+    corrupt_rate: float = 0.0
+    truncate_rate: float = 0.0
+    seed: int | None = None
 
 
 class Stub(UOSInterface):
-    """Class can be used as a low level test endpoint."""
+    """Class can be used as a low level test endpoint.
+
+    Instructions are executed by a firmware model, so pin state is kept
+    between instructions and responses are sized as real firmware would size
+    them. A simulation can delay responses and inject faults on the wire.
+
+    :ivar model: The firmware model executing instructions.
+    :ivar simulation: The timing and faults applied to responses.
+    :ivar faults: Count of each fault injected by the simulation.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # Due to holding the simulated wire as well as the connection state.
 
-    def __init__(self, connection: str, errored: int = 0):
-        """Instantiate an instance of the test stub."""
-        self.__packet_buffer: list = []
+    def __init__(
+        self,
+        connection: str,
+        errored: int = 0,
+        model: FirmwareModel | Device | None = None,
+        simulation: StubSimulation | None = None,
+    ):
+        """Instantiate an instance of the test stub.
+
+        :param connection: The connection string, empty strings can't be opened.
+        :param errored: Non-zero to simulate an error when closing.
+        :param model: The firmware model or device definition to simulate,
+                defaults to a model accepting any pin.
+        :param simulation: The timing and faults to simulate.
+        """
+        self.__pending: deque[tuple[float, bytes]] = deque()
+        self.__decoder = NPCDecoder()
         self.__open = False
         self.errored = errored
         self.connection = connection
+        self.model = model if isinstance(model, FirmwareModel) else FirmwareModel(model)
+        self.simulation = StubSimulation() if simulation is None else simulation
+        self.faults = {"dropped": 0, "corrupted": 0, "truncated": 0}
+        self.__random = random.Random(self.simulation.seed)
 
     def execute_instruction(self, packet: NPCPacket) -> ComResult:
         """Simulate executing an instruction on a UOS endpoint.
 
-        Should check whether the last instruction was valid and store
-        it. This will allow read response to provide more realistic
-        responses.
+        The response from the firmware model is queued with the simulated
+        latency and faults applied, ready for read response.
         """
         if not self.__open:
             raise UOSCommunicationError("Port must be open to execute instructions.")
-        if packet.expects_ack():
-            # Dummy an ack packet.
-            self.__packet_buffer.append(
-                NPCPacket(0, packet.to_address, tuple([0])).packet
-            )
-        for rx_packet in packet.expects_rx_packets():
-            # Dummy response packets
-            self.__packet_buffer.append(
-                NPCPacket(
-                    0, packet.to_address, tuple(0 for _ in range(rx_packet))
-                ).packet
-            )
+        self.__decoder.expect(packet.to_address)
+        response = self.__inject_faults(self.model.execute(packet.packet))
+        simulation = self.simulation
+        ready_s = monotonic() + max(
+            0.0, self.__random.gauss(simulation.latency_s, simulation.jitter_s)
+        )
+        if self.__pending:  # the link delivers responses in order
+            ready_s = max(ready_s, self.__pending[-1][0])
+        if response:
+            self.__pending.append((ready_s, response))
         return ComResult(True)
 
+    def __inject_faults(self, response: bytes) -> bytes:
+        """Apply the simulated faults to a response.
+
+        :param response: The encoded response from the firmware model.
+        :return: The response as it arrives, empty if it was dropped.
+        """
+        simulation = self.simulation
+        if self.__random.random() < simulation.drop_rate:
+            self.faults["dropped"] += 1
+            logger.debug("Stub dropped response %s", response)
+            return b""
+        data = bytearray(response)
+        if self.__random.random() < simulation.corrupt_rate:
+            self.faults["corrupted"] += 1
+            # Every frame ends with the checksum followed by the end byte.
+            checksums = []
+            start = 0
+            while start < len(data):
+                start += data[start + 3] + NPCDecoder.FRAME_OVERHEAD
+                checksums.append(start - 2)
+            data[self.__random.choice(checksums)] ^= 0xFF
+        if len(data) > 1 and self.__random.random() < simulation.truncate_rate:
+            self.faults["truncated"] += 1
+            del data[self.__random.randrange(1, len(data)) :]
+        return bytes(data)
+
     # Dead code detection false positive due to abstract interface.
     def read_response(
         self, expect_packets: int, timeout_s: float  # dead: disable
     ) -> ComResult:
         """Simulate gathering the response from an instruction.
 
-        Should have already executed an instruction. If no response is
-        generated by instruction will error accordingly.
+        Should have already executed an instruction. Waits up to the timeout
+        for delayed responses, if no response is generated by instruction will
+        error accordingly.
         """
         if not self.__open:
             raise UOSCommunicationError("Port must be open to read response.")
-        result = ComResult(False)
-        if len(self.__packet_buffer) > 0:
-            result.ack_packet = self.__packet_buffer.pop(0)
-            result.status = True
-        for _ in self.__packet_buffer:
-            result.rx_packets.append(self.__packet_buffer.pop(0))
-        return result
+        # Responses are decoded from the simulated wire like a real interface.
+        deadline_s = monotonic() + timeout_s
+        pending = self.__pending
+        checksum_errors = self.__decoder.checksum_errors
+        while True:
+            now_s = monotonic()
+            while pending and pending[0][0] <= now_s:
+                self.__decoder.feed(pending.popleft()[1])
+            if (
+                len(self.__decoder.frames)
+                + self.__decoder.checksum_errors
+                - checksum_errors
+                >= expect_packets
+                or now_s >= deadline_s
+            ):
+                break
+            # Missing frames are waited for until the deadline like a real port.
+            sleep((min(pending[0][0], deadline_s) if pending else deadline_s) - now_s)
+        response_object = self.__decoder.pop_result(expect_packets)
+        if self.__decoder.checksum_errors != checksum_errors:
+            response_object.status = False
+            response_object.exception = NPCDecoder.CHECKSUM_ERROR
+        return response_object
+
+    def reset_input(self):
+        """Override base prototype, discards responses that haven't been read."""
+        self.__pending.clear()
+        self.__decoder.reset()
 
     def hard_reset(self) -> ComResult:
         """Override base prototype, simulates reset."""
         if not self.__open:
             raise UOSCommunicationError("Port must be open to hard reset device.")
+        self.__pending.clear()
+        self.__decoder.reset()
+        self.model.reset()
         return ComResult(status=True)
 
     def open(self):
@@ -84,3 +200,52 @@ class Stub(UOSInterface):
     def enumerate_devices() -> list:
         """Return a list of test stubs implemented in the interface."""
         return [Stub("STUB")]  # The test stub is always available
+
+
+class AsyncStub(AsyncUOSInterface):
+    """Asyncio test endpoint, simulating a device using the blocking stub."""
+
+    def __init__(
+        self,
+        connection: str,
+        errored: int = 0,
+        model: FirmwareModel | Device | None = None,
+        simulation: StubSimulation | None = None,
+    ):
+        """Instantiate an instance of the asyncio test stub."""
+        self._stub = Stub(connection, errored, model, simulation)
+
+    async def execute_instruction(self, packet: NPCPacket) -> ComResult:
+        """Simulate executing an instruction on a UOS endpoint."""
+        return self._stub.execute_instruction(packet)
+
+    async def read_response(
+        self, expect_packets: int, timeout_s: float  # dead: disable
+    ) -> ComResult:
+        """Simulate gathering the response from an instruction."""
+        if self._stub.simulation.latency_s or self._stub.simulation.jitter_s:
+            # Waiting for delayed responses mustn't block the event loop.
+            return await asyncio.to_thread(
+                self._stub.read_response, expect_packets, timeout_s
+            )
+        return self._stub.read_response(expect_packets, timeout_s)
+
+    async def reset_input(self):
+        """Override base prototype, discards responses that haven't been read."""
+        self._stub.reset_input()
+
+    async def hard_reset(self) -> ComResult:
+        """Override base prototype, simulates reset."""
+        return self._stub.hard_reset()
+
+    async def open(self):
+        """Override base prototype, simulates opening a connection."""
+        self._stub.open()
+
+    async def close(self):
+        """Override base prototype, simulates closing a connection."""
+        self._stub.close()
+
+    def is_active(self) -> bool:
+        """Check if connection is active to the device."""
+        return self._stub.is_active()
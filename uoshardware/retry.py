@@ -0,0 +1,182 @@
+"""Provides retry policies and circuit breakers for executing instructions."""
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from time import monotonic
+
+from uoshardware.abstractions import ComResult
+from uoshardware.decoder import NPCDecoder
+from uoshardware.timeouts import get_deadline_s
+
+
+class Failure(Enum):
+    """Classes of failure an instruction attempt can have."""
+
+    TIMEOUT = "timeout"  # the expected response didn't arrive in time
+    CHECKSUM = "checksum"  # a response frame was corrupted
+    COMMUNICATION = "communication"  # the interface raised or couldn't send
+
+
+def classify_failure(result: ComResult) -> Failure | None:
+    """Find the class of failure of an instruction attempt.
+
+    :param result: The result of the attempt.
+    :return: The failure class, None if the attempt succeeded.
+    """
+    if result.status:
+        return None
+    if result.exception == NPCDecoder.CHECKSUM_ERROR:
+        return Failure.CHECKSUM
+    if result.exception == NPCDecoder.MISSING_DATA_ERROR:
+        return Failure.TIMEOUT
+    return Failure.COMMUNICATION
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Controls how failed instructions are retried.
+
+    Attempts are made on the same connection, so lazily loaded devices only
+    open their port once per instruction. Backoff grows exponentially from
+    ``backoff_s`` between consecutive attempts.
+
+    :ivar max_attempts: The maximum number of attempts, including the first.
+    :ivar backoff_s: The delay before the first retry.
+    :ivar backoff_multiplier: Multiplies the delay after each retry.
+    :ivar max_backoff_s: The longest delay between attempts.
+    :ivar retry_on: The failure classes that are retried.
+    :ivar deadline_s: The total time allowed for an instruction's attempts,
+        retries aren't started once it has passed. None for no deadline.
+        The sooner of this and any ``timeouts.deadline`` of the caller applies.
+    """
+
+    max_attempts: int = 2
+    backoff_s: float = 0.0
+    backoff_multiplier: float = 2.0
+    max_backoff_s: float = 1.0
+    retry_on: frozenset[Failure] = frozenset(Failure)
+    deadline_s: float | None = None
+
+    def get_backoff_s(self, attempt: int) -> float:
+        """Get the delay before retrying a failed attempt.
+
+        :param attempt: The number of the attempt that failed, starting at 1.
+        :return: The delay in seconds.
+        """
+        return min(
+            self.max_backoff_s,
+            self.backoff_s * pow(self.backoff_multiplier, attempt - 1),
+        )
+
+    def get_deadline_s(self) -> float | None:
+        """Get the monotonic time an instruction starting now must finish by.
+
+        :return: The sooner of the policy's and the caller's deadline, None if
+                neither is set.
+        """
+        deadline_s = get_deadline_s()
+        if self.deadline_s is None:
+            return deadline_s
+        policy_deadline_s = monotonic() + self.deadline_s
+        if deadline_s is None:
+            return policy_deadline_s
+        return min(deadline_s, policy_deadline_s)
+
+    def should_retry(
+        self, failure: Failure | None, attempt: int, deadline_s: float | None
+    ) -> bool:
+        """Check if another attempt should be made.
+
+        :param failure: The failure class of the attempt, None on success.
+        :param attempt: The number of the attempt, starting at 1.
+        :param deadline_s: The monotonic time the instruction must finish by.
+        :return: True if the instruction should be retried.
+        """
+        return (
+            failure in self.retry_on
+            and attempt < self.max_attempts
+            and (
+                deadline_s is None
+                or monotonic() + self.get_backoff_s(attempt) < deadline_s
+            )
+        )
+
+
+# Instructions are attempted once.
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+class CircuitState(Enum):
+    """States of a circuit breaker."""
+
+    CLOSED = 0  # instructions execute normally
+    OPEN = 1  # instructions fail fast without reaching the device
+    HALF_OPEN = 2  # a single probe instruction is allowed through
+
+
+class CircuitBreaker:
+    """Fails instructions fast once a device has failed repeatedly.
+
+    After ``failure_threshold`` consecutive failed instructions the circuit
+    opens and instructions are rejected without touching the port. Once
+    ``reset_timeout_s`` has passed a single probe instruction is let through,
+    closing the circuit if it succeeds or opening it again if it fails.
+
+    :ivar failure_threshold: Consecutive failures that open the circuit.
+    :ivar reset_timeout_s: How long the circuit stays open before probing.
+    :ivar state: The current state of the circuit.
+    :ivar failures: The number of consecutive failed instructions.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 5.0):
+        """Create a closed circuit breaker.
+
+        :param failure_threshold: Consecutive failures that open the circuit.
+        :param reset_timeout_s: How long the circuit stays open before probing.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._opened_s = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Check if an instruction may be executed, moving to probing if due.
+
+        :return: True if the instruction should be executed.
+        """
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if (
+                self.state == CircuitState.OPEN
+                and monotonic() - self._opened_s >= self.reset_timeout_s
+            ):
+                self.state = CircuitState.HALF_OPEN
+                return True
+            return False  # open, or a probe is already in progress
+
+    def record(self, success: bool):
+        """Record the outcome of an instruction that was allowed.
+
+        :param success: True if the instruction succeeded.
+        """
+        with self._lock:
+            if success:
+                self.state = CircuitState.CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if (
+                self.state == CircuitState.HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                self.state = CircuitState.OPEN
+                self._opened_s = monotonic()
+
+    def reset(self):
+        """Close the circuit, forgetting previous failures."""
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self.failures = 0
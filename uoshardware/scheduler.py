@@ -0,0 +1,266 @@
+"""Provides background polling of pins on a UOS device."""
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from time import monotonic_ns
+
+from uoshardware import UOSError, UOSRuntimeError, UOSUnsupportedError, logger
+from uoshardware.abstractions import Sample, UOSFunction, UOSFunctions
+from uoshardware.api import UOSDevice
+
+
+@dataclass
+class SubscriptionStats:
+    """Statistics on how closely a subscription is polled to its schedule.
+
+    :ivar polls: The number of successful reads of the pin.
+    :ivar missed: Scheduled polls skipped as the previous tick overran.
+    :ivar errors: Polls where the batched read failed.
+    :ivar callback_errors: Polls where the callback raised an exception.
+    :ivar jitter_max_ns: The latest a poll has been read after schedule.
+    :ivar jitter_total_ns: Sum of the lateness of all polls.
+    """
+
+    polls: int = 0
+    missed: int = 0
+    errors: int = 0
+    callback_errors: int = 0
+    jitter_max_ns: int = 0
+    jitter_total_ns: int = 0
+
+    @property
+    def jitter_mean_ns(self) -> float:
+        """The mean time polls have been read after schedule."""
+        return self.jitter_total_ns / self.polls if self.polls else 0.0
+
+
+class Subscription:  # pylint: disable=too-few-public-methods
+    """A pin polled periodically by a ``PollingScheduler``.
+
+    :ivar pin: The index of the pin polled.
+    :ivar function: The UOS function used to read the pin.
+    :ivar period_ns: The interval between polls in ns.
+    :ivar pull_up: Enable the internal pull-up resistor for GPIO reads.
+    :ivar stats: The statistics of the subscription so far.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        pin: int,
+        function: UOSFunction,
+        period_ns: int,
+        *,
+        pull_up: bool,
+        callback: Callable[["Subscription", Sample], None] | None,
+        first_due_ns: int,
+    ):
+        """Create a subscription, use ``PollingScheduler.subscribe`` instead."""
+        self.pin = pin
+        self.function = function
+        self.period_ns = period_ns
+        self.pull_up = pull_up
+        self.callback = callback
+        self.stats = SubscriptionStats()
+        self.due_ns = first_due_ns
+
+    def __repr__(self):
+        """Return a summary of the subscription."""
+        return (
+            f"<Subscription(pin={self.pin}, function={self.function.name}, "
+            f"period_ns={self.period_ns})>"
+        )
+
+
+class PollingScheduler:
+    """Polls subscribed pins of a device from a background thread.
+
+    On each tick every subscription that is due is read, GPIO pins are merged
+    into a single ``get_gpio_inputs`` instruction and ADC channels into a
+    single ``get_adc_inputs`` instruction. Pin samples on the device are
+    updated as usual. Polls are scheduled from a fixed origin so timing
+    errors don't accumulate, if a tick overruns whole periods of a
+    subscription they are skipped and counted as missed.
+    """
+
+    FUNCTIONS = (UOSFunctions.get_gpio_input, UOSFunctions.get_adc_input)
+
+    def __init__(self, device: UOSDevice):
+        """Create a scheduler, subscriptions aren't polled until started.
+
+        :param device: The device to poll pins on.
+        """
+        self.device = device
+        self._subscriptions: list[Subscription] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._running = False
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self):
+        """Start polling when used as a context manager."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):  # dead: disable
+        """Stop polling when leaving the context manager."""
+        self.stop()
+
+    def subscribe(  # pylint: disable=too-many-arguments
+        self,
+        pin: int,
+        function: UOSFunction,
+        period_s: float,
+        pull_up: bool = False,
+        callback: Callable[[Subscription, Sample], None] | None = None,
+    ) -> Subscription:
+        """Poll a pin periodically, the first poll is due immediately.
+
+        :param pin: The index of the pin to poll.
+        :param function: get_gpio_input or get_adc_input.
+        :param period_s: The interval between polls in seconds.
+        :param pull_up: Enable the internal pull-up resistor for GPIO reads.
+        :param callback: Called with the subscription and new sample after
+                each successful poll, from the scheduler thread. Exceptions
+                raised by the callback are logged and don't stop polling.
+        :return: The Subscription, used to unsubscribe and check statistics.
+        :raises: UOSUnsupportedError if the pin can't be read by the function.
+        :raises: UOSRuntimeError if the period isn't positive.
+        """
+        if function not in self.FUNCTIONS:
+            raise UOSUnsupportedError(f"Can't schedule polls of {function.name}.")
+        if pin not in self.device.get_compatible_pins(function):
+            raise UOSUnsupportedError(f"{function.name} isn't supported on pin {pin}.")
+        if period_s <= 0:
+            raise UOSRuntimeError(f"Can't poll with a period of {period_s}s.")
+        subscription = Subscription(
+            pin,
+            function,
+            int(period_s * 1e9),
+            pull_up=pull_up,
+            callback=callback,
+            first_due_ns=monotonic_ns(),
+        )
+        with self._lock:
+            self._subscriptions.append(subscription)
+        self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stop polling a subscription.
+
+        :param subscription: The subscription to remove.
+        :raises: UOSRuntimeError if the subscription isn't on this scheduler.
+        """
+        with self._lock:
+            if subscription not in self._subscriptions:
+                raise UOSRuntimeError(f"{subscription} isn't subscribed.")
+            self._subscriptions.remove(subscription)
+
+    def start(self):
+        """Start polling from a background thread."""
+        if self._thread is not None:
+            raise UOSRuntimeError("Polling scheduler is already running.")
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name=f"uos-poll-{self.device.address}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling and wait for the background thread to finish."""
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        """Poll due subscriptions until stopped."""
+        while self._running:
+            # Cleared before polling so subscriptions made during the poll
+            # still wake the wait rather than being lost.
+            self._wake.clear()
+            wait_s = self.poll()
+            self._wake.wait(wait_s)
+
+    def poll(self) -> float | None:
+        """Read every subscription that is due.
+
+        :return: Seconds until the next subscription is due, None if there
+                are no subscriptions.
+        """
+        now_ns = monotonic_ns()
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for function in self.FUNCTIONS:
+            due = [
+                subscription
+                for subscription in subscriptions
+                if subscription.function == function and subscription.due_ns <= now_ns
+            ]
+            if due:
+                self._read(function, due)
+        if not subscriptions:
+            return None
+        next_due_ns = min(subscription.due_ns for subscription in subscriptions)
+        return max(0, next_due_ns - monotonic_ns()) / 1e9
+
+    def _read(self, function: UOSFunction, due: list[Subscription]):
+        """Read the pins of due subscriptions with a single batched instruction.
+
+        :param function: The function shared by the subscriptions.
+        :param due: The subscriptions to read.
+        """
+        pull_ups: dict[int, bool] = {}  # each pin is only read once
+        for subscription in due:
+            pull_ups.setdefault(subscription.pin, subscription.pull_up)
+        try:
+            if function == UOSFunctions.get_gpio_input:
+                result = self.device.get_gpio_inputs(
+                    list(pull_ups), list(pull_ups.values())
+                )
+            else:
+                result = self.device.get_adc_inputs(list(pull_ups))
+            status, exception = result.status, result.exception
+        except UOSError as error:
+            status, exception = False, str(error)
+        read_ns = monotonic_ns()
+        if not status:
+            logger.debug("Scheduled %s failed: %s", function.name, exception)
+        for subscription in due:
+            self._reschedule(subscription, read_ns, status)
+
+    def _reschedule(self, subscription: Subscription, read_ns: int, status: bool):
+        """Record a poll of a subscription and schedule the next.
+
+        :param subscription: The subscription that was polled.
+        :param read_ns: When the poll's read completed.
+        :param status: True if the read succeeded.
+        """
+        stats = subscription.stats
+        if status:
+            jitter_ns = max(0, read_ns - subscription.due_ns)
+            stats.polls += 1
+            stats.jitter_total_ns += jitter_ns
+            stats.jitter_max_ns = max(stats.jitter_max_ns, jitter_ns)
+        else:
+            stats.errors += 1
+        subscription.due_ns += subscription.period_ns
+        if read_ns > subscription.due_ns:  # skip the polls that are overdue
+            missed = (read_ns - subscription.due_ns) // subscription.period_ns + 1
+            stats.missed += missed
+            subscription.due_ns += missed * subscription.period_ns
+        if status and subscription.callback is not None:
+            pin = self.device.get_pin(subscription.pin)
+            sample = (
+                pin.gpio_reading
+                if subscription.function == UOSFunctions.get_gpio_input
+                else pin.adc_reading
+            )
+            # Due to user code raising anything, which mustn't end polling.
+            # pylint: disable=broad-exception-caught
+            try:
+                subscription.callback(subscription, sample)  # type: ignore
+            except Exception:
+                stats.callback_errors += 1
+                logger.exception("Callback of %s raised", subscription)
@@ -0,0 +1,162 @@
+"""Provides a simulated UOS device on a pseudo-terminal for testing.
+
+The simulator answers NPC instructions on the controller side of a pty, so
+the peripheral side can be opened by ``UOSDevice`` with the serial interface
+exactly as a USB serial device would be. Only available on POSIX platforms.
+"""
+import os
+import select
+import threading
+import tty
+from collections.abc import Callable
+from time import sleep
+
+from uoshardware import UOSRuntimeError, logger
+from uoshardware.abstractions import Device
+from uoshardware.decoder import NPCDecoder
+from uoshardware.devices import Devices, get_hwid
+from uoshardware.firmware import FirmwareModel
+from uoshardware.timeouts import get_transfer_s
+
+
+class FirmwareSimulator:
+    """Simulates UOS firmware for a device definition on a pty.
+
+    Instructions are executed by a ``FirmwareModel`` of the device. Responses
+    are delayed by a processing latency plus the time the request and
+    response would take on the wire at the baudrate.
+
+    :ivar device: The definition of the device being simulated.
+    :ivar baudrate: The baudrate used to model wire delay, 0 disables it.
+    :ivar latency_s: The processing time of each instruction.
+    :ivar model: The firmware model holding the pin state.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # Due to holding the pty and thread of the simulated device.
+
+    VERSION = FirmwareModel.VERSION
+
+    def __init__(
+        self,
+        device: Device = Devices.arduino_nano,
+        baudrate: int | None = None,
+        latency_s: float = 0.0,
+    ):
+        """Create a simulator, it isn't available until started.
+
+        :param device: The definition of the device to simulate.
+        :param baudrate: The baudrate used to model wire delay, defaults to the
+                device's default baudrate. 0 disables wire delay.
+        :param latency_s: The processing time of each instruction.
+        """
+        self.device = device
+        self.baudrate = (
+            device.aux_params.get("default_baudrate", 0)
+            if baudrate is None
+            else baudrate
+        )
+        self.latency_s = latency_s
+        self.model = FirmwareModel(device, get_hwid(device))
+        self._decoder = NPCDecoder()
+        self._running = False
+        self._thread: threading.Thread | None = None
+        self._controller: int | None = None
+        self._peripheral: int | None = None
+
+    def __enter__(self):
+        """Start the simulator when used as a context manager."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):  # dead: disable
+        """Stop the simulator when leaving the context manager."""
+        self.stop()
+
+    @property
+    def address(self) -> str:
+        """The path of the pty to connect a serial device to."""
+        if self._peripheral is None:
+            raise UOSRuntimeError("Simulator must be started to have an address.")
+        return os.ttyname(self._peripheral)
+
+    def start(self):
+        """Create the pty and start answering instructions."""
+        if self._thread is not None:
+            raise UOSRuntimeError("Simulator is already running.")
+        self._controller, self._peripheral = os.openpty()
+        tty.setraw(self._peripheral)  # don't echo responses back to the simulator
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="uos-simulator", daemon=True
+        )
+        self._thread.start()
+        logger.debug("Simulating %s on %s", self.device.name, self.address)
+
+    def stop(self):
+        """Stop answering instructions and close the pty."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for descriptor in (self._controller, self._peripheral):
+            if descriptor is not None:
+                os.close(descriptor)
+        self._controller = self._peripheral = None
+
+    @property
+    def instructions(self) -> int:
+        """The number of instructions executed."""
+        return self.model.instructions
+
+    def set_adc_waveform(self, pin: int, waveform: Callable[[float], float]):
+        """Set the voltage applied to an ADC channel over time.
+
+        :param pin: The index of the ADC pin.
+        :param waveform: Called with the seconds since the simulator was
+                created, returning the voltage to sample.
+        :raises: UOSUnsupportedError if the pin doesn't support ADC reads.
+        """
+        self.model.set_adc_waveform(pin, waveform)
+
+    def set_input_level(self, pin: int, level: int):
+        """Drive the level applied to a pin when it's an input.
+
+        :param pin: The index of the pin.
+        :param level: The level applied externally, 0 or 1.
+        :raises: UOSUnsupportedError if the pin doesn't exist.
+        """
+        self.model.set_input_level(pin, level)
+
+    def wire_time_s(self, byte_count: int) -> float:
+        """Get the time bytes take to transfer at the simulated baudrate.
+
+        :param byte_count: The number of bytes transferred.
+        :return: The transfer time in seconds.
+        """
+        return get_transfer_s(byte_count, self.baudrate)
+
+    def _run(self):
+        """Answer instructions until stopped."""
+        while self._running:
+            if not select.select([self._controller], [], [], 0.05)[0]:
+                continue
+            try:
+                data = os.read(self._controller, 4096)  # type: ignore
+            except OSError:  # the peripheral side has hung up
+                sleep(0.01)
+                continue
+            self._decoder.feed(data)
+            while self._decoder.frames:
+                frame = self._decoder.frames.popleft()
+                response = self.execute(frame)
+                sleep(self.latency_s + self.wire_time_s(len(frame) + len(response)))
+                os.write(self._controller, response)  # type: ignore
+
+    def execute(self, frame: bytes) -> bytes:
+        """Execute an instruction frame, returning the encoded response.
+
+        :param frame: A complete, validated NPC frame.
+        :return: The encoded ACK and any response packets.
+        """
+        return self.model.execute(frame)
@@ -0,0 +1,227 @@
+"""Provides adaptive response timeouts and per-call deadlines for instructions.
+
+Response timeouts start from the time the frames take on the wire at the
+device's baud rate. Once responses have been measured, the latency beyond the
+wire time is smoothed per function address like TCP's retransmission timer
+(RFC 6298), giving timeouts that track the device rather than a fixed worst
+case.
+
+Callers can bound instructions with a ``deadline``, which applies to every
+instruction executed within it on the same thread or asyncio task.
+"""
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import monotonic
+
+from uoshardware import UOSTimeoutError
+from uoshardware.abstractions import ComResult, NPCPacket, UOSFunction
+from uoshardware.decoder import NPCDecoder
+
+BITS_PER_BYTE = 10  # start, 8 data and stop bits
+ACK_PAYLOAD = 1  # bytes in the payload of an ACK frame
+# The monotonic time the current instructions must complete by.
+_DEADLINE_S: ContextVar[float | None] = ContextVar("uos_deadline_s", default=None)
+
+
+@contextmanager
+def deadline(timeout_s: float) -> Iterator[None]:
+    """Bound the instructions executed within the context to a time limit.
+
+    The deadline propagates through opening the connection, writing the
+    instruction, reading the response and any retries. It is checked before
+    each of these phases and bounds the time waited for responses, but
+    opening a port or writing to it isn't interrupted, so a phase that
+    blocks can overrun the deadline until the next check. Nested deadlines
+    can only shorten the time allowed.
+
+    :param timeout_s: The time allowed for the instructions in seconds.
+    """
+    deadline_s = monotonic() + timeout_s
+    outer_s = _DEADLINE_S.get()
+    if outer_s is not None:
+        deadline_s = min(deadline_s, outer_s)
+    token = _DEADLINE_S.set(deadline_s)
+    try:
+        yield
+    finally:
+        _DEADLINE_S.reset(token)
+
+
+def get_deadline_s() -> float | None:
+    """Get the monotonic time the current instructions must complete by.
+
+    :return: The deadline in seconds, None if no deadline has been set.
+    """
+    return _DEADLINE_S.get()
+
+
+def check_deadline(phase: str):
+    """Check the current deadline hasn't expired before starting a phase.
+
+    :param phase: Description of the phase being started.
+    :raises: UOSTimeoutError if the deadline has expired.
+    """
+    deadline_s = _DEADLINE_S.get()
+    if deadline_s is not None and monotonic() >= deadline_s:
+        raise UOSTimeoutError(f"Deadline expired before {phase}.")
+
+
+def get_transfer_s(byte_count: int, baudrate: int | None) -> float:
+    """Get the time to transfer bytes over a serial link.
+
+    :param byte_count: The number of bytes transferred.
+    :param baudrate: The baud rate of the link, None if there is no link.
+    :return: The transfer time in seconds.
+    """
+    if not baudrate:
+        return 0.0
+    return byte_count * BITS_PER_BYTE / baudrate
+
+
+@dataclass
+class LatencyEstimate:
+    """Smoothed response latency of a function address beyond the wire time.
+
+    :ivar smoothed_s: The smoothed latency.
+    :ivar variation_s: The smoothed mean deviation of the latency.
+    :ivar backoff: Multiplies the allowance after consecutive timeouts.
+    """
+
+    smoothed_s: float
+    variation_s: float
+    backoff: int = 1
+
+
+class AdaptiveTimeout:
+    """Derives response timeouts from the baud rate and measured latencies.
+
+    Timeouts are the wire time of the instruction and its response frames
+    plus an allowance for the device to respond. Until a function address has
+    responded the ``initial_allowance_s`` is used, after that the allowance is
+    the smoothed latency plus four times its deviation, with at least
+    ``min_margin_s`` of headroom. Like the 1 s minimum RTO of RFC 6298, the
+    margin stops a run of steady responses shrinking the timeout below the
+    jitter the link can have. USB-serial adapters poll every few ms and
+    buffer data for up to 16 ms, so the default margin is 0.1 s. Each
+    consecutive timeout doubles the allowance until a response arrives, up
+    to ``max_allowance_s``.
+
+    :ivar baudrate: The baud rate of the link, None if there is no link.
+    :ivar initial_allowance_s: The allowance before any response is measured.
+    :ivar max_allowance_s: The longest allowance used.
+    :ivar min_margin_s: The least headroom allowed beyond the smoothed latency.
+    :ivar estimates: The latency estimate of each function address measured.
+    """
+
+    GAIN = 0.125  # weight of new latencies in the smoothed latency
+    VARIATION_GAIN = 0.25  # weight of new deviations in the smoothed deviation
+    VARIATION_MULTIPLIER = 4  # deviations of headroom allowed
+    MAX_BACKOFF = 64  # bounds the multiplier, allowances are capped regardless
+
+    def __init__(
+        self,
+        baudrate: int | None = None,
+        initial_allowance_s: float = 1.0,
+        max_allowance_s: float = 2.0,
+        min_margin_s: float = 0.1,
+    ):
+        """Create timeouts that haven't measured any responses.
+
+        :param baudrate: The baud rate of the link, None if there is no link.
+        :param initial_allowance_s: The allowance before any response is measured.
+        :param max_allowance_s: The longest allowance used.
+        :param min_margin_s: The least headroom allowed beyond the smoothed
+                latency, covering scheduling and USB polling jitter.
+        """
+        self.baudrate = baudrate
+        self.initial_allowance_s = initial_allowance_s
+        self.max_allowance_s = max_allowance_s
+        self.min_margin_s = min_margin_s
+        self.estimates: dict[int, LatencyEstimate] = {}
+
+    def get_wire_s(
+        self, function: UOSFunction, packet: NPCPacket, expect_packets: int
+    ) -> float:
+        """Get the time an instruction and its response take on the wire.
+
+        :param function: The UOS function of the instruction.
+        :param packet: The instruction packet.
+        :param expect_packets: How many packets including ACK are expected.
+        :return: The transfer time in seconds.
+        """
+        payloads = [ACK_PAYLOAD] + function.get_rx_packets_expected(packet.payload)
+        rx_bytes = sum(
+            NPCDecoder.FRAME_OVERHEAD + size for size in payloads[:expect_packets]
+        )
+        return get_transfer_s(len(packet.packet) + rx_bytes, self.baudrate)
+
+    def get_timeout_s(
+        self, function: UOSFunction, packet: NPCPacket, expect_packets: int
+    ) -> float:
+        """Get the time to wait for the response to an instruction.
+
+        :param function: The UOS function of the instruction.
+        :param packet: The instruction packet.
+        :param expect_packets: How many packets including ACK are expected.
+        :return: The timeout in seconds, limited by the current deadline.
+        """
+        estimate = self.estimates.get(packet.to_address)
+        if estimate is None:
+            allowance_s = self.initial_allowance_s
+        else:
+            allowance_s = estimate.backoff * (
+                estimate.smoothed_s
+                + max(
+                    self.min_margin_s,
+                    self.VARIATION_MULTIPLIER * estimate.variation_s,
+                )
+            )
+        timeout_s = self.get_wire_s(function, packet, expect_packets) + min(
+            allowance_s, self.max_allowance_s
+        )
+        deadline_s = _DEADLINE_S.get()
+        if deadline_s is not None:
+            timeout_s = max(0.0, min(timeout_s, deadline_s - monotonic()))
+        return timeout_s
+
+    def record(
+        self,
+        function: UOSFunction,
+        result: ComResult,
+        expect_packets: int,
+        latency_s: float,
+    ):
+        """Learn from the outcome of an instruction.
+
+        :param function: The UOS function of the instruction.
+        :param result: The result of the instruction, including its tx packet.
+        :param expect_packets: How many packets including ACK were expected.
+        :param latency_s: The time from writing the instruction to the end of
+                reading its response.
+        """
+        packet = result.tx_packet
+        if packet is None:
+            return  # special actions have no response
+        estimate = self.estimates.get(packet.to_address)
+        if result.status:
+            latency_s = max(
+                0.0, latency_s - self.get_wire_s(function, packet, expect_packets)
+            )
+            if estimate is None:
+                self.estimates[packet.to_address] = LatencyEstimate(
+                    latency_s, latency_s / 2
+                )
+                return
+            estimate.variation_s += self.VARIATION_GAIN * (
+                abs(estimate.smoothed_s - latency_s) - estimate.variation_s
+            )
+            estimate.smoothed_s += self.GAIN * (latency_s - estimate.smoothed_s)
+            estimate.backoff = 1
+        elif estimate is not None and result.exception == NPCDecoder.MISSING_DATA_ERROR:
+            estimate.backoff = min(estimate.backoff * 2, self.MAX_BACKOFF)
+
+    def reset(self):
+        """Forget all measured latencies."""
+        self.estimates.clear()
@@ -0,0 +1,145 @@
+"""Provides hooks for tracing the phases of executing instructions.
+
+The execute path of ``UOSDevice`` and the serial interface mark each phase
+with a ``span``. Spans are discarded unless a ``Tracer`` has been installed
+with ``set_tracer``, in which case it's notified as each phase begins and
+ends on the calling thread.
+"""
+import json
+import os
+import threading
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from time import perf_counter_ns
+
+# Reusable context returned for spans while no tracer is installed.
+_NO_SPAN = nullcontext()
+
+
+class Tracer:
+    """Base tracer receiving the start and end of each traced phase.
+
+    Spans are strictly nested on each thread, so every ``end`` matches the
+    most recent unmatched ``begin`` of the same thread.
+    """
+
+    def begin(self, name: str, args: dict):
+        """Handle the start of a phase.
+
+        :param name: The name of the phase, prefixed with its category.
+        :param args: Details of the phase, such as the function executed.
+        """
+
+    def end(self, name: str):
+        """Handle the end of a phase.
+
+        :param name: The name of the phase, prefixed with its category.
+        """
+
+
+class _Installed:  # pylint: disable=too-few-public-methods
+    """Holds the tracer installed for every thread in the process."""
+
+    tracer: Tracer | None = None
+
+
+def set_tracer(tracer: Tracer | None) -> Tracer | None:
+    """Install the tracer notified of spans in all threads.
+
+    :param tracer: The tracer to install, None to disable tracing.
+    :return: The previously installed tracer.
+    """
+    previous = _Installed.tracer
+    _Installed.tracer = tracer
+    return previous
+
+
+def span(name: str, **args) -> AbstractContextManager:
+    """Mark a phase of execution for the installed tracer.
+
+    :param name: The name of the phase, prefixed with its category.
+    :param args: Details of the phase, such as the function executed.
+    :return: A context manager covering the phase.
+    """
+    tracer = _Installed.tracer
+    if tracer is None:
+        return _NO_SPAN
+    return _traced(tracer, name, args)
+
+
+@contextmanager
+def _traced(tracer: Tracer, name: str, args: dict):
+    """Notify a tracer of the start and end of a phase.
+
+    :param tracer: The tracer to notify.
+    :param name: The name of the phase.
+    :param args: Details of the phase.
+    """
+    tracer.begin(name, args)
+    try:
+        yield
+    finally:
+        tracer.end(name)
+
+
+class ChromeTraceRecorder(Tracer):
+    """Records spans as Chrome trace events.
+
+    The saved JSON can be opened in ``chrome://tracing`` or Perfetto to view
+    the phases of each instruction on a timeline per thread. Used as a context
+    manager the recorder installs itself, restoring the previous tracer on exit.
+
+    :ivar events: The recorded trace events.
+    """
+
+    def __init__(self):
+        """Create a recorder with no events."""
+        self.events: list[dict] = []
+        self._previous: Tracer | None = None
+        self._pid = os.getpid()
+
+    def __enter__(self):
+        """Install the recorder as the tracer."""
+        self._previous = set_tracer(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):  # dead: disable
+        """Restore the previously installed tracer."""
+        set_tracer(self._previous)
+
+    def begin(self, name: str, args: dict):
+        """Record a duration begin event."""
+        self.events.append(
+            {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "B",
+                "ts": perf_counter_ns() / 1000,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": {key: str(value) for key, value in args.items()},
+            }
+        )
+
+    def end(self, name: str):
+        """Record a duration end event."""
+        self.events.append(
+            {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "E",
+                "ts": perf_counter_ns() / 1000,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+            }
+        )
+
+    def save(self, path: str | Path):
+        """Write the recorded events as a Chrome trace JSON file.
+
+        :param path: The file to write.
+        """
+        Path(path).write_text(
+            json.dumps({"traceEvents": self.events, "displayTimeUnit": "ms"}),
+            encoding="utf-8",
+        )